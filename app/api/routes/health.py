@@ -1,8 +1,36 @@
+from typing import Any, Dict
+
 from fastapi import APIRouter
 
+from broky.llm import get_llm_factory
+from broky.outbox import get_outbox
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/health/llm")
+async def llm_health() -> Dict[str, Any]:
+    """Contadores por agente de las llamadas al pool LLM compartido."""
+
+    factory = get_llm_factory()
+    return {
+        "configured": factory.configured,
+        "circuit": factory.circuit.snapshot(),
+        "embeddings_circuit": factory.embeddings_circuit.snapshot(),
+        "agents": factory.stats(),
+    }
+
+
+@router.get("/health/outbox")
+async def outbox_health() -> Dict[str, Any]:
+    """Profundidad del outbox local y conteo de reintentos/fallos."""
+
+    outbox = get_outbox()
+    if outbox is None:
+        return {"enabled": False}
+    return {"enabled": True, **outbox.stats()}
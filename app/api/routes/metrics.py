@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """Histogramas y percentiles de latencia por etapa en formato Prometheus."""
+
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.api.deps import AuthenticatedUser, AuthenticatedUserDependency
+from app.services.rag import get_answer_cache, get_lexical_index, get_retrieval_cache
+
+router = APIRouter(prefix="/rag", tags=["rag"])
+
+
+@router.post("/cache/invalidate")
+async def invalidate_retrieval_cache(
+    user: AuthenticatedUser = AuthenticatedUserDependency,
+) -> Dict[str, Any]:
+    """Descarta las búsquedas y respuestas cacheadas del realtor y resincroniza su índice BM25 (tras cambiar su catálogo)."""
+
+    lexical = get_lexical_index()
+    if lexical is not None:
+        lexical.invalidate(user.realtor_id)
+
+    answers = get_answer_cache()
+    answers_invalidated = answers.invalidate_realtor(user.realtor_id) if answers is not None else 0
+
+    cache = get_retrieval_cache()
+    if cache is None:
+        return {"enabled": False, "invalidated": 0, "answers_invalidated": answers_invalidated}
+    return {
+        "enabled": True,
+        "invalidated": cache.invalidate_realtor(user.realtor_id),
+        "answers_invalidated": answers_invalidated,
+    }
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from app.api.deps import AuthenticatedUser, AuthenticatedUserDependency
+from app.core.config import get_settings
+from app.services.llm_usage_repository import LLMUsageReadError, LLMUsageRepository
+from app.services.supabase_client import get_supabase_client
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+@router.get("/rollup")
+async def usage_rollup(
+    days: int = Query(default=7, ge=1, le=90),
+    user: AuthenticatedUser = AuthenticatedUserDependency,
+) -> Dict[str, Any]:
+    """Tokens, llamadas, latencia y costo por día y agente del realtor autenticado."""
+
+    settings = get_settings()
+    client = get_supabase_client(settings)
+    if client is None:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Supabase no configurado",
+        )
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    repository = LLMUsageRepository(client, table=settings.llm_usage_table)
+    try:
+        rollup = repository.rollup(user.realtor_id, since)
+    except LLMUsageReadError as exc:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No se pudo leer el uso LLM",
+        ) from exc
+    return {"realtor_id": user.realtor_id, "since": since.isoformat(), **rollup}
@@ -1,12 +1,15 @@
+import contextvars
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, Request
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 from pydantic import ValidationError
 
 from app.core.config import get_settings
+from app.core.metrics import bind_metrics_context, metrics_context, timed_stage
 from app.models.webhook import (
     WebhookPayload,
     WebhookResponse,
@@ -32,6 +35,8 @@ _whapi_delivery = WhapiDeliveryService(
     ),
     media_proxy_base=_media_proxy_base,
 )
+# Entrega del primer fragmento en streaming sin bloquear la generación.
+_stream_delivery_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="whapi-stream")
 
 
 @router.post("", response_model=WebhookResponse)
@@ -74,6 +79,11 @@ async def handle_webhook(request: Request) -> WebhookResponse:
     user_id = payload.from_user
     logger.info("Procesando mensaje de %s", user_id)
 
+    with metrics_context(session_id=user_id), timed_stage("webhook.turn"):
+        return _process_message(payload, user_id)
+
+
+def _process_message(payload: WebhookPayload, user_id: str) -> WebhookResponse:
     try:
         workflow_state = _workflow_service.run(
             payload=payload.model_dump(by_alias=True)
@@ -81,8 +91,18 @@ async def handle_webhook(request: Request) -> WebhookResponse:
         official_data = workflow_state.get("official_data")
         if not isinstance(official_data, dict) or not official_data:
             official_data = _build_official_from_state(workflow_state)
+        bind_metrics_context(
+            realtor_id=(workflow_state.get("normalized") or {}).get("realtor_id")
+        )
 
-        result = _master_runtime.run(workflow_state)
+        streamed_deliveries: List[Future] = []
+        if _settings.response_streaming_enabled:
+            result = _master_runtime.run(
+                workflow_state,
+                on_segment=_build_segment_sender(official_data, streamed_deliveries),
+            )
+        else:
+            result = _master_runtime.run(workflow_state)
         logger.info(
             "MasterAgentRuntime | intents=%s | filtros=%s | handoff=%s",
             result.intents,
@@ -91,6 +111,7 @@ async def handle_webhook(request: Request) -> WebhookResponse:
         )
         reply = result.reply
         split_messages: list[str] = []
+        streamed_count = 0
         justification: Optional[str] = None
         if isinstance(result.metadata, dict):
             metadata_state = result.metadata.get("inbound_state")
@@ -107,6 +128,9 @@ async def handle_webhook(request: Request) -> WebhookResponse:
                         for item in raw_messages
                         if isinstance(item, (str, int, float)) and str(item).strip()
                     ]
+                streamed = postprocess.get("streamed_segments")
+                if isinstance(streamed, list):
+                    streamed_count = len(streamed)
                 justification = postprocess.get("justification")
                 if (
                     isinstance(justification, str)
@@ -121,12 +145,28 @@ async def handle_webhook(request: Request) -> WebhookResponse:
             if isinstance(raw_attachments, list) and raw_attachments:
                 attachments = raw_attachments
 
-        delivery_result = _whapi_delivery.send_user_reply(
-            reply=reply,
-            official_data=official_data,
-            messages=split_messages or None,
-            attachments=attachments,
-        )
+        for future in streamed_deliveries:
+            # Mantiene el orden: el fragmento en streaming debe llegar antes que el resto.
+            future.result()
+
+        if streamed_count:
+            pending_messages = split_messages[streamed_count:]
+            if pending_messages or attachments:
+                delivery_result = _whapi_delivery.send_user_reply(
+                    reply="",
+                    official_data=official_data,
+                    messages=pending_messages or None,
+                    attachments=attachments,
+                )
+            else:
+                delivery_result = {"ok": True, "deliveries": []}
+        else:
+            delivery_result = _whapi_delivery.send_user_reply(
+                reply=reply,
+                official_data=official_data,
+                messages=split_messages or None,
+                attachments=attachments,
+            )
         if not delivery_result.get("ok"):
             logger.info("Mensaje no entregado automáticamente | detalle=%s", delivery_result)
 
@@ -157,6 +197,25 @@ async def handle_webhook(request: Request) -> WebhookResponse:
     return WebhookResponse(reply=response_body, user_id=user_id)
 
 
+def _build_segment_sender(
+    official_data: Dict[str, Any],
+    deliveries: List[Future],
+) -> Callable[[str], None]:
+    def _send(segment: str) -> None:
+        logger.info("Enviando primer fragmento en streaming | largo=%d", len(segment))
+        deliveries.append(
+            _stream_delivery_executor.submit(
+                contextvars.copy_context().run,
+                _whapi_delivery.send_user_reply,
+                reply=segment,
+                official_data=official_data,
+                typing_time=None,
+            )
+        )
+
+    return _send
+
+
 def _coerce_payload(raw_payload: Dict[str, Any]) -> WebhookPayload:
     """Normaliza el payload recibido a la estructura esperada por el pipeline."""
 
@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import Dict, Optional
+from typing import Dict, Literal, Optional
 
 from dotenv import load_dotenv
 from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, ValidationError
@@ -40,6 +40,50 @@ class Settings(BaseModel):
     vector_search_limit: int = Field(default=5, alias="VECTOR_SEARCH_LIMIT")
     vector_search_threshold: float = Field(default=0.7, alias="VECTOR_SEARCH_THRESHOLD")
     vector_service_timeout: float = Field(default=1.2, alias="VECTOR_SERVICE_TIMEOUT")
+    vector_max_connections: int = Field(default=20, alias="VECTOR_MAX_CONNECTIONS")
+    vector_max_keepalive_connections: int = Field(
+        default=10, alias="VECTOR_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    vector_keepalive_expiry: float = Field(default=30.0, alias="VECTOR_KEEPALIVE_EXPIRY")
+    vector_http2: bool = Field(default=True, alias="VECTOR_HTTP2")
+    vector_hedge_enabled: bool = Field(default=True, alias="VECTOR_HEDGE_ENABLED")
+    vector_hedge_percentile: float = Field(default=0.95, alias="VECTOR_HEDGE_PERCENTILE")
+    vector_hedge_delay_ms: float = Field(default=300.0, alias="VECTOR_HEDGE_DELAY_MS")
+    rag_retrieval_cache_enabled: bool = Field(
+        default=False, alias="RAG_RETRIEVAL_CACHE_ENABLED"
+    )
+    rag_retrieval_cache_ttl_seconds: float = Field(
+        default=300.0, alias="RAG_RETRIEVAL_CACHE_TTL_SECONDS"
+    )
+    rag_retrieval_cache_max_entries: int = Field(
+        default=2048, alias="RAG_RETRIEVAL_CACHE_MAX_ENTRIES"
+    )
+    rag_local_index_mode: Literal["off", "fallback", "primary"] = Field(
+        default="off", alias="RAG_LOCAL_INDEX_MODE"
+    )
+    rag_local_index_path: str = Field(default="data/vector_index", alias="RAG_LOCAL_INDEX_PATH")
+    rag_local_index_threshold: float = Field(default=0.3, alias="RAG_LOCAL_INDEX_THRESHOLD")
+    rag_local_index_primary_max_rows: int = Field(
+        default=200, alias="RAG_LOCAL_INDEX_PRIMARY_MAX_ROWS"
+    )
+    rag_lexical_mode: Literal["off", "fallback", "hybrid"] = Field(
+        default="off", alias="RAG_LEXICAL_MODE"
+    )
+    rag_hybrid_alpha: float = Field(default=0.5, alias="RAG_HYBRID_ALPHA")
+    rag_lexical_refresh_seconds: float = Field(
+        default=300.0, alias="RAG_LEXICAL_REFRESH_SECONDS"
+    )
+    rag_context_max_tokens: int = Field(default=1200, alias="RAG_CONTEXT_MAX_TOKENS")
+    rag_mode: Literal["generate", "retrieval_only"] = Field(default="generate", alias="RAG_MODE")
+    rag_answer_cache_enabled: bool = Field(default=False, alias="RAG_ANSWER_CACHE_ENABLED")
+    rag_answer_cache_threshold: float = Field(default=0.92, alias="RAG_ANSWER_CACHE_THRESHOLD")
+    rag_answer_cache_ttl_seconds: float = Field(
+        default=3600.0, alias="RAG_ANSWER_CACHE_TTL_SECONDS"
+    )
+    rag_answer_cache_max_entries: int = Field(
+        default=256, alias="RAG_ANSWER_CACHE_MAX_ENTRIES"
+    )
+    rag_answer_cache_wait_ms: float = Field(default=200.0, alias="RAG_ANSWER_CACHE_WAIT_MS")
     rag_failure_reply: str = Field(
         default=(
             "Estamos consultando la información con un asesor. Te responderemos en breve."
@@ -65,6 +109,59 @@ class Settings(BaseModel):
         default="docs/master_agent_prompt.md", alias="MASTER_AGENT_PROMPT_PATH"
     )
 
+    history_summary_enabled: bool = Field(default=False, alias="HISTORY_SUMMARY_ENABLED")
+    history_summary_table: str = Field(
+        default="chats_history_summaries", alias="HISTORY_SUMMARY_TABLE"
+    )
+    history_summary_every_n_turns: int = Field(
+        default=6, alias="HISTORY_SUMMARY_EVERY_N_TURNS"
+    )
+    history_summary_keep_last: int = Field(default=6, alias="HISTORY_SUMMARY_KEEP_LAST")
+    history_summary_max_chars: int = Field(
+        default=1200, alias="HISTORY_SUMMARY_MAX_CHARS"
+    )
+
+    history_cache_enabled: bool = Field(default=False, alias="HISTORY_CACHE_ENABLED")
+    history_cache_max_sessions: int = Field(
+        default=1000, alias="HISTORY_CACHE_MAX_SESSIONS"
+    )
+    history_cache_stale_seconds: float = Field(
+        default=30.0, alias="HISTORY_CACHE_STALE_SECONDS"
+    )
+
+    history_write_behind_enabled: bool = Field(
+        default=False, alias="HISTORY_WRITE_BEHIND_ENABLED"
+    )
+    history_write_behind_max_batch: int = Field(
+        default=50, alias="HISTORY_WRITE_BEHIND_MAX_BATCH"
+    )
+    history_write_behind_flush_ms: int = Field(
+        default=500, alias="HISTORY_WRITE_BEHIND_FLUSH_MS"
+    )
+
+    history_diagnostics_sink: Literal["off", "table", "file"] = Field(
+        default="file", alias="HISTORY_DIAGNOSTICS_SINK"
+    )
+    history_diagnostics_table: str = Field(
+        default="chats_history_diagnostics", alias="HISTORY_DIAGNOSTICS_TABLE"
+    )
+    history_diagnostics_path: str = Field(
+        default="turn_diagnostics.jsonl", alias="HISTORY_DIAGNOSTICS_PATH"
+    )
+
+    outbox_enabled: bool = Field(default=False, alias="OUTBOX_ENABLED")
+    outbox_path: str = Field(default="broky_outbox.sqlite3", alias="OUTBOX_PATH")
+    outbox_flush_ms: int = Field(default=500, alias="OUTBOX_FLUSH_MS")
+    outbox_batch_size: int = Field(default=100, alias="OUTBOX_BATCH_SIZE")
+    outbox_max_attempts: int = Field(default=8, alias="OUTBOX_MAX_ATTEMPTS")
+
+    llm_usage_enabled: bool = Field(default=False, alias="LLM_USAGE_ENABLED")
+    llm_usage_table: str = Field(default="llm_usage", alias="LLM_USAGE_TABLE")
+
+    response_streaming_enabled: bool = Field(
+        default=False, alias="RESPONSE_STREAMING_ENABLED"
+    )
+
     whapi_base_url: Optional[AnyHttpUrl] = Field(
         default="https://gate.whapi.cloud",
         alias="WHAPI_BASE_URL",
@@ -0,0 +1,294 @@
+"""Per-stage latency spans exported as Prometheus metrics.
+
+Every span is recorded twice: in a Prometheus histogram (for server-side
+`histogram_quantile`) and in a bounded in-process reservoir from which
+p50/p95/p99 gauges are computed at scrape time. Spans are correlated by the
+`session_id`/`realtor_id` bound to the current context.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+C = TypeVar("C", bound=type)
+
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 1024
+UNKNOWN_REALTOR = "unknown"
+
+_session_id: ContextVar[Optional[str]] = ContextVar("broky_metrics_session", default=None)
+_realtor_id: ContextVar[Optional[str]] = ContextVar("broky_metrics_realtor", default=None)
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+STAGE_LATENCY = Histogram(
+    "broky_stage_latency_seconds",
+    "Latencia por etapa del turno (nodos inbound, agentes, repositorios, vector, Whapi).",
+    ["stage", "realtor"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    registry=REGISTRY,
+)
+
+
+CIRCUIT_STATE = Gauge(
+    "broky_circuit_state",
+    "Estado del circuit breaker (0 cerrado, 1 semiabierto, 2 abierto).",
+    ["circuit"],
+    registry=REGISTRY,
+)
+
+CIRCUIT_REJECTIONS = Counter(
+    "broky_circuit_rejections",
+    "Llamadas rechazadas al instante por un circuito abierto.",
+    ["circuit"],
+    registry=REGISTRY,
+)
+
+CACHE_REQUESTS = Counter(
+    "broky_cache_requests",
+    "Consultas a cachés en proceso por resultado (hit, miss, stale).",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+
+HTTP_CONNECTIONS = Counter(
+    "broky_http_connections",
+    "Requests HTTP por pool según si abrieron conexión nueva o reutilizaron una (keep-alive).",
+    ["pool", "result"],
+    registry=REGISTRY,
+)
+
+HEDGED_REQUESTS = Counter(
+    "broky_hedged_requests",
+    "Requests duplicados (hedge) por destino: enviados y ganados por el duplicado.",
+    ["target", "result"],
+    registry=REGISTRY,
+)
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class _QuantileReservoir:
+    """Últimas N latencias por (stage, realtor) para exponer percentiles."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE) -> None:
+        self._size = size
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, realtor: str, value: float) -> None:
+        key = (stage, realtor)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._size)
+            samples.append(value)
+
+    def quantiles(self) -> Dict[Tuple[str, str], Dict[float, float]]:
+        with self._lock:
+            snapshot = {key: sorted(values) for key, values in self._samples.items()}
+        result: Dict[Tuple[str, str], Dict[float, float]] = {}
+        for key, ordered in snapshot.items():
+            if not ordered:
+                continue
+            last = len(ordered) - 1
+            result[key] = {q: ordered[min(last, int(round(q * last)))] for q in QUANTILES}
+        return result
+
+    def samples(self) -> Dict[Tuple[str, str], List[float]]:
+        with self._lock:
+            return {key: list(values) for key, values in self._samples.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+_reservoir = _QuantileReservoir()
+
+
+class _QuantileCollector:
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        family = GaugeMetricFamily(
+            "broky_stage_latency_quantile_seconds",
+            "Percentiles de latencia por etapa y realtor sobre las últimas muestras.",
+            labels=["stage", "realtor", "quantile"],
+        )
+        for (stage, realtor), values in sorted(_reservoir.quantiles().items()):
+            for quantile, value in values.items():
+                family.add_metric([stage, realtor, str(quantile)], value)
+        yield family
+
+    def describe(self) -> Iterator[GaugeMetricFamily]:
+        return iter(())
+
+
+REGISTRY.register(_QuantileCollector())
+
+
+# ----------------------------------------------------------------------
+# Correlation context
+
+
+def current_session_id() -> Optional[str]:
+    return _session_id.get()
+
+
+def current_realtor_id() -> Optional[str]:
+    return _realtor_id.get()
+
+
+@contextmanager
+def metrics_context(
+    *, session_id: Optional[str] = None, realtor_id: Optional[str] = None
+) -> Iterator[None]:
+    """Scope the labels used by spans; values set inside are reverted on exit."""
+
+    session_token = _session_id.set(session_id or _session_id.get())
+    realtor_token = _realtor_id.set(str(realtor_id) if realtor_id else _realtor_id.get())
+    try:
+        yield
+    finally:
+        _realtor_id.reset(realtor_token)
+        _session_id.reset(session_token)
+
+
+def bind_metrics_context(
+    *, session_id: Optional[str] = None, realtor_id: Optional[str] = None
+) -> None:
+    """Refine the labels of the enclosing `metrics_context` once they become known."""
+
+    if session_id:
+        _session_id.set(session_id)
+    if realtor_id:
+        _realtor_id.set(str(realtor_id))
+
+
+# ----------------------------------------------------------------------
+# Spans
+
+
+def observe_stage(stage: str, seconds: float, *, realtor_id: Optional[str] = None) -> None:
+    realtor = str(realtor_id or _realtor_id.get() or UNKNOWN_REALTOR)
+    STAGE_LATENCY.labels(stage=stage, realtor=realtor).observe(seconds)
+    _reservoir.observe(stage, realtor, seconds)
+    logger.debug(
+        "span stage=%s | session_id=%s | realtor=%s | ms=%.1f",
+        stage,
+        _session_id.get(),
+        realtor,
+        seconds * 1000,
+    )
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Record the wall time of the block under `stage`, also when it raises."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator form of `timed_stage`."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed_stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def instrument_repository(prefix: str) -> Callable[[C], C]:
+    """Class decorator: time every public method as `repo.<prefix>.<method>`."""
+
+    def decorator(cls: C) -> C:
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(member):
+                continue
+            setattr(cls, name, timed(f"repo.{prefix}.{name}")(member))
+        return cls
+
+    return decorator
+
+
+def set_circuit_state(circuit: str, state: str) -> None:
+    CIRCUIT_STATE.labels(circuit=circuit).set(_CIRCUIT_STATE_VALUES.get(state, 0))
+
+
+def count_circuit_rejection(circuit: str) -> None:
+    CIRCUIT_REJECTIONS.labels(circuit=circuit).inc()
+
+
+def count_cache(cache: str, result: str) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result=result).inc()
+
+
+def count_connection(pool: str, *, reused: bool) -> None:
+    HTTP_CONNECTIONS.labels(pool=pool, result="reused" if reused else "new").inc()
+
+
+def count_hedge(target: str, result: str) -> None:
+    HEDGED_REQUESTS.labels(target=target, result=result).inc()
+
+
+def stage_samples() -> Dict[str, List[float]]:
+    """Latest reservoir samples per stage, merged across realtors (benchmarks)."""
+
+    merged: Dict[str, List[float]] = {}
+    for (stage, _realtor), values in _reservoir.samples().items():
+        merged.setdefault(stage, []).extend(values)
+    return merged
+
+
+def reset_metrics() -> None:
+    """Drop the in-process reservoir (tests)."""
+
+    _reservoir.clear()
+
+
+__all__ = [
+    "CACHE_REQUESTS",
+    "CIRCUIT_REJECTIONS",
+    "CIRCUIT_STATE",
+    "HEDGED_REQUESTS",
+    "HTTP_CONNECTIONS",
+    "REGISTRY",
+    "STAGE_LATENCY",
+    "bind_metrics_context",
+    "count_cache",
+    "count_circuit_rejection",
+    "count_connection",
+    "count_hedge",
+    "current_realtor_id",
+    "current_session_id",
+    "instrument_repository",
+    "metrics_context",
+    "observe_stage",
+    "reset_metrics",
+    "set_circuit_state",
+    "stage_samples",
+    "timed",
+    "timed_stage",
+]
@@ -1,17 +1,36 @@
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 
-from app.api.routes import health, webhook, media
+from app.api.routes import health, webhook, media, metrics, rag, usage
+from app.services.rag import aclose_vector_http_client, close_vector_http_client
+from broky.llm import get_llm_factory
+from broky.outbox import get_outbox
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    get_llm_factory().close()
+    close_vector_http_client()
+    await aclose_vector_http_client()
+    outbox = get_outbox()
+    if outbox is not None:
+        outbox.close()
 
 
 def create_app() -> FastAPI:
     logging.basicConfig(level=logging.INFO)
 
-    application = FastAPI(title="Broky WhatsApp Bot", version="0.2.0")
+    application = FastAPI(title="Broky WhatsApp Bot", version="0.2.0", lifespan=lifespan)
     application.include_router(health.router)
     application.include_router(webhook.router)
     application.include_router(media.router)
+    application.include_router(metrics.router)
+    application.include_router(usage.router)
+    application.include_router(rag.router)
 
     return application
 
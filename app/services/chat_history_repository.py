@@ -4,13 +4,48 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from supabase import Client
 
-logger = logging.getLogger(__name__)
+from app.core.metrics import instrument_repository
 
+logger = logging.getLogger(__name__)
 
+HISTORY_FORMAT_VERSION = 2
+# Lo único de la metadata que viaja en la fila caliente; el resto (subagents,
+# postprocess) va al sink de diagnósticos (`HistoryDiagnosticsRepository`).
+HOT_METADATA_KEYS = ("source", "intents", "filters", "turn")
+
+
+def split_message(decoded: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a stored message into its compact v2 form and the cold diagnostics.
+
+    Works for legacy rows (full `metadata`) and v2 rows alike. The n8n keys
+    (`type`, `content`, `additional_kwargs`, `response_metadata`) are kept so
+    n8n/LangChain readers of the table keep working.
+    """
+
+    metadata = decoded.get("metadata") if isinstance(decoded.get("metadata"), dict) else {}
+    hot = {
+        key: metadata[key]
+        for key in HOT_METADATA_KEYS
+        if metadata.get(key) not in (None, {}, [])
+    }
+    cold = {key: value for key, value in metadata.items() if key not in HOT_METADATA_KEYS}
+    compact: Dict[str, Any] = {
+        "type": decoded.get("type") or "human",
+        "content": decoded.get("content"),
+        "additional_kwargs": {},
+        "response_metadata": {},
+        "v": HISTORY_FORMAT_VERSION,
+    }
+    if hot:
+        compact["metadata"] = hot
+    return compact, cold
+
+
+@instrument_repository("chat_history")
 class ChatHistoryRepository:
     """Lightweight wrapper around Supabase chat history storage."""
 
@@ -19,66 +54,98 @@ class ChatHistoryRepository:
         self._table = table
 
     def fetch_history(self, session_id: str, limit: int = 30) -> List[Dict[str, Any]]:
+        """Return the latest `limit` messages of the session in chronological order.
+
+        Reads `(session_id, id)` backwards with the index documented in
+        `docs/tables_completas_supabase.md` and reverses the page locally.
+        """
+
+        rows = self._select(
+            "No se pudo recuperar el historial de chat para session_id=%s",
+            session_id,
+            lambda query: query.order("id", desc=True).limit(limit),
+        )
+        rows.reverse()
+        return [self._parse_row(row) for row in rows]
+
+    def fetch_history_after(
+        self,
+        session_id: str,
+        after_id: Any,
+        limit: int = 30,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page: messages with `id > after_id`, oldest first (incremental reads)."""
+
+        if after_id is None:
+            return self.fetch_history(session_id, limit=limit)
+        rows = self._select(
+            "No se pudo recuperar el historial incremental para session_id=%s",
+            session_id,
+            lambda query: query.gt("id", after_id).order("id", desc=False).limit(limit),
+        )
+        return [self._parse_row(row) for row in rows]
+
+    def _select(
+        self,
+        error: str,
+        session_id: str,
+        refine: Callable[[Any], Any],
+    ) -> List[Dict[str, Any]]:
         try:
-            query = (
-                self._client.table(self._table)
-                .select("*")
-                .eq("session_id", session_id)
-                .order("id", desc=False)
-                .limit(limit)
-            )
-            response = query.execute()
+            query = self._client.table(self._table).select("*").eq("session_id", session_id)
+            response = refine(query).execute()
         except Exception:  # pragma: no cover - logging only
-            logger.exception(
-                "No se pudo recuperar el historial de chat para session_id=%s",
-                session_id,
-            )
+            logger.exception(error, session_id)
             return []
 
         data = getattr(response, "data", None)
         if not isinstance(data, list):
             return []
+        return [row for row in data if isinstance(row, dict)]
 
-        entries: List[Dict[str, Any]] = []
-        for row in data:
-            raw_message = row.get("message")
-            role = row.get("sender_role")
-            content: Optional[str] = None
-            parsed: Optional[Dict[str, Any]] = None
+    @staticmethod
+    def _parse_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        raw_message = row.get("message")
+        role = row.get("sender_role")
+        content: Optional[str] = None
+        parsed: Optional[Dict[str, Any]] = None
 
-            if isinstance(raw_message, dict):
-                msg_type = str(raw_message.get("type") or "").lower()
+        if isinstance(raw_message, dict):
+            msg_type = str(raw_message.get("type") or "").lower()
+            if not role:
+                role = "assistant" if msg_type in {"ai", "assistant"} else "user"
+            content = raw_message.get("content")
+            parsed = ChatHistoryRepository._compact(raw_message)
+        elif isinstance(raw_message, str):
+            try:
+                decoded = json.loads(raw_message)
+            except (json.JSONDecodeError, TypeError):
+                decoded = None
+            if isinstance(decoded, dict):
+                msg_type = str(decoded.get("type") or "").lower()
                 if not role:
                     role = "assistant" if msg_type in {"ai", "assistant"} else "user"
-                content = raw_message.get("content")
-                parsed = raw_message
-            elif isinstance(raw_message, str):
-                try:
-                    decoded = json.loads(raw_message)
-                except (json.JSONDecodeError, TypeError):
-                    decoded = None
-                if isinstance(decoded, dict):
-                    msg_type = str(decoded.get("type") or "").lower()
-                    if not role:
-                        role = "assistant" if msg_type in {"ai", "assistant"} else "user"
-                    content = decoded.get("content")
-                    parsed = decoded
-                else:
-                    content = raw_message
-
-            if not role:
-                role = "user"
-
-            entries.append(
-                {
-                    "id": row.get("id"),
-                    "sender_role": role,
-                    "message": content,
-                    "raw_message": parsed or raw_message,
-                }
-            )
+                content = decoded.get("content")
+                parsed = ChatHistoryRepository._compact(decoded)
+            else:
+                content = raw_message
+
+        if not role:
+            role = "user"
+
+        return {
+            "id": row.get("id"),
+            "sender_role": role,
+            "message": content,
+            "raw_message": parsed or raw_message,
+        }
 
-        return entries
+    @staticmethod
+    def _compact(decoded: Dict[str, Any]) -> Dict[str, Any]:
+        # Lector compatible: las filas previas a v2 se recortan al leerlas.
+        if decoded.get("v") == HISTORY_FORMAT_VERSION:
+            return decoded
+        return split_message(decoded)[0]
 
     def append_message(
         self,
@@ -87,29 +154,75 @@ class ChatHistoryRepository:
         sender_role: str,
         message: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> None:
-        message_type = "ai" if sender_role == "assistant" else "human"
-        message_payload: Dict[str, Any] = {
-            "type": message_type,
-            "content": message,
-            "additional_kwargs": {},
-            "response_metadata": {},
-        }
-        if metadata:
-            message_payload["metadata"] = metadata
+    ) -> Optional[Dict[str, Any]]:
+        """Insert a message and return it in `fetch_history` format (None on failure)."""
 
-        payload: Dict[str, Any] = {
-            "session_id": session_id,
-            "message": json.dumps(message_payload, ensure_ascii=False),
-        }
+        stored = self.append_messages(
+            [
+                {
+                    "session_id": session_id,
+                    "sender_role": sender_role,
+                    "message": message,
+                    "metadata": metadata,
+                }
+            ]
+        )
+        return stored[0] if stored else None
+
+    def append_messages(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert several messages (any sessions) in a single bulk request.
+
+        Each record has `session_id`, `sender_role`, `message` and optional
+        `metadata`. Returns the stored rows in `fetch_history` format, in the
+        same order, or an empty list when the insert fails.
+        """
+
+        payload = [
+            self._row_payload(
+                session_id=record["session_id"],
+                sender_role=record["sender_role"],
+                message=record["message"],
+                metadata=record.get("metadata"),
+            )
+            for record in records
+        ]
+        if not payload:
+            return []
 
         try:
-            self._client.table(self._table).insert(payload).execute()
+            response = self._client.table(self._table).insert(payload).execute()
         except Exception:  # pragma: no cover - logging only
             logger.exception(
                 "No se pudo persistir el mensaje en chats_history_n8n | session_id=%s",
-                session_id,
+                ",".join(sorted({row["session_id"] for row in payload})),
             )
+            return []
+
+        rows = getattr(response, "data", None)
+        if not isinstance(rows, list) or len(rows) != len(payload):
+            rows = payload
+        return [self._parse_row(row if isinstance(row, dict) else sent) for row, sent in zip(rows, payload)]
+
+    @staticmethod
+    def _row_payload(
+        *,
+        session_id: str,
+        sender_role: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        message_payload, _ = split_message(
+            {
+                "type": "ai" if sender_role == "assistant" else "human",
+                "content": message,
+                "metadata": metadata or {},
+            }
+        )
+
+        return {
+            "session_id": session_id,
+            "message": json.dumps(message_payload, ensure_ascii=False, separators=(",", ":")),
+        }
 
     def delete_last(self, session_id: str) -> None:
         try:
@@ -136,4 +249,4 @@ class ChatHistoryRepository:
             )
 
 
-__all__ = ["ChatHistoryRepository"]
+__all__ = ["ChatHistoryRepository", "HISTORY_FORMAT_VERSION", "HOT_METADATA_KEYS", "split_message"]
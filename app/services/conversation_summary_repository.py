@@ -0,0 +1,81 @@
+"""Repository helpers for the rolling conversation summaries table."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from supabase import Client
+
+from app.core.metrics import instrument_repository
+
+logger = logging.getLogger(__name__)
+
+
+@instrument_repository("conversation_summary")
+class ConversationSummaryRepository:
+    """Persist one compact running summary per `session_id`.
+
+    The table lives next to `chats_history_n8n` and stores the id of the last
+    history row folded into the summary, so later refreshes only need to look
+    at newer messages.
+    """
+
+    def __init__(self, client: Client, table: str = "chats_history_summaries") -> None:
+        self._client = client
+        self._table = table
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = (
+                self._client.table(self._table)
+                .select("session_id, summary, last_message_id, turns, updated_at")
+                .eq("session_id", session_id)
+                .limit(1)
+                .execute()
+            )
+        except Exception:  # pragma: no cover - logging only
+            logger.exception(
+                "No se pudo recuperar el resumen de conversación | session_id=%s",
+                session_id,
+            )
+            return None
+
+        rows = getattr(response, "data", None) or []
+        return rows[0] if rows else None
+
+    def upsert(
+        self,
+        *,
+        session_id: str,
+        summary: str,
+        last_message_id: Any,
+        turns: int,
+    ) -> Optional[Dict[str, Any]]:
+        payload: Dict[str, Any] = {
+            "session_id": session_id,
+            "summary": summary,
+            "last_message_id": last_message_id,
+            "turns": turns,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        try:
+            response = (
+                self._client.table(self._table)
+                .upsert(payload, on_conflict="session_id")
+                .execute()
+            )
+        except Exception:  # pragma: no cover - logging only
+            logger.exception(
+                "No se pudo guardar el resumen de conversación | session_id=%s",
+                session_id,
+            )
+            return None
+
+        rows = getattr(response, "data", None) or []
+        return rows[0] if rows else None
+
+
+__all__ = ["ConversationSummaryRepository"]
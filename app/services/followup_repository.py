@@ -5,9 +5,12 @@ from typing import Any, Dict, Iterable, List, Optional
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository("followups")
 class FollowupRepository:
     """Helpers to maintain follow-up records for prospects and brokers."""
 
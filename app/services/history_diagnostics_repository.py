@@ -0,0 +1,86 @@
+"""Cold storage for per-turn diagnostics that used to live in chat history rows."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from supabase import Client
+
+from app.core.metrics import instrument_repository
+
+logger = logging.getLogger(__name__)
+
+
+def _row(session_id: str, turn_id: str, diagnostics: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "session_id": session_id,
+        "turn_id": turn_id,
+        "diagnostics": diagnostics,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@instrument_repository("history_diagnostics")
+class HistoryDiagnosticsRepository:
+    """One row per turn with `subagents`/`postprocess`, linked by `turn_id`.
+
+    The hot `chats_history_n8n` row only keeps the `turn` id, so prompts and
+    caches never download this payload.
+    """
+
+    def __init__(self, client: Client, table: str = "chats_history_diagnostics") -> None:
+        self._client = client
+        self._table = table
+
+    def record(self, *, session_id: str, turn_id: str, diagnostics: Dict[str, Any]) -> None:
+        try:
+            self._client.table(self._table).insert(
+                _row(session_id, turn_id, diagnostics)
+            ).execute()
+        except Exception:  # pragma: no cover - logging only
+            logger.exception(
+                "No se pudo guardar el diagnóstico del turno | session_id=%s | turn=%s",
+                session_id,
+                turn_id,
+            )
+
+    def get(self, turn_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = (
+                self._client.table(self._table)
+                .select("session_id, turn_id, diagnostics, created_at")
+                .eq("turn_id", turn_id)
+                .limit(1)
+                .execute()
+            )
+        except Exception:  # pragma: no cover - logging only
+            logger.exception("No se pudo leer el diagnóstico | turn=%s", turn_id)
+            return None
+        rows = getattr(response, "data", None) or []
+        return rows[0] if rows else None
+
+
+class FileDiagnosticsSink:
+    """Alternative sink: appends the same rows to a local JSONL file."""
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, *, session_id: str, turn_id: str, diagnostics: Dict[str, Any]) -> None:
+        line = json.dumps(_row(session_id, turn_id, diagnostics), ensure_ascii=False, default=str)
+        try:
+            with self._lock:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                with self._path.open("a", encoding="utf-8") as handle:
+                    handle.write(line + "\n")
+        except OSError:  # pragma: no cover - logging only
+            logger.exception("No se pudo escribir el diagnóstico en %s", self._path)
+
+
+__all__ = ["FileDiagnosticsSink", "HistoryDiagnosticsRepository"]
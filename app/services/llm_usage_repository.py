@@ -0,0 +1,148 @@
+"""Repository for per-turn LLM usage rows and their daily rollups."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from supabase import Client
+
+from app.core.metrics import instrument_repository
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUsageReadError(RuntimeError):
+    """Raised when `llm_usage` rows cannot be read completely."""
+
+
+@instrument_repository("llm_usage")
+class LLMUsageRepository:
+    """Persist one compact row per turn in `llm_usage`.
+
+    `agents` stores `{agent: [calls, input_tokens, output_tokens, latency_ms, cost_usd]}`
+    so the row stays small while still allowing per-agent rollups.
+    """
+
+    def __init__(self, client: Client, table: str = "llm_usage") -> None:
+        self._client = client
+        self._table = table
+
+    def record_turn(
+        self,
+        *,
+        session_id: str,
+        realtor_id: Optional[str],
+        usage: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        payload: Dict[str, Any] = {
+            "session_id": session_id,
+            "realtor_id": realtor_id,
+            "calls": usage.get("calls", 0),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "latency_ms": usage.get("latency_ms", 0),
+            "cost_usd": usage.get("cost_usd", 0),
+            "agents": usage.get("agents") or {},
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            response = self._client.table(self._table).insert(payload).execute()
+        except Exception:  # pragma: no cover - logging only
+            logger.exception(
+                "No se pudo registrar el uso LLM | session_id=%s | realtor=%s",
+                session_id,
+                realtor_id,
+            )
+            return None
+
+        rows = getattr(response, "data", None) or []
+        return rows[0] if rows else None
+
+    def list_since(self, realtor_id: str, since: datetime, *, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Rows of `realtor_id` since `since`, read in keyset pages ordered by `id`.
+
+        PostgREST truncates every response at its `max-rows` (1000 by default),
+        so a single select would silently under-report busy realtors. Reading
+        stops at the first empty page, whatever that limit is configured to.
+        A failed page raises `LLMUsageReadError`: a partial sum would look
+        like real (lower) usage.
+        """
+
+        rows: List[Dict[str, Any]] = []
+        after: Optional[int] = None
+        while True:
+            query = (
+                self._client.table(self._table)
+                .select("id, realtor_id, calls, input_tokens, output_tokens, latency_ms, cost_usd, agents, created_at")
+                .eq("realtor_id", realtor_id)
+                .gte("created_at", since.isoformat())
+            )
+            if after is not None:
+                query = query.gt("id", after)
+            try:
+                response = query.order("id").limit(page_size).execute()
+            except Exception as exc:
+                logger.exception("No se pudo leer el uso LLM | realtor=%s | after=%s", realtor_id, after)
+                raise LLMUsageReadError("No se pudo leer el uso LLM") from exc
+            page = getattr(response, "data", None) or []
+            if not page:
+                return rows
+            rows.extend(page)
+            after = page[-1]["id"]
+
+    def rollup(self, realtor_id: str, since: datetime) -> Dict[str, Any]:
+        """Aggregate tokens, calls, latency and cost per day and agent."""
+
+        return rollup_usage_rows(self.list_since(realtor_id, since))
+
+
+def rollup_usage_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    buckets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    totals = {"turns": 0, "calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_ms": 0.0, "cost_usd": 0.0}
+
+    for row in rows:
+        day = str(row.get("created_at") or "")[:10]
+        totals["turns"] += 1
+        agents = row.get("agents") or {}
+        for agent, values in agents.items():
+            if not isinstance(values, (list, tuple)) or len(values) < 5:
+                continue
+            calls, input_tokens, output_tokens, latency_ms, cost = values[:5]
+            bucket = buckets.setdefault(
+                (day, agent),
+                {
+                    "day": day,
+                    "agent": agent,
+                    "calls": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "latency_ms": 0.0,
+                    "cost_usd": 0.0,
+                },
+            )
+            bucket["calls"] += int(calls)
+            bucket["input_tokens"] += int(input_tokens)
+            bucket["output_tokens"] += int(output_tokens)
+            bucket["latency_ms"] += float(latency_ms)
+            bucket["cost_usd"] += float(cost)
+            totals["calls"] += int(calls)
+            totals["input_tokens"] += int(input_tokens)
+            totals["output_tokens"] += int(output_tokens)
+            totals["latency_ms"] += float(latency_ms)
+            totals["cost_usd"] += float(cost)
+
+    items = []
+    for bucket in sorted(buckets.values(), key=lambda item: (item["day"], item["agent"])):
+        bucket["avg_latency_ms"] = round(bucket["latency_ms"] / bucket["calls"], 1) if bucket["calls"] else 0.0
+        bucket["latency_ms"] = round(bucket["latency_ms"], 1)
+        bucket["cost_usd"] = round(bucket["cost_usd"], 6)
+        items.append(bucket)
+
+    totals["latency_ms"] = round(totals["latency_ms"], 1)
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    return {"items": items, "totals": totals}
+
+
+__all__ = ["LLMUsageReadError", "LLMUsageRepository", "rollup_usage_rows"]
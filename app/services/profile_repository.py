@@ -5,9 +5,12 @@ from typing import Any, Dict, List, Optional
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository("profiles")
 class ProfileRepository:
     """Helpers to fetch broker profiles associated to a realtor."""
 
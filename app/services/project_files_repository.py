@@ -5,9 +5,12 @@ from typing import Any, Dict, List
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository("project_files")
 class ProjectFilesRepository:
     """Helpers to fetch project files stored in Supabase."""
 
@@ -4,12 +4,19 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
+if TYPE_CHECKING:  # pragma: no cover
+    from broky.outbox.outbox import Outbox
+
 logger = logging.getLogger(__name__)
 
+INTEREST_LINK_OP = "interest.link"
+
 
 @dataclass
 class ProjectInterestOperationResult:
@@ -21,6 +28,7 @@ class ProjectInterestOperationResult:
     project_records: List[Dict[str, Any]]
 
 
+@instrument_repository("project_interest")
 class ProjectInterestService:
     """Encapsulates CRUD helpers for `prospect_project_interests`."""
 
@@ -30,10 +38,12 @@ class ProjectInterestService:
         *,
         interest_table: str = "prospect_project_interests",
         project_table: str = "projects",
+        outbox: Optional["Outbox"] = None,
     ) -> None:
         self._client = client
         self._interest_table = interest_table
         self._project_table = project_table
+        self._outbox = outbox
 
     def link_projects(
         self,
@@ -57,7 +67,15 @@ class ProjectInterestService:
         already_linked = list(existing_ids)
 
         added_ids: List[str] = []
-        if to_insert:
+        if to_insert and self._outbox is not None:
+            # Las lecturas de validación siguen en línea; el insert va al outbox.
+            self._outbox.enqueue(
+                INTEREST_LINK_OP,
+                {"prospect_id": prospect_id, "project_ids": to_insert},
+                key=prospect_id,
+            )
+            added_ids = to_insert
+        elif to_insert:
             payload = [
                 {"prospect_id": prospect_id, "project_id": project_id}
                 for project_id in to_insert
@@ -85,6 +103,17 @@ class ProjectInterestService:
             project_records=[project for project in valid_projects if project["id"] in valid_ids],
         )
 
+    def insert_links(self, *, prospect_id: str, project_ids: Sequence[str]) -> List[str]:
+        """Idempotent insert used by the outbox: skips existing links, raises on failure."""
+
+        existing = self._fetch_existing_links(prospect_id, project_ids)
+        missing = [project_id for project_id in project_ids if project_id not in existing]
+        if missing:
+            self._client.table(self._interest_table).insert(
+                [{"prospect_id": prospect_id, "project_id": project_id} for project_id in missing]
+            ).execute()
+        return missing
+
     def unlink_projects(
         self,
         *,
@@ -203,4 +232,4 @@ def _chunk_list(items: List[str], *, size: int) -> List[List[str]]:
     return [items[i : i + size] for i in range(0, len(items), size)]
 
 
-__all__ = ["ProjectInterestService", "ProjectInterestOperationResult"]
+__all__ = ["INTEREST_LINK_OP", "ProjectInterestService", "ProjectInterestOperationResult"]
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository("projects")
 class ProjectRepository:
     """Helpers to fetch projects linked to a prospect."""
 
@@ -81,3 +84,60 @@ class ProjectRepository:
         if isinstance(data, list):
             return data
         return []
+
+    def list_catalog(self, realtor_id: str) -> List[Dict[str, Any]]:
+        """Return the full rows of the realtor's active projects (RAG indexes)."""
+
+        try:
+            response = (
+                self._client.table("projects")
+                .select("*")
+                .eq("realtor_id", realtor_id)
+                .eq("is_active", True)
+                .execute()
+            )
+        except Exception:  # pragma: no cover - log and continue
+            logger.exception(
+                "No se pudo recuperar el catálogo de proyectos para realtor_id=%s",
+                realtor_id,
+            )
+            return []
+
+        data = getattr(response, "data", None)
+        if isinstance(data, list):
+            return data
+        return []
+
+    def catalog_page(
+        self,
+        realtor_id: str,
+        *,
+        after: Optional[str] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Next page of active projects ordered by `id` (keyset pagination).
+
+        Unlike the other helpers it re-raises: the ingestion pipeline must not
+        mistake a failed read for the end of the catalog.
+        """
+
+        query = (
+            self._client.table("projects")
+            .select("*")
+            .eq("realtor_id", realtor_id)
+            .eq("is_active", True)
+        )
+        if after is not None:
+            query = query.gt("id", after)
+        try:
+            response = query.order("id").limit(limit).execute()
+        except Exception:
+            logger.exception(
+                "No se pudo leer la página del catálogo | realtor_id=%s | after=%s",
+                realtor_id,
+                after,
+            )
+            raise
+
+        data = getattr(response, "data", None)
+        return data if isinstance(data, list) else []
@@ -5,9 +5,12 @@ from typing import Any, Dict, List
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository("properties")
 class PropertyRepository:
     """Helpers to fetch properties associated to a prospect."""
 
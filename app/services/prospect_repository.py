@@ -5,9 +5,12 @@ from typing import Any, Dict, Optional
 
 from supabase import Client
 
+from app.core.metrics import instrument_repository
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository("prospects")
 class ProspectRepository:
     """Encapsulates CRUD operations for the `prospects` table."""
 
@@ -5,13 +5,40 @@ from .vector_client import (
     VectorSearchClient,
     VectorSearchResult,
     VectorSearchServiceError,
+    aclose_vector_http_client,
+    close_vector_http_client,
+    get_async_vector_http_client,
+    get_vector_http_client,
 )
-from .context_formatter import format_rag_context
+from .answer_cache import SemanticAnswerCache, get_answer_cache
+from .context_formatter import PackedContext, format_rag_context, pack_rag_context
+from .embeddings import EmbeddingClient, EmbeddingServiceError
+from .lexical_index import LexicalIndex, fuse_results, get_lexical_index
+from .local_index import LocalVectorIndex, build_realtor_index, get_local_index
+from .retrieval_cache import RetrievalCache, get_retrieval_cache
 
 __all__ = [
+    "EmbeddingClient",
+    "EmbeddingServiceError",
+    "LexicalIndex",
+    "LocalVectorIndex",
+    "PackedContext",
     "RAGService",
+    "RetrievalCache",
+    "SemanticAnswerCache",
     "VectorSearchClient",
     "VectorSearchResult",
     "VectorSearchServiceError",
+    "aclose_vector_http_client",
+    "build_realtor_index",
+    "close_vector_http_client",
     "format_rag_context",
+    "fuse_results",
+    "get_answer_cache",
+    "get_async_vector_http_client",
+    "get_lexical_index",
+    "get_local_index",
+    "get_retrieval_cache",
+    "get_vector_http_client",
+    "pack_rag_context",
 ]
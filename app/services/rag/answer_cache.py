@@ -0,0 +1,156 @@
+"""Per-realtor semantic cache of final RAG answers (frequent questions)."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.metrics import count_cache
+
+CACHE_NAME = "rag.answer"
+
+
+def context_fingerprint(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    context_hash: str
+    answer: Dict[str, Any]
+    expires_at: float
+    last_used: float
+
+
+@dataclass
+class _Bucket:
+    entries: List[_Entry] = field(default_factory=list)
+    matrix: Optional[np.ndarray] = None
+
+    def rebuild(self) -> None:
+        self.matrix = np.vstack([entry.vector for entry in self.entries]) if self.entries else None
+
+
+class SemanticAnswerCache:
+    """Respuestas RAG por realtor, indexadas por el embedding de la consulta.
+
+    Un acierto exige coseno >= `threshold` con una consulta ya respondida y el
+    mismo hash del contexto recuperado: si el catálogo cambió, el contexto
+    cambia y la entrada deja de servir aunque la pregunta sea idéntica. Cada
+    realtor guarda hasta `max_entries` respuestas (se descarta la usada hace
+    más tiempo) durante `ttl` segundos. Los vectores llegan L2-normalizados
+    (`EmbeddingClient`), así que el coseno es un producto punto.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.92,
+        ttl: float = 3600.0,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = threshold
+        self._ttl = ttl
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def size(self, realtor_id: str) -> int:
+        with self._lock:
+            bucket = self._buckets.get(str(realtor_id))
+            return 0 if bucket is None else len(bucket.entries)
+
+    def lookup(self, realtor_id: str, query_vector: np.ndarray, context_hash: str) -> Optional[Dict[str, Any]]:
+        """Cached answer for a similar question over the same context, or None."""
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        result = "miss"
+        answer: Optional[Dict[str, Any]] = None
+        with self._lock:
+            bucket = self._buckets.get(str(realtor_id))
+            if bucket is not None:
+                self._purge_expired(bucket)
+            if bucket is not None and bucket.matrix is not None and bucket.matrix.shape[1] == query.shape[-1]:
+                scores = bucket.matrix @ query
+                for position in np.argsort(-scores):
+                    if scores[position] < self._threshold:
+                        break
+                    entry = bucket.entries[int(position)]
+                    if entry.context_hash != context_hash:
+                        # Pregunta conocida pero el contexto cambió: la respuesta ya no vale.
+                        result = "stale"
+                        continue
+                    entry.last_used = self._clock()
+                    answer = copy.deepcopy(entry.answer)
+                    result = "hit"
+                    break
+        count_cache(CACHE_NAME, result)
+        return answer
+
+    def store(self, realtor_id: str, query_vector: np.ndarray, context_hash: str, answer: Dict[str, Any]) -> None:
+        now = self._clock()
+        entry = _Entry(
+            vector=np.array(query_vector, dtype=np.float32, copy=True),
+            context_hash=context_hash,
+            answer=copy.deepcopy(answer),
+            expires_at=now + self._ttl,
+            last_used=now,
+        )
+        with self._lock:
+            bucket = self._buckets.setdefault(str(realtor_id), _Bucket())
+            if bucket.entries and bucket.entries[0].vector.shape != entry.vector.shape:
+                # Cambió el modelo de embeddings: lo anterior no es comparable.
+                bucket.entries.clear()
+            self._purge_expired(bucket, rebuild=False)
+            bucket.entries.append(entry)
+            if len(bucket.entries) > self._max_entries:
+                bucket.entries.remove(min(bucket.entries, key=lambda item: item.last_used))
+            bucket.rebuild()
+
+    def invalidate_realtor(self, realtor_id: str) -> int:
+        """Drop every answer of `realtor_id`; returns how many were removed."""
+
+        with self._lock:
+            bucket = self._buckets.pop(str(realtor_id), None)
+        return 0 if bucket is None else len(bucket.entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def _purge_expired(self, bucket: _Bucket, *, rebuild: bool = True) -> None:
+        now = self._clock()
+        alive = [entry for entry in bucket.entries if entry.expires_at > now]
+        if len(alive) != len(bucket.entries):
+            bucket.entries = alive
+            if rebuild:
+                bucket.rebuild()
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Caché semántica compartida del proceso, o None si `RAG_ANSWER_CACHE_ENABLED` está apagado."""
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    if not settings.rag_answer_cache_enabled:
+        return None
+    return SemanticAnswerCache(
+        threshold=settings.rag_answer_cache_threshold,
+        ttl=settings.rag_answer_cache_ttl_seconds,
+        max_entries=settings.rag_answer_cache_max_entries,
+    )
+
+
+__all__ = ["SemanticAnswerCache", "context_fingerprint", "get_answer_cache"]
@@ -0,0 +1,51 @@
+"""Text and metadata derived from `projects` rows for the local RAG indexes."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+DOCUMENT_FIELDS = ("name_property", "type", "location", "status")
+
+
+def format_prices(row: Dict[str, Any]) -> str:
+    """Compact text for the `prices` jsonb column (any shape) plus the currency."""
+
+    prices = row.get("prices")
+    if prices in (None, "", [], {}):
+        return ""
+    if isinstance(prices, (dict, list)):
+        text = json.dumps(prices, ensure_ascii=False, separators=(", ", ": "))
+    else:
+        text = str(prices)
+    currency = str(row.get("currency") or "").strip()
+    return f"{text} {currency}".strip()
+
+
+def project_metadata(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata in the shape the context formatters expect from the vector service."""
+
+    metadata: Dict[str, Any] = {
+        "project_name": row.get("name_property"),
+        "location": row.get("location"),
+        "type": row.get("type"),
+        "status": row.get("status"),
+        "price": format_prices(row) or None,
+        "realtor_id": row.get("realtor_id"),
+        "updated_at": row.get("updated_at"),
+    }
+    return {key: value for key, value in metadata.items() if value not in (None, "")}
+
+
+def project_document(row: Dict[str, Any]) -> str:
+    """Text that represents a project for embedding and lexical search."""
+
+    parts: List[str] = [str(row.get(field) or "").strip() for field in DOCUMENT_FIELDS]
+    prices = format_prices(row)
+    if prices:
+        parts.append(f"Precios: {prices}")
+    parts.append(str(row.get("description") or "").strip())
+    return "\n".join(part for part in parts if part)
+
+
+__all__ = ["format_prices", "project_document", "project_metadata"]
@@ -2,10 +2,48 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from app.services.rag.text import clean_text, split_sentences
+from app.services.rag.tokens import count_tokens
 from app.services.rag.vector_client import VectorSearchResult
 
+# Frases más largas se cortan por palabras para que el presupuesto no descarte
+# una descripción entera por no tener puntuación.
+MAX_SENTENCE_CHARS = 320
+
+
+@dataclass
+class PackedProject:
+    project_id: str
+    name: str
+    score: float
+    summary: str
+    details: List[str] = field(default_factory=list)
+
+    def render(self, position: int) -> str:
+        lines = [f"Proyecto #{position}: {self.summary}"]
+        if self.details:
+            lines.append(" ".join(self.details))
+        return "\n".join(lines)
+
+
+@dataclass
+class PackedContext:
+    text: str
+    projects: List[PackedProject]
+    tokens: int
+    omitted: int = 0
+    truncated: bool = False
+
+    @property
+    def sources(self) -> List[Dict[str, Any]]:
+        return [
+            {"project_id": project.project_id, "name": project.name, "score": project.score}
+            for project in self.projects
+        ]
+
 
 def format_rag_context(results: Iterable[VectorSearchResult]) -> str:
     """Return a human-readable context block for the language model."""
@@ -54,6 +92,105 @@ def format_rag_context(results: Iterable[VectorSearchResult]) -> str:
     return "\n\n".join(f"Proyecto #{idx}\n{block}" for idx, block in enumerate(formatted_sections, start=1))
 
 
+def pack_rag_context(
+    results: Iterable[VectorSearchResult],
+    *,
+    max_tokens: int,
+    model: Optional[str] = None,
+) -> PackedContext:
+    """Compact, token-bounded context: one block per project, best scores first.
+
+    Chunks of the same `project_id` are merged (metadata of the best chunk
+    wins, missing keys come from the others) and their sentences deduplicated,
+    which also drops the header lines every ingested chunk repeats. The budget
+    is filled in two passes: first the one-line summary of as many projects as
+    fit, then description sentences project by project. `max_tokens <= 0`
+    disables the bound.
+    """
+
+    budget = max_tokens if max_tokens > 0 else None
+    projects = _merge_projects(results)
+
+    used = 0
+    packed: List[PackedProject] = []
+    pending: List[List[str]] = []
+    for project, sentences in projects:
+        cost = count_tokens(project.summary, model) + 4
+        if budget is not None and packed and used + cost > budget:
+            break
+        used += cost
+        packed.append(project)
+        pending.append(sentences)
+
+    truncated = False
+    for project, sentences in zip(packed, pending):
+        for sentence in sentences:
+            cost = count_tokens(sentence, model) + 1
+            if budget is not None and used + cost > budget:
+                truncated = True
+                break
+            used += cost
+            project.details.append(sentence)
+
+    text = "\n\n".join(project.render(position) for position, project in enumerate(packed, start=1))
+    return PackedContext(
+        text=text,
+        projects=packed,
+        tokens=count_tokens(text, model),
+        omitted=len(projects) - len(packed),
+        truncated=truncated,
+    )
+
+
+def _merge_projects(results: Iterable[VectorSearchResult]) -> List[Tuple[PackedProject, List[str]]]:
+    grouped: Dict[str, List[VectorSearchResult]] = {}
+    for result in sorted(results, key=lambda item: item.score, reverse=True):
+        grouped.setdefault(str(result.project_id), []).append(result)
+
+    merged: List[Tuple[PackedProject, List[str]]] = []
+    for index, (project_id, chunks) in enumerate(grouped.items(), start=1):
+        metadata: Dict[str, Any] = {}
+        for chunk in chunks:
+            for key, value in (chunk.metadata or {}).items():
+                if value not in (None, "") and key not in metadata:
+                    metadata[key] = value
+
+        name = _first_non_empty(
+            metadata.get("project_name"),
+            metadata.get("name"),
+            metadata.get("title"),
+            metadata.get("property_name"),
+            f"Proyecto {index}",
+        )
+        facts = [
+            _combine_values(metadata.get("location"), metadata.get("city")),
+            _first_non_empty(metadata.get("property_type"), metadata.get("type")),
+            _first_non_empty(metadata.get("status"), metadata.get("state")),
+        ]
+        price = metadata.get("price") or metadata.get("starting_price")
+        if price:
+            facts.append(f"desde {price}")
+        units = metadata.get("units") or metadata.get("available_units")
+        if units:
+            facts.append(f"{units} unidades disponibles")
+        summary = " | ".join([name] + [fact for fact in facts if fact])
+
+        # Lo que ya está en el resumen (nombre, tipo, ubicación...) no se repite.
+        seen = {clean_text(str(value)) for value in [name, *facts, *metadata.values()] if value}
+        sentences: List[str] = []
+        for chunk in chunks:
+            text = chunk.content or str(metadata.get("description") or "")
+            for sentence in split_sentences(text, max_chars=MAX_SENTENCE_CHARS):
+                key = clean_text(sentence)
+                if not key or key in seen or sentence.startswith("Precios:"):
+                    continue
+                seen.add(key)
+                sentences.append(sentence)
+
+        merged.append((PackedProject(project_id, name, round(chunks[0].score, 4), summary), sentences))
+    return merged
+
+
 def _first_non_empty(*values: str | None) -> str:
     for value in values:
         if value:
@@ -73,4 +210,4 @@ def _combine_values(*values: str | None) -> str:
     return ", ".join(parts)
 
 
-__all__ = ["format_rag_context"]
+__all__ = ["PackedContext", "PackedProject", "format_rag_context", "pack_rag_context"]
@@ -0,0 +1,82 @@
+"""Embeddings through the shared OpenAI client (`OPENAI_EMBEDDINGS_MODEL`)."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import Settings
+from broky.llm import get_llm_factory
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_AGENT = "embeddings"
+
+
+class EmbeddingServiceError(RuntimeError):
+    """Raised when the embeddings endpoint cannot produce vectors."""
+
+
+class EmbeddingClient:
+    """Calcula embeddings en lotes y los devuelve como matriz float32 L2-normalizada.
+
+    Normalizar al calcular permite que el coseno sea un producto punto tanto en
+    el índice local como en la caché semántica.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        client: Optional[Any] = None,
+        model: Optional[str] = None,
+        batch_size: int = 256,
+    ) -> None:
+        self._factory = get_llm_factory()
+        self._client = client or self._factory.openai_client(api_key=settings.openai_api_key)
+        self._model = model or settings.openai_embeddings_model
+        self._batch_size = max(1, batch_size)
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self._client is None:
+            raise EmbeddingServiceError("Cliente OpenAI no configurado para embeddings")
+
+        rows: List[List[float]] = []
+        for start in range(0, len(texts), self._batch_size):
+            batch = [text or " " for text in texts[start : start + self._batch_size]]
+            try:
+                with self._factory.track(
+                    EMBEDDINGS_AGENT, model=self._model, circuit=self._factory.embeddings_circuit
+                ) as call:
+                    response = self._client.embeddings.create(model=self._model, input=batch)
+                    call.add_usage(getattr(response, "usage", None))
+            except Exception as exc:
+                raise EmbeddingServiceError("No se pudieron calcular los embeddings") from exc
+            ordered = sorted(response.data, key=lambda item: item.index)
+            rows.extend(item.embedding for item in ordered)
+        return normalize_rows(np.asarray(rows, dtype=np.float32))
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place (zero rows are left as-is)."""
+
+    if matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+__all__ = ["EmbeddingClient", "EmbeddingServiceError", "normalize_rows"]
@@ -0,0 +1,445 @@
+"""Incremental embedding ingestion of the `projects` catalog into a chunk store."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.rag.catalog import format_prices, project_metadata
+from app.services.rag.local_index import LocalVectorIndex
+from app.services.rag.text import split_sentences
+
+logger = logging.getLogger(__name__)
+
+HEADER_FIELDS = ("name_property", "type", "location", "status")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    id: str
+    project_id: str
+    index: int
+    content: str
+    metadata: Dict[str, Any]
+    content_hash: str
+
+
+class Embedder(Protocol):
+    model: str
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class ChunkStore(Protocol):
+    """Destination of the pipeline: one row per chunk with its content hash."""
+
+    def existing_hashes(self, realtor_id: str) -> Dict[str, str]: ...
+
+    def upsert(self, realtor_id: str, chunks: Sequence[Chunk], vectors: np.ndarray, *, model: str) -> None: ...
+
+    def delete(self, realtor_id: str, chunk_ids: Sequence[str]) -> None: ...
+
+
+def split_text(text: str, *, max_chars: int, overlap: int) -> List[str]:
+    """Pack sentences into pieces of up to `max_chars`, repeating ~`overlap` chars between pieces."""
+
+    sentences = split_sentences(text, max_chars=max_chars)
+
+    pieces: List[str] = []
+    current: List[str] = []
+    for sentence in sentences:
+        if current and len(" ".join(current + [sentence])) > max_chars:
+            pieces.append(" ".join(current))
+            carried: List[str] = []
+            for previous in reversed(current):
+                if len(" ".join([previous] + carried + [sentence])) > min(overlap, max_chars):
+                    break
+                carried.insert(0, previous)
+            current = carried
+        current.append(sentence)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def project_chunks(row: Dict[str, Any], *, model: str, max_chars: int = 1000, overlap: int = 150) -> List[Chunk]:
+    """Chunks of one `projects` row: a header (name, type, location, prices) plus each description piece.
+
+    Every chunk repeats the header so it is retrievable on its own; the hash
+    covers the embeddings model, the text and the metadata, so changing any of
+    them forces a re-embed.
+    """
+
+    project_id = str(row["id"])
+    header = [str(row.get(name) or "").strip() for name in HEADER_FIELDS]
+    prices = format_prices(row)
+    if prices:
+        header.append(f"Precios: {prices}")
+    header_text = "\n".join(part for part in header if part)
+    metadata = project_metadata(row)
+
+    pieces = split_text(str(row.get("description") or ""), max_chars=max_chars, overlap=overlap) or [""]
+    chunks: List[Chunk] = []
+    for index, piece in enumerate(pieces):
+        content = "\n".join(part for part in (header_text, piece) if part)
+        fingerprint = json.dumps([model, content, metadata], ensure_ascii=False, sort_keys=True, default=str)
+        chunks.append(
+            Chunk(
+                id=f"{project_id}#{index}",
+                project_id=project_id,
+                index=index,
+                content=content,
+                metadata=dict(metadata, chunk=index),
+                content_hash=hashlib.sha256(fingerprint.encode("utf-8")).hexdigest(),
+            )
+        )
+    return chunks
+
+
+class LocalChunkStore:
+    """`ChunkStore` backed by `LocalVectorIndex` (the files read by `RAG_LOCAL_INDEX_MODE`).
+
+    Each upsert rewrites the realtor's matrix; catalogs are small enough that
+    this is cheaper than managing holes in the memmap.
+    """
+
+    def __init__(self, index: LocalVectorIndex) -> None:
+        self._index = index
+
+    def existing_hashes(self, realtor_id: str) -> Dict[str, str]:
+        snapshot = self._index.snapshot(realtor_id)
+        if snapshot is None:
+            return {}
+        hashes = {}
+        for entry in snapshot[1]:
+            entry_id = _entry_id(entry)
+            if entry_id:
+                hashes[entry_id] = str(entry.get("content_hash") or "")
+        return hashes
+
+    def upsert(self, realtor_id: str, chunks: Sequence[Chunk], vectors: np.ndarray, *, model: str) -> None:
+        if not chunks:
+            return
+        current, entries = self._current(realtor_id, model=model, dimensions=int(vectors.shape[1]))
+        positions = {_entry_id(entry): position for position, entry in enumerate(entries)}
+        appended: List[np.ndarray] = []
+        for chunk, vector in zip(chunks, vectors):
+            entry = {
+                "id": chunk.id,
+                "project_id": chunk.project_id,
+                "content": chunk.content,
+                "metadata": chunk.metadata,
+                "content_hash": chunk.content_hash,
+            }
+            position = positions.get(chunk.id)
+            if position is None:
+                positions[chunk.id] = len(entries)
+                entries.append(entry)
+                appended.append(vector)
+            else:
+                entries[position] = entry
+                current[position] = vector
+        if appended:
+            current = np.vstack([current, np.asarray(appended, dtype=np.float32)])
+        self._index.write(realtor_id, current, entries, model=model)
+
+    def delete(self, realtor_id: str, chunk_ids: Sequence[str]) -> None:
+        snapshot = self._index.snapshot(realtor_id)
+        if snapshot is None or not chunk_ids:
+            return
+        vectors, entries, model = snapshot
+        drop = set(chunk_ids)
+        keep = [position for position, entry in enumerate(entries) if _entry_id(entry) not in drop]
+        self._index.write(
+            realtor_id,
+            vectors[keep] if len(keep) else np.zeros((0, 0), dtype=np.float32),
+            [entries[position] for position in keep],
+            model=model or "",
+        )
+
+    def _current(
+        self, realtor_id: str, *, model: str, dimensions: int
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        snapshot = self._index.snapshot(realtor_id)
+        if snapshot is not None:
+            vectors, entries, stored_model = snapshot
+            if entries and stored_model == model and vectors.shape[1] == dimensions:
+                return vectors, entries
+            if entries:
+                logger.info(
+                    "Índice local con otro modelo; se reconstruye | realtor=%s | antes=%s | ahora=%s",
+                    realtor_id,
+                    stored_model,
+                    model,
+                )
+        return np.zeros((0, dimensions), dtype=np.float32), []
+
+
+def _entry_id(entry: Dict[str, Any]) -> str:
+    """Chunk id of a local index entry.
+
+    Indexes written by `build_realtor_index` have one entry per project and no
+    chunk id; they are keyed by `project_id`, which never matches a chunk id
+    (`<project>#<n>`), so the next ingestion reports them as stale and deletes
+    them instead of serving them forever.
+    """
+
+    return str(entry.get("id") or entry.get("project_id") or "")
+
+
+class SupabaseChunkStore:
+    """`ChunkStore` over the pgvector table `VECTOR_TABLE_NAME` (one row per chunk)."""
+
+    def __init__(self, client: Any, table: str = "vector_projects", *, write_batch: int = 100) -> None:
+        self._client = client
+        self._table = table
+        self._write_batch = max(1, write_batch)
+
+    def existing_hashes(self, realtor_id: str, *, page_size: int = 1000) -> Dict[str, str]:
+        hashes: Dict[str, str] = {}
+        after: Optional[str] = None
+        while True:
+            query = self._client.table(self._table).select("id, content_hash").eq("realtor_id", realtor_id)
+            if after is not None:
+                query = query.gt("id", after)
+            rows = getattr(query.order("id").limit(page_size).execute(), "data", None) or []
+            for row in rows:
+                hashes[str(row["id"])] = str(row.get("content_hash") or "")
+            if len(rows) < page_size:
+                return hashes
+            after = str(rows[-1]["id"])
+
+    def upsert(self, realtor_id: str, chunks: Sequence[Chunk], vectors: np.ndarray, *, model: str) -> None:
+        rows = [
+            {
+                "id": chunk.id,
+                "realtor_id": realtor_id,
+                "project_id": chunk.project_id,
+                "chunk_index": chunk.index,
+                "content": chunk.content,
+                "metadata": chunk.metadata,
+                "content_hash": chunk.content_hash,
+                "embedding_model": model,
+                "embedding": [round(float(value), 7) for value in vector],
+            }
+            for chunk, vector in zip(chunks, vectors)
+        ]
+        for start in range(0, len(rows), self._write_batch):
+            self._client.table(self._table).upsert(rows[start : start + self._write_batch], on_conflict="id").execute()
+
+    def delete(self, realtor_id: str, chunk_ids: Sequence[str]) -> None:
+        ids = list(chunk_ids)
+        for start in range(0, len(ids), self._write_batch):
+            (
+                self._client.table(self._table)
+                .delete()
+                .eq("realtor_id", realtor_id)
+                .in_("id", ids[start : start + self._write_batch])
+                .execute()
+            )
+
+
+class IngestCheckpoint:
+    """JSON file with per-realtor progress (`after` project id, seen chunks, done).
+
+    It is written after every page, so an interrupted run resumes from the last
+    stored page when re-run with the same file, and it is removed when a run
+    finishes. Without a path it only lives in memory.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self._path = Path(path) if path else None
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if self._path is not None and self._path.exists():
+            self._state = json.loads(self._path.read_text(encoding="utf-8")).get("realtors", {})
+
+    def get(self, realtor_id: str) -> Dict[str, Any]:
+        return dict(self._state.get(str(realtor_id)) or {})
+
+    def update(self, realtor_id: str, **values: Any) -> None:
+        self._state.setdefault(str(realtor_id), {}).update(values)
+        if self._path is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(f".{self._path.name}.tmp")
+        tmp.write_text(json.dumps({"realtors": self._state}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self._path)
+
+    def clear(self) -> None:
+        self._state = {}
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
+
+
+@dataclass
+class IngestStats:
+    realtors: int = 0
+    projects: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    characters: int = 0
+    embed_seconds: float = 0.0
+    elapsed: float = 0.0
+    per_realtor: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed or 1e-9
+        return {
+            "realtors": self.realtors,
+            "projects": self.projects,
+            "chunks": self.chunks,
+            "embedded": self.embedded,
+            "skipped": self.skipped,
+            "deleted": self.deleted,
+            "elapsed_s": round(self.elapsed, 3),
+            "embed_s": round(self.embed_seconds, 3),
+            "chunks_per_s": round(self.chunks / elapsed, 1),
+            "embedded_per_s": round(self.embedded / elapsed, 1),
+            "chars_per_s": round(self.characters / elapsed, 1),
+        }
+
+
+CatalogPager = Callable[..., List[Dict[str, Any]]]
+
+
+class CatalogIngestor:
+    """Stream `projects` per realtor, chunk, skip unchanged hashes, embed in parallel batches.
+
+    `pager(realtor_id, after=..., limit=...)` returns the next keyset page
+    (`ProjectRepository.catalog_page`). Each page is one checkpoint: its new or
+    changed chunks are embedded in batches of `batch_size` with at most
+    `concurrency` requests in flight, written to the store, and then the
+    checkpoint advances. Chunks that were not produced by a complete pass over
+    the catalog are deleted at the end of each realtor.
+    """
+
+    def __init__(
+        self,
+        pager: CatalogPager,
+        embedder: Embedder,
+        store: ChunkStore,
+        *,
+        checkpoint: Optional[IngestCheckpoint] = None,
+        page_size: int = 500,
+        batch_size: int = 128,
+        concurrency: int = 4,
+        chunk_chars: int = 1000,
+        chunk_overlap: int = 150,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._pager = pager
+        self._embedder = embedder
+        self._store = store
+        self._checkpoint = checkpoint or IngestCheckpoint()
+        self._page_size = max(1, page_size)
+        self._batch_size = max(1, batch_size)
+        self._concurrency = max(1, concurrency)
+        self._chunk_chars = max(50, chunk_chars)
+        self._chunk_overlap = max(0, chunk_overlap)
+        self._clock = clock
+
+    def run(self, realtor_ids: Iterable[str]) -> IngestStats:
+        stats = IngestStats()
+        started = self._clock()
+        with ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="rag-ingest") as executor:
+            for realtor_id in realtor_ids:
+                self._ingest_realtor(str(realtor_id), stats, executor)
+                stats.realtors += 1
+        stats.elapsed = self._clock() - started
+        self._checkpoint.clear()
+        return stats
+
+    def _ingest_realtor(self, realtor_id: str, stats: IngestStats, executor: ThreadPoolExecutor) -> None:
+        state = self._checkpoint.get(realtor_id)
+        counters = stats.per_realtor.setdefault(
+            realtor_id, {"projects": 0, "chunks": 0, "embedded": 0, "skipped": 0, "deleted": 0}
+        )
+        if state.get("done"):
+            logger.info("Realtor ya ingerido en esta corrida; se omite | realtor=%s", realtor_id)
+            return
+
+        existing = self._store.existing_hashes(realtor_id)
+        seen = set(state.get("seen") or [])
+        after: Optional[str] = state.get("after")
+        if after is not None:
+            logger.info("Reanudando ingesta | realtor=%s | after=%s", realtor_id, after)
+
+        while True:
+            rows = [row for row in self._pager(realtor_id, after=after, limit=self._page_size) if row.get("id")]
+            if not rows:
+                break
+            chunks = [
+                chunk
+                for row in rows
+                for chunk in project_chunks(
+                    row, model=self._embedder.model, max_chars=self._chunk_chars, overlap=self._chunk_overlap
+                )
+            ]
+            pending = [chunk for chunk in chunks if existing.get(chunk.id) != chunk.content_hash]
+            if pending:
+                vectors = self._embed(pending, executor, stats)
+                self._store.upsert(realtor_id, pending, vectors, model=self._embedder.model)
+
+            seen.update(chunk.id for chunk in chunks)
+            after = str(rows[-1]["id"])
+            self._checkpoint.update(realtor_id, after=after, seen=sorted(seen))
+            page = {
+                "projects": len(rows),
+                "chunks": len(chunks),
+                "embedded": len(pending),
+                "skipped": len(chunks) - len(pending),
+            }
+            for key, value in page.items():
+                counters[key] += value
+                setattr(stats, key, getattr(stats, key) + value)
+            if len(rows) < self._page_size:
+                break
+
+        stale = sorted(chunk_id for chunk_id in existing if chunk_id not in seen)
+        if stale:
+            self._store.delete(realtor_id, stale)
+        counters["deleted"] += len(stale)
+        stats.deleted += len(stale)
+        self._checkpoint.update(realtor_id, done=True, seen=[])
+        logger.info(
+            "Ingesta de embeddings completa | realtor=%s | proyectos=%s | chunks=%s | embebidos=%s | sin_cambios=%s | eliminados=%s",
+            realtor_id,
+            counters["projects"],
+            counters["chunks"],
+            counters["embedded"],
+            counters["skipped"],
+            counters["deleted"],
+        )
+
+    def _embed(self, chunks: Sequence[Chunk], executor: ThreadPoolExecutor, stats: IngestStats) -> np.ndarray:
+        texts = [chunk.content for chunk in chunks]
+        batches = [texts[start : start + self._batch_size] for start in range(0, len(texts), self._batch_size)]
+        started = self._clock()
+        # `map` conserva el orden de los lotes; el pool limita las solicitudes en vuelo.
+        matrices = list(executor.map(self._embedder.embed, batches))
+        stats.embed_seconds += self._clock() - started
+        stats.characters += sum(len(text) for text in texts)
+        return np.vstack(matrices).astype(np.float32, copy=False)
+
+
+__all__ = [
+    "CatalogIngestor",
+    "Chunk",
+    "IngestCheckpoint",
+    "IngestStats",
+    "LocalChunkStore",
+    "SupabaseChunkStore",
+    "project_chunks",
+    "split_text",
+]
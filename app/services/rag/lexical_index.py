@@ -0,0 +1,270 @@
+"""In-memory BM25 index over each realtor's `projects` catalog."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.rag.catalog import project_document, project_metadata
+from app.services.rag.text import lexical_tokens
+from app.services.rag.vector_client import VectorSearchResult
+
+logger = logging.getLogger(__name__)
+
+CatalogLoader = Callable[[str], List[Dict[str, Any]]]
+
+
+@dataclass
+class _Document:
+    terms: Counter
+    length: int
+    content: str
+    metadata: Dict[str, Any]
+    fingerprint: str
+
+
+@dataclass
+class _Lexicon:
+    documents: Dict[str, _Document] = field(default_factory=dict)
+    postings: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    total_length: int = 0
+    synced_at: Optional[float] = None
+
+
+class LexicalIndex:
+    """BM25 con índice invertido por realtor, actualizado de forma incremental.
+
+    `sync_catalog` compara una huella del texto de cada proyecto y solo
+    re-tokeniza los que cambiaron; los que ya no vienen en el catálogo se
+    eliminan. Con `loader`, `search` sincroniza el realtor la primera vez y de
+    nuevo pasados `refresh_after` segundos o tras `invalidate`.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[CatalogLoader] = None,
+        *,
+        k1: float = 1.5,
+        b: float = 0.75,
+        refresh_after: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._loader = loader
+        self._k1 = k1
+        self._b = b
+        self._refresh_after = refresh_after
+        self._clock = clock
+        self._lexicons: Dict[str, _Lexicon] = {}
+        self._lock = threading.Lock()
+
+    def sync_catalog(self, realtor_id: str, rows: Sequence[Dict[str, Any]]) -> Tuple[int, int]:
+        """Apply a full catalog snapshot; returns `(upserted, removed)`."""
+
+        seen = set()
+        upserted = 0
+        for row in rows:
+            if not row.get("id"):
+                continue
+            seen.add(str(row["id"]))
+            if self.upsert(realtor_id, row):
+                upserted += 1
+
+        with self._lock:
+            lexicon = self._lexicons.setdefault(str(realtor_id), _Lexicon())
+            stale = [doc_id for doc_id in lexicon.documents if doc_id not in seen]
+            for doc_id in stale:
+                self._remove_locked(lexicon, doc_id)
+            lexicon.synced_at = self._clock()
+        return upserted, len(stale)
+
+    def upsert(self, realtor_id: str, row: Dict[str, Any]) -> bool:
+        """Index or refresh one `projects` row; False when it was already current."""
+
+        doc_id = str(row["id"])
+        content = project_document(row)
+        metadata = project_metadata(row)
+        fingerprint = hashlib.sha1(
+            json.dumps([content, metadata], ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+        with self._lock:
+            lexicon = self._lexicons.setdefault(str(realtor_id), _Lexicon())
+            current = lexicon.documents.get(doc_id)
+            if current is not None and current.fingerprint == fingerprint:
+                return False
+            if current is not None:
+                self._remove_locked(lexicon, doc_id)
+            terms = Counter(lexical_tokens(content))
+            document = _Document(terms, sum(terms.values()), content, metadata, fingerprint)
+            lexicon.documents[doc_id] = document
+            lexicon.total_length += document.length
+            for term, frequency in terms.items():
+                lexicon.postings.setdefault(term, {})[doc_id] = frequency
+        return True
+
+    def remove(self, realtor_id: str, project_id: str) -> bool:
+        with self._lock:
+            lexicon = self._lexicons.get(str(realtor_id))
+            if lexicon is None or str(project_id) not in lexicon.documents:
+                return False
+            self._remove_locked(lexicon, str(project_id))
+            return True
+
+    def invalidate(self, realtor_id: str) -> None:
+        """Force a catalog re-sync on the next search (entries are kept until then)."""
+
+        with self._lock:
+            lexicon = self._lexicons.get(str(realtor_id))
+            if lexicon is not None:
+                lexicon.synced_at = None
+
+    def size(self, realtor_id: str) -> Optional[int]:
+        with self._lock:
+            lexicon = self._lexicons.get(str(realtor_id))
+            return None if lexicon is None else len(lexicon.documents)
+
+    def search(self, realtor_id: str, query: str, *, limit: int) -> Optional[List[VectorSearchResult]]:
+        """Top-`limit` projects by BM25 (raw scores); None when the catalog is unavailable."""
+
+        self._ensure_synced(str(realtor_id))
+        terms = set(lexical_tokens(query))
+        with self._lock:
+            lexicon = self._lexicons.get(str(realtor_id))
+            if lexicon is None:
+                return None
+            count = len(lexicon.documents)
+            if not count or not terms or limit <= 0:
+                return []
+
+            average_length = lexicon.total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = lexicon.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    length = lexicon.documents[doc_id].length
+                    norm = self._k1 * (1 - self._b + self._b * length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self._k1 + 1) / (
+                        frequency + norm
+                    )
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [
+                VectorSearchResult(
+                    project_id=doc_id,
+                    score=score,
+                    metadata=dict(lexicon.documents[doc_id].metadata),
+                    content=lexicon.documents[doc_id].content,
+                )
+                for doc_id, score in ranked
+            ]
+
+    # ------------------------------------------------------------------
+
+    def _ensure_synced(self, realtor_id: str) -> None:
+        if self._loader is None:
+            return
+        with self._lock:
+            lexicon = self._lexicons.get(realtor_id)
+            synced_at = None if lexicon is None else lexicon.synced_at
+        if synced_at is not None and self._clock() - synced_at < self._refresh_after:
+            return
+        try:
+            rows = self._loader(realtor_id)
+        except Exception:  # pragma: no cover - el loader ya registra el error
+            logger.warning("No se pudo cargar el catálogo para BM25 | realtor=%s", realtor_id, exc_info=True)
+            return
+        upserted, removed = self.sync_catalog(realtor_id, rows)
+        logger.info(
+            "Índice BM25 sincronizado | realtor=%s | proyectos=%s | actualizados=%s | eliminados=%s",
+            realtor_id,
+            len(rows),
+            upserted,
+            removed,
+        )
+
+    @staticmethod
+    def _remove_locked(lexicon: _Lexicon, doc_id: str) -> None:
+        document = lexicon.documents.pop(doc_id)
+        lexicon.total_length -= document.length
+        for term in document.terms:
+            postings = lexicon.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del lexicon.postings[term]
+
+
+def fuse_results(
+    dense: Sequence[VectorSearchResult],
+    lexical: Sequence[VectorSearchResult],
+    *,
+    alpha: float,
+    limit: int,
+) -> List[VectorSearchResult]:
+    """Convex combination of max-normalized scores per project (`alpha` weighs the vector side)."""
+
+    def normalized(results: Sequence[VectorSearchResult]) -> Dict[str, float]:
+        best: Dict[str, float] = {}
+        for item in results:
+            best[item.project_id] = max(best.get(item.project_id, 0.0), item.score)
+        top = max(best.values(), default=0.0)
+        return {key: value / top for key, value in best.items()} if top > 0 else dict.fromkeys(best, 0.0)
+
+    dense_scores = normalized(dense)
+    lexical_scores = normalized(lexical)
+    # El texto del servicio vectorial tiene prioridad; BM25 completa lo que falte.
+    entries: Dict[str, VectorSearchResult] = {}
+    for item in list(dense) + list(lexical):
+        entries.setdefault(item.project_id, item)
+
+    fused = sorted(
+        (
+            (alpha * dense_scores.get(project_id, 0.0) + (1 - alpha) * lexical_scores.get(project_id, 0.0), project_id)
+            for project_id in entries
+        ),
+        reverse=True,
+    )
+    return [
+        VectorSearchResult(
+            project_id=project_id,
+            score=round(score, 4),
+            metadata=dict(entries[project_id].metadata),
+            content=entries[project_id].content,
+        )
+        for score, project_id in fused[:limit]
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """Índice BM25 compartido del proceso, o None si `RAG_LEXICAL_MODE=off` o sin Supabase."""
+
+    from app.core.config import get_settings
+    from app.services.project_repository import ProjectRepository
+    from app.services.supabase_client import get_supabase_client
+
+    settings = get_settings()
+    if settings.rag_lexical_mode == "off":
+        return None
+    client = get_supabase_client(settings)
+    if client is None:
+        return None
+    return LexicalIndex(
+        ProjectRepository(client).list_catalog,
+        refresh_after=settings.rag_lexical_refresh_seconds,
+    )
+
+
+__all__ = ["LexicalIndex", "fuse_results", "get_lexical_index"]
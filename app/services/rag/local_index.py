@@ -0,0 +1,241 @@
+"""Embedded vector index per realtor: memory-mapped float32 matrices plus JSON metadata."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.rag.catalog import project_document, project_metadata
+from app.services.rag.embeddings import EmbeddingClient, normalize_rows
+from app.services.rag.vector_client import VectorSearchResult
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+
+
+@dataclass
+class _RealtorIndex:
+    vectors: Optional[np.ndarray]
+    entries: List[Dict[str, Any]]
+    model: Optional[str]
+    meta_mtime: int
+
+
+class LocalVectorIndex:
+    """Índice vectorial en proceso, un directorio por realtor.
+
+    Cada directorio tiene `meta.json` (modelo, dimensión y una entrada por fila
+    con `project_id`, `content` y `metadata`) y una matriz `vectors-<ts>.f32`
+    que se abre con `np.memmap`, así varios workers comparten las páginas del
+    sistema operativo. Las filas se guardan L2-normalizadas y la búsqueda es
+    coseno por fuerza bruta (producto punto + top-k). Escribir un índice nuevo
+    reemplaza `meta.json` de forma atómica; los lectores lo recargan al notar
+    el cambio.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self._directory = Path(directory)
+        self._loaded: Dict[str, _RealtorIndex] = {}
+        self._lock = threading.Lock()
+
+    def write(
+        self,
+        realtor_id: str,
+        vectors: np.ndarray,
+        entries: Sequence[Dict[str, Any]],
+        *,
+        model: str,
+    ) -> None:
+        if len(entries) != len(vectors):
+            raise ValueError("Cada entrada del índice necesita exactamente un vector")
+
+        folder = self._folder(realtor_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        matrix = normalize_rows(np.array(vectors, dtype=np.float32, copy=True))
+        vectors_file: Optional[str] = None
+        if len(entries):
+            vectors_file = f"vectors-{time.time_ns()}.f32"
+            matrix.tofile(folder / vectors_file)
+
+        meta = {
+            "model": model,
+            "count": len(entries),
+            "dimensions": int(matrix.shape[1]) if len(entries) else 0,
+            "vectors_file": vectors_file,
+            "built_at": time.time(),
+            "entries": list(entries),
+        }
+        tmp = folder / f".{META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, folder / META_FILE)
+
+        # Los lectores con el archivo viejo mapeado siguen funcionando hasta recargar.
+        for old in folder.glob("vectors-*.f32"):
+            if old.name != vectors_file:
+                old.unlink(missing_ok=True)
+        self.invalidate(realtor_id)
+        logger.info(
+            "Índice vectorial local escrito | realtor=%s | filas=%s | modelo=%s",
+            realtor_id,
+            len(entries),
+            model,
+        )
+
+    def size(self, realtor_id: str) -> Optional[int]:
+        """Rows indexed for the realtor, or None when there is no local index."""
+
+        index = self._get(realtor_id)
+        return None if index is None else len(index.entries)
+
+    def model(self, realtor_id: str) -> Optional[str]:
+        index = self._get(realtor_id)
+        return None if index is None else index.model
+
+    def snapshot(self, realtor_id: str) -> Optional[Tuple[np.ndarray, List[Dict[str, Any]], Optional[str]]]:
+        """In-memory copy of `(vectors, entries, model)` for incremental rewrites."""
+
+        index = self._get(realtor_id)
+        if index is None:
+            return None
+        vectors = (
+            np.array(index.vectors, dtype=np.float32, copy=True)
+            if index.vectors is not None
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+        return vectors, [dict(entry) for entry in index.entries], index.model
+
+    def search(
+        self,
+        realtor_id: str,
+        query_vector: np.ndarray,
+        *,
+        limit: int,
+        threshold: float,
+    ) -> Optional[List[VectorSearchResult]]:
+        """Top-`limit` rows by cosine similarity; None when the realtor has no index."""
+
+        index = self._get(realtor_id)
+        if index is None:
+            return None
+        if index.vectors is None or limit <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0 or query.shape[-1] != index.vectors.shape[1]:
+            logger.warning(
+                "Vector de consulta incompatible con el índice local | realtor=%s", realtor_id
+            )
+            return []
+
+        scores = index.vectors @ (query / norm)
+        top = min(limit, len(scores))
+        candidates = np.argpartition(-scores, top - 1)[:top]
+        ordered = candidates[np.argsort(-scores[candidates])]
+
+        results: List[VectorSearchResult] = []
+        for position in ordered:
+            score = float(scores[position])
+            if score < threshold:
+                break
+            entry = index.entries[int(position)]
+            results.append(
+                VectorSearchResult(
+                    project_id=str(entry.get("project_id")),
+                    score=score,
+                    metadata=dict(entry.get("metadata") or {}),
+                    content=str(entry.get("content") or ""),
+                )
+            )
+        return results
+
+    def invalidate(self, realtor_id: str) -> None:
+        with self._lock:
+            self._loaded.pop(str(realtor_id), None)
+
+    # ------------------------------------------------------------------
+
+    def _folder(self, realtor_id: str) -> Path:
+        return self._directory / re.sub(r"[^A-Za-z0-9_.-]", "_", str(realtor_id))
+
+    def _get(self, realtor_id: str) -> Optional[_RealtorIndex]:
+        key = str(realtor_id)
+        meta_path = self._folder(key) / META_FILE
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.invalidate(key)
+            return None
+
+        with self._lock:
+            cached = self._loaded.get(key)
+            if cached is not None and cached.meta_mtime == mtime:
+                return cached
+
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            vectors: Optional[np.ndarray] = None
+            if meta.get("count"):
+                vectors = np.memmap(
+                    meta_path.parent / meta["vectors_file"],
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(int(meta["count"]), int(meta["dimensions"])),
+                )
+        except Exception:
+            logger.exception("No se pudo abrir el índice vectorial local | realtor=%s", key)
+            return None
+
+        loaded = _RealtorIndex(vectors, list(meta.get("entries") or []), meta.get("model"), mtime)
+        with self._lock:
+            self._loaded[key] = loaded
+        return loaded
+
+
+def build_realtor_index(
+    rows: Sequence[Dict[str, Any]],
+    *,
+    realtor_id: str,
+    embedder: EmbeddingClient,
+    index: LocalVectorIndex,
+) -> int:
+    """Embed one document per `projects` row and (re)write the realtor's index."""
+
+    entries = [
+        {
+            "project_id": str(row.get("id")),
+            "content": project_document(row),
+            "metadata": project_metadata(row),
+        }
+        for row in rows
+        if row.get("id")
+    ]
+    vectors = embedder.embed([entry["content"] for entry in entries])
+    index.write(realtor_id, vectors, entries, model=embedder.model)
+    return len(entries)
+
+
+@lru_cache(maxsize=1)
+def get_local_index() -> Optional[LocalVectorIndex]:
+    """Índice local compartido del proceso, o None si `RAG_LOCAL_INDEX_MODE=off`."""
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    if settings.rag_local_index_mode == "off":
+        return None
+    return LocalVectorIndex(settings.rag_local_index_path)
+
+
+__all__ = ["LocalVectorIndex", "build_realtor_index", "get_local_index"]
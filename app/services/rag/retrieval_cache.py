@@ -0,0 +1,100 @@
+"""In-process cache of vector search results per realtor and normalized query."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from app.core.metrics import count_cache
+from app.services.rag.vector_client import VectorSearchResult
+
+CACHE_NAME = "rag.retrieval"
+
+RetrievalKey = Tuple[str, str, int, float]
+
+
+@dataclass
+class _CachedResults:
+    results: List[VectorSearchResult]
+    expires_at: float
+
+
+class RetrievalCache:
+    """LRU acotado con TTL de listas de `VectorSearchResult`.
+
+    La clave es `(realtor_id, consulta normalizada, limit, threshold)`; la
+    normalización la hace el llamador (`RAGService`). Se cachean también las
+    listas vacías para no repetir la búsqueda antes de los fallbacks. Cuando el
+    catálogo de un realtor cambia, `invalidate_realtor` descarta sus entradas.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2048,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[RetrievalKey, _CachedResults]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: RetrievalKey) -> Optional[List[VectorSearchResult]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        count_cache(CACHE_NAME, "miss" if entry is None else "hit")
+        return None if entry is None else list(entry.results)
+
+    def put(self, key: RetrievalKey, results: List[VectorSearchResult]) -> None:
+        with self._lock:
+            self._entries[key] = _CachedResults(list(results), self._clock() + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_realtor(self, realtor_id: str) -> int:
+        """Drop every entry of `realtor_id`; returns how many were removed."""
+
+        realtor_id = str(realtor_id)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == realtor_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache(maxsize=1)
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Caché compartida del proceso, o None si `RAG_RETRIEVAL_CACHE_ENABLED` está apagado."""
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    if not settings.rag_retrieval_cache_enabled:
+        return None
+    return RetrievalCache(
+        max_entries=settings.rag_retrieval_cache_max_entries,
+        ttl=settings.rag_retrieval_cache_ttl_seconds,
+    )
+
+
+__all__ = ["RetrievalCache", "get_retrieval_cache"]
@@ -2,25 +2,41 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
-import re
-import unicodedata
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from openai import OpenAI
 
 from app.core.config import Settings
-from app.services.rag.context_formatter import format_rag_context
+from app.core.metrics import timed_stage
+from app.services.rag.answer_cache import SemanticAnswerCache, context_fingerprint
+from app.services.rag.context_formatter import PackedContext, pack_rag_context
+from app.services.rag.embeddings import EmbeddingClient, EmbeddingServiceError
+from app.services.rag.lexical_index import LexicalIndex, fuse_results
+from app.services.rag.local_index import LocalVectorIndex
+from app.services.rag.retrieval_cache import RetrievalCache
+from app.services.rag.text import STOPWORDS, clean_text
 from app.services.rag.vector_client import (
     VectorSearchClient,
     VectorSearchResult,
     VectorSearchServiceError,
 )
+from broky.llm import LLMCircuitOpenError, get_llm_factory
 
 logger = logging.getLogger(__name__)
 
+# Hasta 3 variantes por turno: alcanza para ~10 turnos con fallback a la vez.
+_FALLBACK_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="rag-fallback")
+# Los embeddings de la caché de respuestas no compiten con las búsquedas de respaldo.
+_EMBEDDING_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-embedding")
+
 
 class RAGService:
     """Coordinates Retrieval-Augmented Generation logic for property queries."""
@@ -31,10 +47,27 @@ class RAGService:
         *,
         vector_client: Optional[VectorSearchClient] = None,
         llm_client: Optional[OpenAI] = None,
+        retrieval_cache: Optional[RetrievalCache] = None,
+        local_index: Optional[LocalVectorIndex] = None,
+        embedder: Optional[EmbeddingClient] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
     ) -> None:
         self._settings = settings
         self._vector_client = vector_client or VectorSearchClient(settings)
-        self._llm_client = llm_client or OpenAI(api_key=settings.openai_api_key)
+        self._retrieval_cache = retrieval_cache
+        self._local_index = local_index
+        # Un embedder por modelo: cada índice local se consulta con el modelo
+        # con el que se construyó, y la caché de respuestas con el por defecto.
+        self._default_embeddings_model = embedder.model if embedder else settings.openai_embeddings_model
+        self._embedders: Dict[str, EmbeddingClient] = {embedder.model: embedder} if embedder else {}
+        self._embedders_lock = threading.Lock()
+        self._lexical_index = lexical_index
+        self._answer_cache = answer_cache
+        self._llm_factory = get_llm_factory()
+        self._llm_client = llm_client or self._llm_factory.openai_client(
+            api_key=settings.openai_api_key
+        )
         self._prompt = self._load_prompt()
 
     def answer_query(
@@ -48,54 +81,304 @@ class RAGService:
     ) -> Dict[str, Any]:
         """Generate an answer constrained by retrieved project context."""
 
-        sanitized_question = message.strip()
-        if not sanitized_question:
-            raise ValueError("El mensaje del usuario no puede estar vacío")
+        sanitized_question = self._sanitize(message)
+        if self._llm_factory.circuit.rejecting:
+            logger.warning("Circuito LLM abierto; respuesta RAG de respaldo | realtor=%s", realtor_id)
+            return self._build_failure_response()
 
+        # El embedding de la caché semántica se calcula mientras corre la búsqueda.
+        pending_embedding = self._start_query_embedding(sanitized_question, realtor_id, history)
         vector_results, vector_failed = self._search_context(
             query=sanitized_question,
             realtor_id=realtor_id,
             limit=limit,
             threshold=threshold,
         )
+        return self._answer_from_context(
+            sanitized_question,
+            realtor_id,
+            history,
+            vector_results,
+            vector_failed,
+            pending_embedding=pending_embedding,
+        )
+
+    async def aanswer_query(
+        self,
+        *,
+        message: str,
+        realtor_id: str,
+        history: Optional[Sequence[Dict[str, Any]]] = None,
+        limit: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Async `answer_query`: vector retrieval is awaited (hedged) on the event loop.
+
+        The completion still goes through the shared blocking OpenAI client, so
+        it runs in a worker thread.
+        """
+
+        sanitized_question = self._sanitize(message)
+        if self._llm_factory.circuit.rejecting:
+            logger.warning("Circuito LLM abierto; respuesta RAG de respaldo | realtor=%s", realtor_id)
+            return self._build_failure_response()
+
+        pending_embedding = self._start_query_embedding(sanitized_question, realtor_id, history)
+        vector_results, vector_failed = await self._asearch_context(
+            query=sanitized_question,
+            realtor_id=realtor_id,
+            limit=limit,
+            threshold=threshold,
+        )
+        return await asyncio.to_thread(
+            self._answer_from_context,
+            sanitized_question,
+            realtor_id,
+            history,
+            vector_results,
+            vector_failed,
+            pending_embedding=pending_embedding,
+        )
+
+    @property
+    def retrieval_only(self) -> bool:
+        """`RAG_MODE=retrieval_only`: the response agent grounds on the packed context."""
+
+        return self._settings.rag_mode == "retrieval_only"
+
+    def retrieve_context(
+        self,
+        *,
+        message: str,
+        realtor_id: str,
+        limit: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Packed retrieval context and sources, without the RAG completion."""
+
+        sanitized_question = self._sanitize(message)
+        if self._llm_factory.circuit.rejecting:
+            # El agente de respuesta tampoco podrá llamar al LLM: su heurística
+            # necesita la respuesta segura de siempre.
+            logger.warning("Circuito LLM abierto; respuesta RAG de respaldo | realtor=%s", realtor_id)
+            return self._build_failure_response()
+
+        vector_results, vector_failed = self._search_context(
+            query=sanitized_question,
+            realtor_id=realtor_id,
+            limit=limit,
+            threshold=threshold,
+        )
+        return self._retrieval_from_context(realtor_id, vector_results, vector_failed)
+
+    async def aretrieve_context(
+        self,
+        *,
+        message: str,
+        realtor_id: str,
+        limit: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        sanitized_question = self._sanitize(message)
+        if self._llm_factory.circuit.rejecting:
+            logger.warning("Circuito LLM abierto; respuesta RAG de respaldo | realtor=%s", realtor_id)
+            return self._build_failure_response()
+
+        vector_results, vector_failed = await self._asearch_context(
+            query=sanitized_question,
+            realtor_id=realtor_id,
+            limit=limit,
+            threshold=threshold,
+        )
+        return self._retrieval_from_context(realtor_id, vector_results, vector_failed)
+
+    @staticmethod
+    def _sanitize(message: str) -> str:
+        sanitized_question = message.strip()
+        if not sanitized_question:
+            raise ValueError("El mensaje del usuario no puede estar vacío")
+        return sanitized_question
 
+    def _answer_from_context(
+        self,
+        sanitized_question: str,
+        realtor_id: str,
+        history: Optional[Sequence[Dict[str, Any]]],
+        vector_results: List[VectorSearchResult],
+        vector_failed: bool,
+        *,
+        pending_embedding: Optional["Future[Optional[np.ndarray]]"] = None,
+    ) -> Dict[str, Any]:
         if vector_failed:
+            if pending_embedding is not None:
+                pending_embedding.cancel()
             logger.warning(
                 "Vector service unavailable, returning safe fallback reply | realtor=%s",
                 realtor_id,
             )
             return self._build_failure_response()
 
-        context_text = format_rag_context(vector_results)
-        sources = _extract_sources(vector_results)
+        route = self._llm_factory.route("rag", realtor_id)
+        packed = self._pack(vector_results, realtor_id, model=route.model)
+        context_text = packed.text
+        sources = packed.sources
 
         logger.info(
-            "Generando respuesta RAG | realtor=%s | resultados=%d",
+            "Generando respuesta RAG | realtor=%s | resultados=%d | proyectos=%d | tokens_contexto=%d | omitidos=%d",
             realtor_id,
             len(vector_results),
+            len(packed.projects),
+            packed.tokens,
+            packed.omitted,
         )
 
+        context_hash = context_fingerprint(context_text)
+        query_vector = self._await_query_embedding(pending_embedding, realtor_id)
+        if self._answer_cache is not None and query_vector is not None:
+            cached = self._answer_cache.lookup(realtor_id, query_vector, context_hash)
+            if cached is not None:
+                logger.info("Respuesta RAG desde la caché semántica | realtor=%s", realtor_id)
+                cached.update(
+                    usage=None,
+                    cached=True,
+                    timestamp=datetime.now(timezone.utc).isoformat(),
+                )
+                return cached
+
         system_prompt = self._build_system_prompt(context_text, sanitized_question)
         messages = self._compose_messages(system_prompt, history, sanitized_question)
 
-        completion = self._llm_client.chat.completions.create(
-            model=self._settings.openai_model,
-            temperature=0.3,
-            max_tokens=1000,
-            messages=messages,
-        )
+        try:
+            with self._llm_factory.track("rag", model=route.model) as call:
+                completion = self._llm_client.chat.completions.create(
+                    model=route.model or self._settings.openai_model,
+                    temperature=0.3,
+                    max_tokens=route.max_tokens or 1000,
+                    timeout=route.timeout,
+                    messages=messages,
+                )
+                call.add_usage(getattr(completion, "usage", None))
+        except LLMCircuitOpenError:
+            logger.warning("Circuito LLM abierto; respuesta RAG de respaldo | realtor=%s", realtor_id)
+            return self._build_failure_response()
 
         content = completion.choices[0].message.content.strip()
         usage = getattr(completion, "usage", None)
 
-        return {
+        answer = {
             "response": content,
             "sources": sources,
             "context": context_text,
+            "context_tokens": packed.tokens,
             "sources_count": len(sources),
             "usage": usage.model_dump() if hasattr(usage, "model_dump") else usage,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
+        if (
+            query_vector is None
+            and pending_embedding is not None
+            and pending_embedding.done()
+            and pending_embedding.exception() is None
+        ):
+            # Llegó tarde para la búsqueda pero sirve para guardar la respuesta.
+            query_vector = pending_embedding.result()
+        if self._answer_cache is not None and query_vector is not None and content:
+            self._answer_cache.store(realtor_id, query_vector, context_hash, answer)
+        return answer
+
+    def _start_query_embedding(
+        self,
+        question: str,
+        realtor_id: str,
+        history: Optional[Sequence[Dict[str, Any]]],
+    ) -> Optional["Future[Optional[np.ndarray]]"]:
+        # La clave no incluye el historial: con conversación previa la misma
+        # pregunta puede pedir otra respuesta, así que no se usa la caché.
+        if self._answer_cache is None or history:
+            return None
+        return _EMBEDDING_EXECUTOR.submit(
+            contextvars.copy_context().run, self._query_embedding, question, realtor_id
+        )
+
+    def _await_query_embedding(
+        self,
+        pending: Optional["Future[Optional[np.ndarray]]"],
+        realtor_id: str,
+    ) -> Optional[np.ndarray]:
+        """Wait at most `RAG_ANSWER_CACHE_WAIT_MS` for the query embedding."""
+
+        if pending is None:
+            return None
+        try:
+            return pending.result(timeout=self._settings.rag_answer_cache_wait_ms / 1000.0)
+        except FutureTimeoutError:
+            logger.info(
+                "Embedding de la caché semántica demorado; se omite la búsqueda | realtor=%s",
+                realtor_id,
+            )
+            return None
+
+    def _query_embedding(self, question: str, realtor_id: str) -> Optional[np.ndarray]:
+        """Query embedding for the answer cache; None skips the cache for this turn."""
+
+        try:
+            return self._get_embedder().embed_query(question)
+        except (EmbeddingServiceError, LLMCircuitOpenError):
+            logger.warning("No se pudo calcular el embedding para la caché semántica | realtor=%s", realtor_id)
+            return None
+
+    def _get_embedder(self, model: Optional[str] = None) -> EmbeddingClient:
+        model = model or self._default_embeddings_model
+        with self._embedders_lock:
+            embedder = self._embedders.get(model)
+            if embedder is None:
+                embedder = EmbeddingClient(self._settings, client=self._llm_client, model=model)
+                self._embedders[model] = embedder
+            return embedder
+
+    def _retrieval_from_context(
+        self,
+        realtor_id: str,
+        vector_results: List[VectorSearchResult],
+        vector_failed: bool,
+    ) -> Dict[str, Any]:
+        if vector_failed:
+            logger.warning(
+                "Vector service unavailable, returning safe fallback reply | realtor=%s",
+                realtor_id,
+            )
+            return self._build_failure_response()
+
+        # El contexto lo consume el agente de respuesta: se cuenta con su modelo.
+        packed = self._pack(
+            vector_results, realtor_id, model=self._llm_factory.route("response", realtor_id).model
+        )
+        logger.info(
+            "Contexto RAG sin generación | realtor=%s | resultados=%d | proyectos=%d | tokens_contexto=%d",
+            realtor_id,
+            len(vector_results),
+            len(packed.projects),
+            packed.tokens,
+        )
+        return {
+            "response": None,
+            "mode": "retrieval_only",
+            "sources": packed.sources,
+            "context": packed.text,
+            "context_tokens": packed.tokens,
+            "sources_count": len(packed.sources),
+            "usage": None,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _pack(
+        self, vector_results: List[VectorSearchResult], realtor_id: str, *, model: Optional[str]
+    ) -> PackedContext:
+        return pack_rag_context(
+            vector_results,
+            max_tokens=self._settings.rag_context_max_tokens,
+            model=model or self._settings.openai_model,
+        )
 
     def _search_context(
         self,
@@ -105,8 +388,165 @@ class RAGService:
         limit: Optional[int],
         threshold: Optional[float],
     ) -> Tuple[List[VectorSearchResult], bool]:
+        results, failed = self._dense_search_context(
+            query=query, realtor_id=realtor_id, limit=limit, threshold=threshold
+        )
+        return self._apply_lexical(query, realtor_id, limit, results, failed)
+
+    async def _asearch_context(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Tuple[List[VectorSearchResult], bool]:
+        results, failed = await self._adense_search_context(
+            query=query, realtor_id=realtor_id, limit=limit, threshold=threshold
+        )
+        if self._lexical_index is None:
+            return results, failed
+        # La primera búsqueda de un realtor carga su catálogo desde Supabase.
+        return await asyncio.to_thread(
+            self._apply_lexical, query, realtor_id, limit, results, failed
+        )
+
+    def _apply_lexical(
+        self,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        results: List[VectorSearchResult],
+        failed: bool,
+    ) -> Tuple[List[VectorSearchResult], bool]:
+        """Fuse BM25 over the catalog with the vector results (hybrid) or fill in for them (fallback)."""
+
+        mode = self._settings.rag_lexical_mode
+        if self._lexical_index is None or mode == "off":
+            return results, failed
+        if mode == "fallback" and results and not failed:
+            return results, failed
+
+        top_k = limit or self._settings.vector_search_limit
+        with timed_stage("vector.lexical_search"):
+            lexical = self._lexical_index.search(realtor_id, query, limit=top_k)
+        if not lexical:
+            return results, failed
+
+        if mode == "hybrid" and not failed:
+            return fuse_results(results, lexical, alpha=self._settings.rag_hybrid_alpha, limit=top_k), False
+        logger.info(
+            "Contexto RAG desde BM25 | realtor=%s | resultados=%d | vector_fallo=%s",
+            realtor_id,
+            len(lexical),
+            failed,
+        )
+        return fuse_results([], lexical, alpha=0.0, limit=top_k), False
+
+    def _dense_search_context(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Tuple[List[VectorSearchResult], bool]:
+        local: Optional[List[VectorSearchResult]] = None
+        if self._serves_locally(realtor_id):
+            local = self._local_search(query, realtor_id, limit, threshold)
+            if local:
+                return local, False
+
+        results, failed = self._remote_search_context(
+            query=query, realtor_id=realtor_id, limit=limit, threshold=threshold
+        )
+        if failed and self._local_index is not None:
+            if local is None:
+                local = self._local_search(query, realtor_id, limit, threshold)
+            if local is not None:
+                self._log_local_fallback(realtor_id, local)
+                return local, False
+        return results, failed
+
+    async def _adense_search_context(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Tuple[List[VectorSearchResult], bool]:
+        local: Optional[List[VectorSearchResult]] = None
+        if self._serves_locally(realtor_id):
+            local = await asyncio.to_thread(self._local_search, query, realtor_id, limit, threshold)
+            if local:
+                return local, False
+
+        results, failed = await self._aremote_search_context(
+            query=query, realtor_id=realtor_id, limit=limit, threshold=threshold
+        )
+        if failed and self._local_index is not None:
+            if local is None:
+                local = await asyncio.to_thread(
+                    self._local_search, query, realtor_id, limit, threshold
+                )
+            if local is not None:
+                self._log_local_fallback(realtor_id, local)
+                return local, False
+        return results, failed
+
+    def _serves_locally(self, realtor_id: str) -> bool:
+        """Primary local mode: answer from the embedded index when the catalog is small."""
+
+        if self._local_index is None or self._settings.rag_local_index_mode != "primary":
+            return False
+        size = self._local_index.size(realtor_id)
+        return size is not None and size <= self._settings.rag_local_index_primary_max_rows
+
+    def _local_search(
+        self,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Optional[List[VectorSearchResult]]:
+        """Cosine top-k over the realtor's embedded index; None when it cannot serve."""
+
+        if self._local_index is None or self._local_index.size(realtor_id) is None:
+            return None
         try:
-            results = self._vector_client.search(
+            query_vector = self._get_embedder(self._local_index.model(realtor_id)).embed_query(query)
+        except (EmbeddingServiceError, LLMCircuitOpenError):
+            logger.warning("No se pudo calcular el embedding para el índice local | realtor=%s", realtor_id)
+            return None
+        with timed_stage("vector.local_search"):
+            return self._local_index.search(
+                realtor_id,
+                query_vector,
+                limit=limit or self._settings.vector_search_limit,
+                threshold=(
+                    threshold if threshold is not None else self._settings.rag_local_index_threshold
+                ),
+            )
+
+    @staticmethod
+    def _log_local_fallback(realtor_id: str, results: List[VectorSearchResult]) -> None:
+        logger.warning(
+            "Servicio vectorial no disponible; contexto desde el índice local | realtor=%s | resultados=%d",
+            realtor_id,
+            len(results),
+        )
+
+    def _remote_search_context(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Tuple[List[VectorSearchResult], bool]:
+        try:
+            results = self._cached_search(
                 query=query,
                 realtor_id=realtor_id,
                 limit=limit,
@@ -119,31 +559,180 @@ class RAGService:
         if results:
             return results, False
 
-        for fallback in self._build_fallback_queries(query):
-            try:
-                fallback_results = self._vector_client.search(
+        # Las variantes van en paralelo: el peor caso es una sola ronda de búsqueda.
+        # `cancel` corta los reintentos de las perdedoras que ya empezaron.
+        cancel = threading.Event()
+        futures = {
+            _FALLBACK_EXECUTOR.submit(
+                contextvars.copy_context().run,
+                self._cached_search,
+                query=fallback,
+                realtor_id=realtor_id,
+                limit=limit,
+                threshold=threshold,
+                cancel=cancel,
+            ): fallback
+            for fallback in self._build_fallback_queries(query)
+        }
+        failed = False
+        try:
+            for future in as_completed(futures):
+                fallback = futures[future]
+                try:
+                    fallback_results = future.result()
+                except VectorSearchServiceError:
+                    self._log_fallback_failure(fallback, realtor_id)
+                    failed = True
+                    continue
+
+                if fallback_results:
+                    self._log_fallback_hit(fallback, fallback_results)
+                    return fallback_results, False
+        finally:
+            cancel.set()
+            for future in futures:
+                future.cancel()
+
+        return [], failed
+
+    async def _aremote_search_context(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Tuple[List[VectorSearchResult], bool]:
+        try:
+            results = await self._acached_search(
+                query=query,
+                realtor_id=realtor_id,
+                limit=limit,
+                threshold=threshold,
+            )
+        except VectorSearchServiceError:
+            logger.warning("Fallo al recuperar contexto vectorial para %s", realtor_id)
+            return [], True
+
+        if results:
+            return results, False
+
+        tasks = {
+            asyncio.ensure_future(
+                self._acached_search(
                     query=fallback,
                     realtor_id=realtor_id,
                     limit=limit,
                     threshold=threshold,
                 )
-            except VectorSearchServiceError:
-                logger.warning(
-                    "Fallo en búsqueda vectorial de respaldo '%s' para %s",
-                    fallback,
-                    realtor_id,
-                )
-                return [], True
+            ): fallback
+            for fallback in self._build_fallback_queries(query)
+        }
+        pending = set(tasks)
+        failed = False
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    fallback = tasks[task]
+                    try:
+                        fallback_results = task.result()
+                    except VectorSearchServiceError:
+                        self._log_fallback_failure(fallback, realtor_id)
+                        failed = True
+                        continue
+
+                    if fallback_results:
+                        self._log_fallback_hit(fallback, fallback_results)
+                        return fallback_results, False
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return [], failed
+
+    def _cached_search(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+        cancel: Optional[threading.Event] = None,
+    ) -> List[VectorSearchResult]:
+        key = self._retrieval_key(query, realtor_id, limit, threshold)
+        if key is not None:
+            cached = self._retrieval_cache.get(key)
+            if cached is not None:
+                return cached
+        results = self._vector_client.search(
+            query=query,
+            realtor_id=realtor_id,
+            limit=limit,
+            threshold=threshold,
+            cancel=cancel,
+        )
+        if key is not None:
+            self._retrieval_cache.put(key, results)
+        return results
 
-            if fallback_results:
-                logger.info(
-                    "Búsqueda vectorial fallback '%s' devolvió %d resultados",
-                    fallback,
-                    len(fallback_results),
-                )
-                return fallback_results, False
+    async def _acached_search(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> List[VectorSearchResult]:
+        key = self._retrieval_key(query, realtor_id, limit, threshold)
+        if key is not None:
+            cached = self._retrieval_cache.get(key)
+            if cached is not None:
+                return cached
+        results = await self._vector_client.asearch(
+            query=query,
+            realtor_id=realtor_id,
+            limit=limit,
+            threshold=threshold,
+        )
+        if key is not None:
+            self._retrieval_cache.put(key, results)
+        return results
 
-        return [], False
+    def _retrieval_key(
+        self,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Optional[Tuple[str, str, int, float]]:
+        if self._retrieval_cache is None:
+            return None
+        normalized = _normalize_query(query)
+        if not normalized:
+            return None
+        return (
+            str(realtor_id),
+            normalized,
+            limit or self._settings.vector_search_limit,
+            threshold if threshold is not None else self._settings.vector_search_threshold,
+        )
+
+    @staticmethod
+    def _log_fallback_failure(fallback: str, realtor_id: str) -> None:
+        logger.warning(
+            "Fallo en búsqueda vectorial de respaldo '%s' para %s",
+            fallback,
+            realtor_id,
+        )
+
+    @staticmethod
+    def _log_fallback_hit(fallback: str, results: List[VectorSearchResult]) -> None:
+        logger.info(
+            "Búsqueda vectorial fallback '%s' devolvió %d resultados",
+            fallback,
+            len(results),
+        )
 
     def _build_failure_response(self) -> Dict[str, Any]:
         """Return a safe response when RAG cannot run due to service errors."""
@@ -174,7 +763,7 @@ class RAGService:
         return (
             f"{base_instructions}\n\n"
             f"Consulta del usuario: {question}\n\n"
-            f"Contexto:\n{context_block}\n\n"
+            f"Contexto (un resumen por proyecto, del más al menos relevante):\n{context_block}\n\n"
             f"{guidance}"
         )
 
@@ -230,10 +819,7 @@ class RAGService:
     def _build_fallback_queries(query: str) -> List[str]:
         """Generate simplified alternatives when the main search returns nothing."""
 
-        normalized = _strip_accents(query).lower()
-        normalized = normalized.replace("¿", " ").replace("?", " ").strip()
-        normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
-        normalized = re.sub(r"\s+", " ", normalized).strip()
+        normalized = clean_text(query)
 
         if not normalized:
             return []
@@ -241,7 +827,7 @@ class RAGService:
         tokens = [
             token
             for token in normalized.split()
-            if token and token not in _STOPWORDS and len(token) > 2
+            if token and token not in STOPWORDS and len(token) > 2
         ]
 
         candidates: List[str] = []
@@ -261,59 +847,11 @@ class RAGService:
         return candidates
 
 
-def _extract_sources(results: Iterable[VectorSearchResult]) -> List[Dict[str, Any]]:
-    sources: List[Dict[str, Any]] = []
-    for item in results:
-        metadata = item.metadata or {}
-        name = (
-            metadata.get("project_name")
-            or metadata.get("name")
-            or metadata.get("title")
-            or metadata.get("property_name")
-            or item.project_id
-        )
-        sources.append(
-            {
-                "project_id": item.project_id,
-                "name": name,
-                "score": item.score,
-            }
-        )
-    return sources
+def _normalize_query(query: str) -> str:
+    """Retrieval cache key: accents, punctuation, case and stopwords removed."""
 
-
-__all__ = ["RAGService"]
+    tokens = [token for token in clean_text(query).split() if token not in STOPWORDS]
+    return " ".join(tokens)
 
 
-_STOPWORDS = {
-    "que",
-    "qué",
-    "tienes",
-    "tengo",
-    "hay",
-    "una",
-    "un",
-    "los",
-    "las",
-    "en",
-    "de",
-    "para",
-    "con",
-    "disponibles",
-    "disponible",
-    "sobre",
-    "cuáles",
-    "cuales",
-    "donde",
-    "dónde",
-    "me",
-    "puedes",
-    "puedo",
-    "por",
-    "favor",
-}
-
-
-def _strip_accents(text: str) -> str:
-    normalized = unicodedata.normalize("NFD", text)
-    return "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+__all__ = ["RAGService"]
@@ -0,0 +1,83 @@
+"""Text normalization shared by the RAG query cache and the lexical index."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+STOPWORDS = {
+    "que",
+    "qué",
+    "tienes",
+    "tengo",
+    "hay",
+    "una",
+    "un",
+    "los",
+    "las",
+    "en",
+    "de",
+    "para",
+    "con",
+    "disponibles",
+    "disponible",
+    "sobre",
+    "cuáles",
+    "cuales",
+    "donde",
+    "dónde",
+    "me",
+    "puedes",
+    "puedo",
+    "por",
+    "favor",
+}
+
+
+def strip_accents(text: str) -> str:
+    normalized = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+
+
+def clean_text(text: str) -> str:
+    """Lowercase, accent-free text with punctuation collapsed to single spaces."""
+
+    normalized = strip_accents(text).lower()
+    normalized = normalized.replace("¿", " ").replace("?", " ").strip()
+    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def lexical_tokens(text: str) -> List[str]:
+    """Tokens for BM25: cleaned, without stopwords and with a naive plural strip."""
+
+    tokens: List[str] = []
+    for token in clean_text(text).split():
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def split_sentences(text: str, *, max_chars: int) -> List[str]:
+    """Sentences (and lines) of `text`; longer ones are cut at word boundaries."""
+
+    sentences: List[str] = []
+    for sentence in _SENTENCE_BOUNDARY.split(text or ""):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+__all__ = ["STOPWORDS", "clean_text", "lexical_tokens", "split_sentences", "strip_accents"]
@@ -0,0 +1,46 @@
+"""Token counting for prompt budgets: tiktoken when its encoding is available, else an estimate."""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+# Promedio aproximado para texto en español con los tokenizadores de OpenAI.
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]) -> Optional[Any]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        # Sin red la primera descarga del vocabulario falla: se estima por caracteres.
+        logger.warning(
+            "Tokenizador no disponible; se estiman tokens por caracteres | modelo=%s", model
+        )
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+__all__ = ["count_tokens"]
@@ -2,17 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import logging
+import threading
 import time
+import weakref
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 
 import httpx
 
 from app.core.config import Settings
+from app.core.metrics import count_connection, count_hedge, timed, timed_stage
 
 logger = logging.getLogger(__name__)
 
+POOL_NAME = "vector"
+MAX_ATTEMPTS = 2
+HEDGE_MIN_SAMPLES = 20
+
+_pool: Optional[httpx.Client] = None
+_pool_lock = threading.Lock()
+# Un pool asyncio por event loop: sus conexiones no pueden cruzar de loop.
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
 class VectorSearchServiceError(RuntimeError):
     """Raised when the vector microservice cannot be reached successfully."""
@@ -37,10 +54,149 @@ class VectorSearchResult:
         )
 
 
+def _trace_request(request: httpx.Request) -> None:
+    state = {"new": False}
+
+    def trace(event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            state["new"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["broky_connection"] = state
+
+
+def _count_reuse(response: httpx.Response) -> None:
+    state = response.request.extensions.get("broky_connection")
+    if state is not None:
+        count_connection(POOL_NAME, reused=not state["new"])
+
+
+async def _atrace_request(request: httpx.Request) -> None:
+    state = {"new": False}
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            state["new"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["broky_connection"] = state
+
+
+async def _acount_reuse(response: httpx.Response) -> None:
+    _count_reuse(response)
+
+
+def _pool_options(settings: Settings) -> Dict[str, Any]:
+    http2 = settings.vector_http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("Paquete h2 no disponible; el pool vectorial usará HTTP/1.1")
+        http2 = False
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.vector_max_connections,
+            max_keepalive_connections=settings.vector_max_keepalive_connections,
+            keepalive_expiry=settings.vector_keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.vector_service_timeout),
+        "http2": http2,
+    }
+
+
+def get_vector_http_client(settings: Settings) -> httpx.Client:
+    """Pool HTTP compartido (keep-alive, HTTP/2) hacia el microservicio vectorial.
+
+    Se crea con los límites de la primera configuración que lo pide y vive hasta
+    `close_vector_http_client()` (apagado de la app).
+    """
+
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.is_closed:
+            return _pool
+
+        options = _pool_options(settings)
+        _pool = httpx.Client(
+            event_hooks={"request": [_trace_request], "response": [_count_reuse]},
+            **options,
+        )
+        logger.info(
+            "Pool HTTP vectorial creado | max_connections=%s | keepalive=%s | http2=%s",
+            settings.vector_max_connections,
+            settings.vector_max_keepalive_connections,
+            options["http2"],
+        )
+        return _pool
+
+
+def get_async_vector_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Versión asyncio del pool vectorial: uno por event loop en curso.
+
+    Con `asyncio.run` por llamada (scripts, tests, tools) cada loop tiene su
+    pool. Los de loops ya cerrados se sueltan en la siguiente llamada: como
+    su loop terminó no se pueden `aclose`, y al liberarlos se cierran sus
+    sockets.
+    """
+
+    loop = asyncio.get_running_loop()
+    with _pool_lock:
+        for other in [other for other in list(_async_pools.keys()) if other.is_closed()]:
+            _async_pools.pop(other, None)
+        pool = _async_pools.get(loop)
+        if pool is not None and not pool.is_closed:
+            return pool
+        pool = httpx.AsyncClient(
+            event_hooks={"request": [_atrace_request], "response": [_acount_reuse]},
+            **_pool_options(settings),
+        )
+        _async_pools[loop] = pool
+        return pool
+
+
+def close_vector_http_client() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+async def aclose_vector_http_client() -> None:
+    with _pool_lock:
+        pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.aclose()
+
+
+class _LatencyWindow:
+    """Últimas latencias exitosas del servicio vectorial, para decidir el hedge."""
+
+    def __init__(self, size: int = 256) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        if len(self._samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(quantile * (len(ordered) - 1))))]
+
+
 class VectorSearchClient:
-    """Thin wrapper to query the deployed vector microservice."""
+    """Thin wrapper to query the deployed vector microservice.
+
+    `search` is blocking; `asearch` is the asyncio-native variant, which can
+    hedge a slow request with a second one (the loser is cancelled).
+    """
 
-    def __init__(self, settings: Settings, client: Optional[httpx.Client] = None) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        client: Optional[httpx.Client] = None,
+        *,
+        async_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
         self._settings = settings
         self._base_url = (
             str(settings.vector_service_url).rstrip("/")
@@ -49,10 +205,13 @@ class VectorSearchClient:
         )
         self._timeout = settings.vector_service_timeout
         self._client = client
+        self._async_client = async_client
+        self._latencies = _LatencyWindow()
 
         if not self._base_url:
             logger.warning("VECTOR_SERVICE_URL no configurado; búsqueda vectorial deshabilitada")
 
+    @timed("vector.search")
     def search(
         self,
         *,
@@ -60,10 +219,151 @@ class VectorSearchClient:
         realtor_id: str,
         limit: Optional[int] = None,
         threshold: Optional[float] = None,
+        cancel: Optional[threading.Event] = None,
     ) -> List[VectorSearchResult]:
+        """Blocking search with retries; once `cancel` is set no further attempt starts."""
+
         if not self._base_url:
             return []
 
+        payload = self._build_payload(query, realtor_id, limit, threshold)
+        last_exception: Optional[Exception] = None
+        data: Optional[Dict[str, Any]] = None
+
+        for attempt in range(MAX_ATTEMPTS):
+            if cancel is not None and cancel.is_set():
+                break
+            try:
+                if self._client is not None:
+                    response = self._client.post("/vectors/search", json=payload)
+                else:
+                    response = get_vector_http_client(self._settings).post(
+                        f"{self._base_url}/vectors/search",
+                        json=payload,
+                        timeout=self._timeout,
+                    )
+                data = self._decode(response)
+                break
+            except Exception as exc:
+                last_exception = exc
+                self._log_failure(exc, attempt)
+
+            if attempt + 1 < MAX_ATTEMPTS:
+                backoff_seconds = self._backoff(attempt)
+                logger.info(
+                    "Reintentando consulta vectorial tras %.2fs", backoff_seconds
+                )
+                if cancel is not None:
+                    cancel.wait(backoff_seconds)
+                else:
+                    time.sleep(backoff_seconds)
+
+        if data is None:
+            raise VectorSearchServiceError("No se pudo consultar el microservicio vectorial") from last_exception
+
+        return self._parse_results(data)
+
+    async def asearch(
+        self,
+        *,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> List[VectorSearchResult]:
+        """Asyncio variant of `search`: hedged requests and non-blocking backoff."""
+
+        if not self._base_url:
+            return []
+
+        with timed_stage("vector.search"):
+            payload = self._build_payload(query, realtor_id, limit, threshold)
+            last_exception: Optional[Exception] = None
+            data: Optional[Dict[str, Any]] = None
+
+            for attempt in range(MAX_ATTEMPTS):
+                try:
+                    data = self._decode(await self._hedged_post(payload))
+                    break
+                except Exception as exc:
+                    last_exception = exc
+                    self._log_failure(exc, attempt)
+
+                if attempt + 1 < MAX_ATTEMPTS:
+                    backoff_seconds = self._backoff(attempt)
+                    logger.info(
+                        "Reintentando consulta vectorial tras %.2fs", backoff_seconds
+                    )
+                    await asyncio.sleep(backoff_seconds)
+
+            if data is None:
+                raise VectorSearchServiceError(
+                    "No se pudo consultar el microservicio vectorial"
+                ) from last_exception
+
+            return self._parse_results(data)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is disabled."""
+
+        settings = self._settings
+        if not settings.vector_hedge_enabled:
+            return None
+        observed = self._latencies.percentile(settings.vector_hedge_percentile)
+        delay = observed if observed is not None else settings.vector_hedge_delay_ms / 1000
+        # Un hedge que sale después del timeout no puede ganar.
+        return delay if delay < self._timeout else None
+
+    # ------------------------------------------------------------------
+
+    async def _hedged_post(self, payload: Dict[str, Any]) -> httpx.Response:
+        primary = asyncio.ensure_future(self._apost(payload))
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    count_hedge(POOL_NAME, "sent")
+                    logger.info("Consulta vectorial lenta; enviando hedge tras %.0f ms", delay * 1000)
+                    tasks.add(asyncio.ensure_future(self._apost(payload)))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is not primary:
+                            count_hedge(POOL_NAME, "won")
+                        return task.result()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _apost(self, payload: Dict[str, Any]) -> httpx.Response:
+        started = time.perf_counter()
+        if self._async_client is not None:
+            response = await self._async_client.post("/vectors/search", json=payload)
+        else:
+            response = await get_async_vector_http_client(self._settings).post(
+                f"{self._base_url}/vectors/search",
+                json=payload,
+                timeout=self._timeout,
+            )
+        response.raise_for_status()
+        self._latencies.observe(time.perf_counter() - started)
+        return response
+
+    def _build_payload(
+        self,
+        query: str,
+        realtor_id: str,
+        limit: Optional[int],
+        threshold: Optional[float],
+    ) -> Dict[str, Any]:
         payload = {
             "query": query.strip(),
             "realtor_id": realtor_id,
@@ -78,64 +378,48 @@ class VectorSearchClient:
             payload["limit"],
             payload["threshold"],
         )
+        return payload
 
-        max_attempts = 2
-        last_exception: Optional[Exception] = None
-        data: Optional[Dict[str, Any]] = None
+    @staticmethod
+    def _decode(response: httpx.Response) -> Dict[str, Any]:
+        response.raise_for_status()
+        content = response.json()
+        if not isinstance(content, dict):
+            raise VectorSearchServiceError(
+                "Respuesta inválida del microservicio vectorial",
+            )
+        return content
 
-        for attempt in range(max_attempts):
-            client: Optional[httpx.Client] = None
-            try:
-                client = self._client or httpx.Client(
-                    base_url=self._base_url,
-                    timeout=self._timeout,
-                )
-                response = client.post("/vectors/search", json=payload)
-                response.raise_for_status()
-                content = response.json()
-                if not isinstance(content, dict):
-                    raise VectorSearchServiceError(
-                        "Respuesta inválida del microservicio vectorial",
-                    )
-                data = content
-                break
-            except httpx.TimeoutException as exc:
-                last_exception = exc
-                logger.warning(
-                    "Timeout consultando el microservicio vectorial (intento %d/%d)",
-                    attempt + 1,
-                    max_attempts,
-                )
-            except httpx.HTTPStatusError as exc:
-                last_exception = exc
-                logger.warning(
-                    "HTTP %s desde el microservicio vectorial (intento %d/%d): %s",
-                    exc.response.status_code,
-                    attempt + 1,
-                    max_attempts,
-                    exc.response.text,
-                )
-            except Exception as exc:  # pragma: no cover - defensive failure path
-                last_exception = exc
-                logger.exception(
-                    "Error inesperado al invocar el microservicio vectorial | intento %d/%d",
-                    attempt + 1,
-                    max_attempts,
-                )
-            finally:
-                if self._client is None and client is not None:
-                    client.close()
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(1.0, 0.4 * (2**attempt))
 
-            if attempt + 1 < max_attempts:
-                backoff_seconds = min(1.0, 0.4 * (2**attempt))
-                logger.info(
-                    "Reintentando consulta vectorial tras %.2fs", backoff_seconds
-                )
-                time.sleep(backoff_seconds)
-
-        if data is None:
-            raise VectorSearchServiceError("No se pudo consultar el microservicio vectorial") from last_exception
+    @staticmethod
+    def _log_failure(exc: Exception, attempt: int) -> None:
+        if isinstance(exc, httpx.TimeoutException):
+            logger.warning(
+                "Timeout consultando el microservicio vectorial (intento %d/%d)",
+                attempt + 1,
+                MAX_ATTEMPTS,
+            )
+        elif isinstance(exc, httpx.HTTPStatusError):
+            logger.warning(
+                "HTTP %s desde el microservicio vectorial (intento %d/%d): %s",
+                exc.response.status_code,
+                attempt + 1,
+                MAX_ATTEMPTS,
+                exc.response.text,
+            )
+        else:  # pragma: no cover - defensive failure path
+            logger.error(
+                "Error inesperado al invocar el microservicio vectorial | intento %d/%d",
+                attempt + 1,
+                MAX_ATTEMPTS,
+                exc_info=exc,
+            )
 
+    @staticmethod
+    def _parse_results(data: Dict[str, Any]) -> List[VectorSearchResult]:
         raw_results = data.get("results") if isinstance(data, dict) else None
         if not isinstance(raw_results, list):
             logger.warning("Respuesta del microservicio sin 'results' válido: %s", data)
@@ -150,4 +434,8 @@ __all__ = [
     "VectorSearchClient",
     "VectorSearchResult",
     "VectorSearchServiceError",
+    "aclose_vector_http_client",
+    "close_vector_http_client",
+    "get_async_vector_http_client",
+    "get_vector_http_client",
 ]
@@ -19,3 +19,11 @@ def get_supabase_client(settings: Settings) -> Optional[Client]:
         _supabase_client = create_client(settings.supabase_url, settings.supabase_api_key)
 
     return _supabase_client
+
+
+def set_supabase_client(client: Optional[Client]) -> None:
+    """Replace the shared client (offline replays and load tests use an in-memory fake)."""
+
+    global _supabase_client
+
+    _supabase_client = client
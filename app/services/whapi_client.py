@@ -9,6 +9,8 @@ from httpx import Response, TimeoutException
 import json
 import time
 
+from app.core.metrics import timed_stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,6 +104,27 @@ class WhapiClient:
         token: str,
         endpoint: str,
         payload: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        with timed_stage(self._stage_name(endpoint)):
+            return self._send_with_retries(
+                method=method, token=token, endpoint=endpoint, payload=payload
+            )
+
+    @staticmethod
+    def _stage_name(endpoint: str) -> str:
+        # /messages/text -> whapi.messages.text ; /presences/<chat_id> -> whapi.presences
+        parts = [part for part in endpoint.split("/") if part]
+        if parts and parts[0] == "messages":
+            return "whapi." + ".".join(parts[:2])
+        return "whapi." + (parts[0] if parts else "unknown")
+
+    def _send_with_retries(
+        self,
+        *,
+        method: str,
+        token: str,
+        endpoint: str,
+        payload: Dict[str, Any],
     ) -> Dict[str, Any]:
         url = endpoint
         headers = {
@@ -181,9 +204,10 @@ class WhapiDeliveryService:
         if messages:
             message_batch = [text.strip() for text in messages if isinstance(text, str) and text.strip()]
         if not message_batch:
-            if not reply or not reply.strip():
+            if reply and reply.strip():
+                message_batch = [reply.strip()]
+            elif not attachments:
                 return {"ok": False, "reason": "empty_reply"}
-            message_batch = [reply.strip()]
 
         realtor = official_data.get("realtor") or {}
         token = (
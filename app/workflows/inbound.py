@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import functools
 import logging
+import time
 from operator import add
-from typing import Annotated, Any, Dict, List, Optional, TypedDict
+from typing import Annotated, Any, Callable, Dict, List, Optional, TypedDict
 
 from langgraph.graph import END, StateGraph
 
 from app.core.config import Settings
+from app.core.metrics import observe_stage
 from app.services.project_repository import ProjectRepository
 from app.services.prospect_repository import ProspectRepository
 from app.services.realtor_repository import RealtorRepository
@@ -30,6 +33,27 @@ class InboundState(TypedDict, total=False):
     handoff_reason: Optional[str]
 
 
+def _timed_node(name: str, node: Callable[[InboundState], InboundState]):
+    """Wrap a graph node so its latency is recorded with the realtor it resolved."""
+
+    @functools.wraps(node)
+    def wrapper(state: InboundState) -> InboundState:
+        started = time.perf_counter()
+        result: Optional[InboundState] = None
+        try:
+            result = node(state)
+            return result
+        finally:
+            normalized = (result or {}).get("normalized") or state.get("normalized") or {}
+            observe_stage(
+                f"inbound.{name}",
+                time.perf_counter() - started,
+                realtor_id=normalized.get("realtor_id"),
+            )
+
+    return wrapper
+
+
 def build_inbound_workflow(settings: Settings):
     client = get_supabase_client(settings)
     if client is None:
@@ -363,16 +387,16 @@ def build_inbound_workflow(settings: Settings):
     def prospect_exists_cond(state: InboundState) -> bool:
         return bool(state.get("prospect_exists"))
 
-    graph.add_node("init", init_payload)
-    graph.add_node("normalize", normalize_payload)
-    graph.add_node("realtor", fetch_realtor)
-    graph.add_node("lookup_prospect", lookup_prospect)
-    graph.add_node("create_prospect", create_prospect)
-    graph.add_node("hydrate_prospect", hydrate_prospect)
-    graph.add_node("load_properties", load_properties)
-    graph.add_node("consolidate_official", consolidate_official_data)
-    graph.add_node("apply_opt_out", apply_opt_out)
-    graph.add_node("apply_automation", apply_automation_flag)
+    graph.add_node("init", _timed_node("init", init_payload))
+    graph.add_node("normalize", _timed_node("normalize", normalize_payload))
+    graph.add_node("realtor", _timed_node("realtor", fetch_realtor))
+    graph.add_node("lookup_prospect", _timed_node("lookup_prospect", lookup_prospect))
+    graph.add_node("create_prospect", _timed_node("create_prospect", create_prospect))
+    graph.add_node("hydrate_prospect", _timed_node("hydrate_prospect", hydrate_prospect))
+    graph.add_node("load_properties", _timed_node("load_properties", load_properties))
+    graph.add_node("consolidate_official", _timed_node("consolidate_official", consolidate_official_data))
+    graph.add_node("apply_opt_out", _timed_node("apply_opt_out", apply_opt_out))
+    graph.add_node("apply_automation", _timed_node("apply_automation", apply_automation_flag))
 
     graph.set_entry_point("init")
     graph.add_edge("init", "normalize")
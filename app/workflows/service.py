@@ -6,6 +6,7 @@ import logging
 from typing import Any, Dict
 
 from app.core.config import Settings
+from app.core.metrics import timed_stage
 from app.workflows.inbound import InboundState, build_inbound_workflow
 
 logger = logging.getLogger(__name__)
@@ -30,7 +31,8 @@ class InboundWorkflowService:
             return self._fallback_state(payload)
 
         graph = self._ensure_graph()
-        result = graph.invoke({"payload": payload})
+        with timed_stage("inbound.workflow"):
+            result = graph.invoke({"payload": payload})
         return result
 
     def _ensure_graph(self):
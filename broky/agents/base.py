@@ -8,7 +8,9 @@ from typing import Any, Dict
 
 from langchain_core.runnables import Runnable
 
+from app.core.metrics import timed_stage
 from broky.core import BrokyContext
+from broky.llm import realtor_scope
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,9 @@ logger = logging.getLogger(__name__)
 class BrokyAgent(ABC):
     """Interfaz mínima para agentes ejecutados desde LangGraph."""
 
+    #: Nombre con el que el agente se identifica ante la factory LLM y las métricas.
+    AGENT_NAME = "agent"
+
     def __init__(self, *, runnable: Runnable) -> None:
         self._runnable = runnable
 
@@ -30,5 +35,6 @@ class BrokyAgent(ABC):
     def invoke(self, context: BrokyContext) -> BrokyContext:
         payload = self.build_input(context)
         logger.debug("Ejecutando agente %s con payload=%s", self.__class__.__name__, payload)
-        result = self._runnable.invoke(payload)
-        return self.handle_output(context, result)
+        with timed_stage(f"agent.{self.AGENT_NAME}"), realtor_scope(context.realtor_id):
+            result = self._runnable.invoke(payload)
+            return self.handle_output(context, result)
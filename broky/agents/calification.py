@@ -10,11 +10,12 @@ from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
+from broky.memory import summary_prompt
 from broky.tools import CalificationUpdateTool
 
 logger = logging.getLogger(__name__)
@@ -23,23 +24,19 @@ logger = logging.getLogger(__name__)
 class CalificationAgentExecutor(BrokyAgent):
     """Subagente que resume información financiera del prospecto."""
 
+    AGENT_NAME = "calification"
     PROMPT_PATH = Path("docs/prompts/calification_subagent_prompt.md")
 
     def __init__(self, tool: CalificationUpdateTool) -> None:
         self._settings = get_langchain_settings()
         self._tool = tool
-        if self._settings.openai_api_key:
-            self._model = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0,
-                model_kwargs={"response_format": {"type": "json_object"}}
-            )
-        else:
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0, json_mode=True
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; CalificationAgentExecutor operará con heurística"
             )
-            self._model = None
 
         self._prompt_text = self._load_prompt()
 
@@ -56,6 +53,7 @@ class CalificationAgentExecutor(BrokyAgent):
         return {
             "message": message,
             "history": history,
+            "history_summary": summary_prompt(context.memory_snapshot),
             "stage": stage,
             "realtor": realtor,
             "prospect_id": context.prospect_id or normalized.get("prospect_id"),
@@ -88,6 +86,7 @@ class CalificationAgentExecutor(BrokyAgent):
         structured = self._invoke_llm(
             message=message,
             history=payload.get("history") or [],
+            history_summary=payload.get("history_summary"),
             stage=payload.get("stage"),
             realtor=payload.get("realtor") or {},
         )
@@ -128,10 +127,11 @@ class CalificationAgentExecutor(BrokyAgent):
         *,
         message: str,
         history: List[Dict[str, Any]],
+        history_summary: Optional[str] = None,
         stage: Optional[str],
         realtor: Dict[str, Any],
     ) -> Optional[Dict[str, Any]]:
-        if not self._model or not self._prompt_text:
+        if not self._model or not self._model.available or not self._prompt_text:
             return None
 
         messages = [SystemMessage(content=self._prompt_text)]
@@ -145,6 +145,9 @@ class CalificationAgentExecutor(BrokyAgent):
         if context_lines:
             messages.append(SystemMessage(content="\n".join(context_lines)))
 
+        if history_summary:
+            messages.append(SystemMessage(content=history_summary))
+
         for item in history:
             role = item.get("sender_role") or item.get("role")
             content = item.get("message") or item.get("content")
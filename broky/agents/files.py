@@ -12,11 +12,12 @@ from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
+from broky.memory import summary_prompt
 from broky.tools import ProjectFilesTool, ProjectsListTool
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,7 @@ logger = logging.getLogger(__name__)
 class FilesAgentExecutor(BrokyAgent):
     """Subagente que localiza y entrega archivos solicitados por el usuario."""
 
+    AGENT_NAME = "files"
     PROMPT_PATH = Path("docs/prompts/files_subagent_prompt.md")
     SUPPORTED_TYPES = {"image", "video", "kmz", "document"}
 
@@ -36,18 +38,13 @@ class FilesAgentExecutor(BrokyAgent):
         self._settings = get_langchain_settings()
         self._projects_tool = projects_tool
         self._files_tool = files_tool
-        if self._settings.openai_api_key:
-            self._model = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0,
-                model_kwargs={"response_format": {"type": "json_object"}}
-            )
-        else:
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0, json_mode=True
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; FilesAgentExecutor operará con heurística"
             )
-            self._model = None
 
         self._prompt_text = self._load_prompt()
 
@@ -64,6 +61,7 @@ class FilesAgentExecutor(BrokyAgent):
         return {
             "message": message,
             "history": history,
+            "history_summary": summary_prompt(context.memory_snapshot),
             "realtor_id": realtor_id,
             "candidates": candidates,
         }
@@ -93,6 +91,7 @@ class FilesAgentExecutor(BrokyAgent):
         structured = self._invoke_llm(
             message=message,
             history=payload.get("history") or [],
+            history_summary=payload.get("history_summary"),
         )
 
         if not structured:
@@ -180,11 +179,14 @@ class FilesAgentExecutor(BrokyAgent):
         *,
         message: str,
         history: List[Dict[str, Any]],
+        history_summary: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
-        if not self._model or not self._prompt_text:
+        if not self._model or not self._model.available or not self._prompt_text:
             return None
 
         messages = [SystemMessage(content=self._prompt_text)]
+        if history_summary:
+            messages.append(SystemMessage(content=history_summary))
         for item in history:
             role = item.get("sender_role") or item.get("role")
             content = item.get("message") or item.get("content")
@@ -8,11 +8,11 @@ from typing import Any, Dict, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +20,18 @@ logger = logging.getLogger(__name__)
 class FixingResponseAgentExecutor(BrokyAgent):
     """Reescribe la respuesta base para mantener tono humano y conciso."""
 
+    AGENT_NAME = "fixing_response"
     PROMPT_PATH = Path("docs/new_prompts/fixing_response.md")
 
     def __init__(self) -> None:
         self._settings = get_langchain_settings()
-        if self._settings.openai_api_key:
-            self._model: Optional[ChatOpenAI] = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0.1,
-            )
-        else:
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0.1
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; FixingResponseAgentExecutor usará modo pasivo"
             )
-            self._model = None
 
         self._prompt_template = self._load_prompt()
 
@@ -55,6 +52,12 @@ class FixingResponseAgentExecutor(BrokyAgent):
             context.metadata.setdefault("postprocess", {})["humanized_reply"] = rewritten
         return context
 
+    def rewrite(self, base_reply: str, *, user_message: Optional[str] = None) -> str:
+        """Rewrite a piece of reply outside the chain (e.g. the streamed segment)."""
+
+        result = self._execute({"user_message": user_message, "base_reply": base_reply})
+        return (result.get("reply") or base_reply).strip()
+
     # ------------------------------------------------------------------
 
     def _execute(self, payload: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
@@ -62,7 +65,7 @@ class FixingResponseAgentExecutor(BrokyAgent):
         if not base_reply:
             return {"reply": payload.get("base_reply")}
 
-        if not self._model or not self._prompt_template:
+        if not self._model or not self._model.available or not self._prompt_template:
             return {"reply": base_reply}
 
         rendered_prompt = self._render_prompt(
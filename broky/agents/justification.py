@@ -9,11 +9,11 @@ from typing import Any, Dict, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
 
 logger = logging.getLogger(__name__)
 
@@ -21,22 +21,18 @@ logger = logging.getLogger(__name__)
 class JustificationAgentExecutor(BrokyAgent):
     """Determina si corresponde generar una justificación para el equipo humano."""
 
+    AGENT_NAME = "justification"
     PROMPT_PATH = Path("docs/new_prompts/Basic LLM Chain5.md")
 
     def __init__(self) -> None:
         self._settings = get_langchain_settings()
-        if self._settings.openai_api_key:
-            self._model: Optional[ChatOpenAI] = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0,
-                model_kwargs={"response_format": {"type": "json_object"}},
-            )
-        else:
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0, json_mode=True
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; JustificationAgentExecutor operará en modo pasivo"
             )
-            self._model = None
 
         self._prompt_template = self._load_prompt()
 
@@ -63,7 +59,7 @@ class JustificationAgentExecutor(BrokyAgent):
         if not reply:
             return {"justificacion": "No"}
 
-        if not self._model or not self._prompt_template:
+        if not self._model or not self._model.available or not self._prompt_template:
             return {"justificacion": "No"}
 
         rendered_prompt = self._render_prompt(
@@ -10,11 +10,12 @@ from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
+from broky.memory import summary_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +23,17 @@ logger = logging.getLogger(__name__)
 class MasterAgentExecutor(BrokyAgent):
     """Ejecutor responsable de clasificar intenciones y banderas de flujo."""
 
+    AGENT_NAME = "master"
+
     def __init__(self) -> None:
         self._settings = get_langchain_settings()
-        self._model: Optional[ChatOpenAI]
-        if self._settings.openai_api_key:
-            self._model = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0.2,
-                model_kwargs={"response_format": {"type": "json_object"}}
-            )
-        else:
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0.2, json_mode=True
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; MasterAgentExecutor operará en modo heurístico"
             )
-            self._model = None
         self._prompt_text = self._load_prompt()
 
         super().__init__(runnable=RunnableLambda(self._execute))
@@ -51,6 +48,7 @@ class MasterAgentExecutor(BrokyAgent):
             "session_id": context.session_id,
             "message": message,
             "history": history,
+            "history_summary": summary_prompt(context.memory_snapshot),
             "context": compiled_context,
             "realtor_id": payload.get("realtor_id") or context.realtor_id,
             "metadata": payload.get("metadata") or {},
@@ -83,9 +81,10 @@ class MasterAgentExecutor(BrokyAgent):
             message=message,
             context_block=payload.get("context"),
             history=payload.get("history") or [],
+            history_summary=payload.get("history_summary"),
         )
 
-        if not self._model:
+        if not self._model or not self._model.available:
             return self._heuristic_output(message)
 
         try:
@@ -124,10 +123,13 @@ class MasterAgentExecutor(BrokyAgent):
         message: str,
         context_block: Optional[str],
         history: List[Dict[str, Any]],
+        history_summary: Optional[str] = None,
     ) -> List[Any]:
         messages: List[Any] = [SystemMessage(content=self._prompt_text)]
         if context_block:
             messages.append(SystemMessage(content=context_block))
+        if history_summary:
+            messages.append(SystemMessage(content=history_summary))
 
         for item in history:
             role = item.get("sender_role") or item.get("role")
@@ -18,6 +18,8 @@ from broky.tools.projects import ProjectsListTool
 class ProjectInterestAgentExecutor(BrokyAgent):
     """Actualiza intereses de proyectos mediante herramientas LangChain."""
 
+    AGENT_NAME = "project_interest"
+
     def __init__(
         self,
         tool: ProjectInterestLinkTool,
@@ -14,6 +14,8 @@ from broky.tools import RAGSearchTool
 class RAGAgentExecutor(BrokyAgent):
     """Ejecutor LangChain del subagente RAG."""
 
+    AGENT_NAME = "rag"
+
     def __init__(self, tool: RAGSearchTool) -> None:
         self._tool = tool
         super().__init__(runnable=RunnableLambda(self._invoke_tool))
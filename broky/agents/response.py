@@ -4,15 +4,19 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
+from broky.agents.fixing_response import FixingResponseAgentExecutor
+from broky.agents.segmenter import StreamSegmenter
+from broky.agents.splitter import SplitResponseAgentExecutor
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
+from broky.memory import summary_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +24,21 @@ logger = logging.getLogger(__name__)
 class ResponseAgentExecutor(BrokyAgent):
     """Genera respuestas breves y consistentes con la etapa del prospecto."""
 
+    AGENT_NAME = "response"
     MAX_HISTORY_MESSAGES = 6
+    STREAM_MIN_SEGMENT = 60
 
-    def __init__(self) -> None:
+    def __init__(self, fixer: Optional[FixingResponseAgentExecutor] = None) -> None:
         self._settings = get_langchain_settings()
-        if self._settings.openai_api_key:
-            self._model: Optional[ChatOpenAI] = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0.2,
-            )
-        else:
+        # El fragmento en streaming sale antes del fixing del runtime: se corrige aquí.
+        self._fixer = fixer
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0.2
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; ResponseAgentExecutor operará con heurística"
             )
-            self._model = None
 
         self._prompt_template = self._load_prompt()
 
@@ -66,9 +70,11 @@ class ResponseAgentExecutor(BrokyAgent):
         return {
             "message": message,
             "history": history,
+            "history_summary": summary_prompt(context.memory_snapshot),
             "system_prompt": system_prompt,
             "context_block": context_block,
             "stage": stage,
+            "on_segment": context.stream_callback,
         }
 
     def handle_output(self, context: BrokyContext, result: Dict[str, Any]) -> BrokyContext:
@@ -80,6 +86,21 @@ class ResponseAgentExecutor(BrokyAgent):
         reply = self._append_file_links(reply, context)
         reply = self._trim_reply(reply)
 
+        streamed = result.get("streamed_segment")
+        if isinstance(streamed, str) and streamed:
+            # El primer fragmento ya salió hacia WhatsApp: solo el resto pasa por
+            # fixing/splitter y el runtime antepone lo enviado a `split_messages`.
+            delivered = result.get("delivered_segment") or streamed
+            context.metadata.setdefault("postprocess", {})["streamed_segments"] = [delivered]
+            if reply.startswith(streamed):
+                reply = reply[len(streamed) :].strip()
+            else:
+                # No se sabe qué parte ya se envió: mejor no repetir contenido.
+                logger.warning(
+                    "La respuesta final no comienza con el fragmento enviado en streaming; se descarta el resto"
+                )
+                reply = ""
+
         context.metadata["reply"] = reply
         context.metadata.setdefault("response_agent", {})["stage"] = result.get("stage")
         context.append_log(f"ResponseAgent reply_length={len(reply)}")
@@ -97,6 +118,9 @@ class ResponseAgentExecutor(BrokyAgent):
         context_block = payload.get("context_block")
         if context_block:
             messages.append(SystemMessage(content=context_block))
+        history_summary = payload.get("history_summary")
+        if history_summary:
+            messages.append(SystemMessage(content=history_summary))
 
         for item in payload.get("history") or []:
             role = item.get("sender_role") or item.get("role")
@@ -113,9 +137,13 @@ class ResponseAgentExecutor(BrokyAgent):
 
         messages.append(HumanMessage(content=message))
 
-        if not self._model:
+        if not self._model or not self._model.available:
             return {"reply": None, "stage": payload.get("stage")}
 
+        on_segment = payload.get("on_segment")
+        if callable(on_segment):
+            return self._execute_streaming(messages, on_segment, payload.get("stage"), message)
+
         try:
             response = self._model.invoke(messages)
         except Exception:  # pragma: no cover - fallback heurístico
@@ -129,6 +157,58 @@ class ResponseAgentExecutor(BrokyAgent):
 
         return {"reply": content.strip(), "stage": payload.get("stage")}
 
+    def _execute_streaming(
+        self,
+        messages: List[Any],
+        on_segment: Callable[[str], None],
+        stage: Optional[str],
+        user_message: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        segmenter = StreamSegmenter(
+            min_length=self.STREAM_MIN_SEGMENT, max_length=SplitResponseAgentExecutor.MAX_LENGTH
+        )
+        streamed: Optional[str] = None
+        delivered: Optional[str] = None
+        try:
+            for chunk in self._model.stream(messages):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                segment = segmenter.feed(text)
+                if segment and streamed is None:
+                    prepared = self._prepare_segment(segment, user_message)
+                    try:
+                        on_segment(prepared)
+                    except Exception:  # pragma: no cover - la entrega no debe cortar la generación
+                        logger.exception("No se pudo entregar el primer fragmento en streaming")
+                    else:
+                        streamed, delivered = segment, prepared
+        except Exception:  # pragma: no cover - fallback heurístico
+            logger.exception("OpenAI falló en streaming para ResponseAgent; usando fallback")
+            if streamed is None:
+                return {"reply": None, "stage": stage}
+
+        content = segmenter.text.strip()
+        if not content:
+            logger.warning("ResponseAgent recibió contenido vacío; se usará fallback")
+            return {"reply": None, "stage": stage}
+
+        return {
+            "reply": content,
+            "stage": stage,
+            "streamed_segment": streamed,
+            "delivered_segment": delivered,
+        }
+
+    def _prepare_segment(self, segment: str, user_message: Optional[str]) -> str:
+        """Apply the fixing and length rules of the full reply to the streamed segment.
+
+        Special cases and file links only append to the end of the reply, so
+        they stay in the part that is sent afterwards.
+        """
+
+        if self._fixer is not None:
+            segment = self._fixer.rewrite(segment, user_message=user_message)
+        return self._trim_reply(segment)
+
     # ------------------------------------------------------------------
 
     @staticmethod
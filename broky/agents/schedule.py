@@ -10,11 +10,12 @@ from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 
 from broky.agents.base import BrokyAgent
 from broky.config import get_langchain_settings
 from broky.core import BrokyContext
+from broky.llm import ChatModelHandle, get_llm_factory
+from broky.memory import summary_prompt
 from broky.tools import ScheduleVisitTool
 
 logger = logging.getLogger(__name__)
@@ -23,23 +24,19 @@ logger = logging.getLogger(__name__)
 class ScheduleAgentExecutor(BrokyAgent):
     """Subagente responsable de registrar visitas agendadas."""
 
+    AGENT_NAME = "schedule"
     PROMPT_PATH = Path("docs/prompts/schedule_subagent_prompt.md")
 
     def __init__(self, tool: ScheduleVisitTool) -> None:
         self._settings = get_langchain_settings()
         self._tool = tool
-        if self._settings.openai_api_key:
-            self._model = ChatOpenAI(
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_model,
-                temperature=0,
-                model_kwargs={"response_format": {"type": "json_object"}}
-            )
-        else:
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            self.AGENT_NAME, temperature=0, json_mode=True
+        )
+        if self._model is None:
             logger.warning(
                 "OPENAI_API_KEY no configurado; ScheduleAgentExecutor operará con heurística"
             )
-            self._model = None
 
         self._prompt_text = self._load_prompt()
 
@@ -57,6 +54,7 @@ class ScheduleAgentExecutor(BrokyAgent):
         return {
             "message": message,
             "history": history,
+            "history_summary": summary_prompt(context.memory_snapshot),
             "stage": stage,
             "prospect_id": prospect_id,
             "scheduled_at": scheduled_at,
@@ -100,6 +98,7 @@ class ScheduleAgentExecutor(BrokyAgent):
         structured = self._invoke_llm(
             message=message,
             history=payload.get("history") or [],
+            history_summary=payload.get("history_summary"),
             current_date=payload.get("current_date") or date.today().isoformat(),
         )
 
@@ -137,9 +136,10 @@ class ScheduleAgentExecutor(BrokyAgent):
         *,
         message: str,
         history: List[Dict[str, Any]],
+        history_summary: Optional[str] = None,
         current_date: str,
     ) -> Optional[Dict[str, Any]]:
-        if not self._model or not self._prompt_text:
+        if not self._model or not self._model.available or not self._prompt_text:
             return None
 
         messages = [SystemMessage(content=self._prompt_text)]
@@ -149,6 +149,9 @@ class ScheduleAgentExecutor(BrokyAgent):
             )
         )
 
+        if history_summary:
+            messages.append(SystemMessage(content=history_summary))
+
         for item in history:
             role = item.get("sender_role") or item.get("role")
             content = item.get("message") or item.get("content")
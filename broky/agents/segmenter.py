@@ -0,0 +1,78 @@
+"""Local segmenter that cuts the first WhatsApp-sized message out of a token stream."""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+_SENTENCE_END = re.compile(r"(\n\n|\n|[.!?…](?=\s))")
+
+
+class StreamSegmenter:
+    """Acumula tokens y devuelve el primer fragmento completo apenas existe.
+
+    Un fragmento es completo cuando termina en fin de oración o salto de línea
+    y supera `min_length`; si el texto llega a `max_length` sin un corte natural
+    se parte en el último espacio, igual que `SplitResponseAgentExecutor`.
+    """
+
+    def __init__(self, *, min_length: int = 60, max_length: int = 400) -> None:
+        self._min_length = max(1, min_length)
+        self._max_length = max(self._min_length, max_length)
+        self._buffer = ""
+        self._first: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    @property
+    def first_segment(self) -> Optional[str]:
+        return self._first
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add streamed text; return the first segment the moment it is complete."""
+
+        if not chunk:
+            return None
+        self._buffer += chunk
+        if self._first is not None:
+            return None
+
+        segment = self._cut()
+        if segment:
+            self._first = segment
+        return segment
+
+    def remainder(self) -> str:
+        """Text generated after the first segment (the whole text if none was cut)."""
+
+        if self._first is None:
+            return self._buffer.strip()
+        stripped = self._buffer.lstrip()
+        if stripped.startswith(self._first):
+            return stripped[len(self._first) :].strip()
+        return stripped
+
+    # ------------------------------------------------------------------
+
+    def _cut(self) -> Optional[str]:
+        text = self._buffer.lstrip()
+        for match in _SENTENCE_END.finditer(text):
+            end = match.end()
+            if end > self._max_length:
+                break
+            if end >= self._min_length:
+                return text[:end].strip() or None
+
+        if len(text) < self._max_length:
+            return None
+
+        window = text[: self._max_length]
+        break_index = max(window.rfind(", "), window.rfind("; "), window.rfind(" "))
+        if break_index < self._max_length * 0.4:
+            break_index = self._max_length
+        return window[: break_index + 1].strip() or None
+
+
+__all__ = ["StreamSegmenter"]
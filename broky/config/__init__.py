@@ -1,5 +1,12 @@
 """Configuration helpers for LangChain integration."""
 
+from .routing import AgentRoute, RoutingTable, load_routing_table
 from .settings import LangChainSettings, get_langchain_settings
 
-__all__ = ["LangChainSettings", "get_langchain_settings"]
+__all__ = [
+    "AgentRoute",
+    "LangChainSettings",
+    "RoutingTable",
+    "get_langchain_settings",
+    "load_routing_table",
+]
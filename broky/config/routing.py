@@ -0,0 +1,67 @@
+"""Per-agent model routing table with per-realtor overrides."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AgentRoute(BaseModel):
+    """Modelo y límites que usa un agente; los campos vacíos heredan el valor por defecto."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    model: Optional[str] = None
+    max_tokens: Optional[int] = Field(default=None, gt=0)
+    timeout: Optional[float] = Field(default=None, gt=0)
+
+    def merged(self, override: Optional["AgentRoute"]) -> "AgentRoute":
+        if override is None:
+            return self
+        return AgentRoute(
+            model=override.model or self.model,
+            max_tokens=override.max_tokens or self.max_tokens,
+            timeout=override.timeout or self.timeout,
+        )
+
+
+class RoutingTable(BaseModel):
+    """Mapa `AGENT_NAME -> AgentRoute`, con overrides opcionales por `realtor_id`.
+
+    Formato JSON::
+
+        {
+          "agents": {"splitter": {"model": "gpt-4.1-nano", "max_tokens": 300}},
+          "realtors": {"<realtor_id>": {"response": {"model": "gpt-4o"}}}
+        }
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    agents: Dict[str, AgentRoute] = Field(default_factory=dict)
+    realtors: Dict[str, Dict[str, AgentRoute]] = Field(default_factory=dict)
+
+    def resolve(self, agent: str, realtor_id: Optional[str] = None) -> AgentRoute:
+        route = self.agents.get(agent) or AgentRoute()
+        if realtor_id:
+            route = route.merged(self.realtors.get(str(realtor_id), {}).get(agent))
+        return route
+
+
+def load_routing_table(source: Union[str, Dict[str, Any], None]) -> RoutingTable:
+    """Build a table from a dict, an inline JSON string or a path to a JSON file."""
+
+    if source is None or source == "":
+        return RoutingTable()
+    if isinstance(source, dict):
+        return RoutingTable.model_validate(source)
+    text = source.strip()
+    if not text.startswith("{"):
+        text = Path(text).read_text(encoding="utf-8")
+    return RoutingTable.model_validate(json.loads(text))
+
+
+__all__ = ["AgentRoute", "RoutingTable", "load_routing_table"]
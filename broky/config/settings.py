@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import json
 import os
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from .routing import RoutingTable, load_routing_table
 
 
 class LangChainSettings(BaseModel):
@@ -25,9 +28,60 @@ class LangChainSettings(BaseModel):
     default_vector_limit: int = Field(default=5, alias="VECTOR_SEARCH_LIMIT")
     default_vector_threshold: float = Field(default=0.7, alias="VECTOR_SEARCH_THRESHOLD")
 
+    llm_max_connections: int = Field(default=20, alias="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(default=10, alias="LLM_MAX_KEEPALIVE_CONNECTIONS")
+    llm_keepalive_expiry: float = Field(default=30.0, alias="LLM_KEEPALIVE_EXPIRY")
+    llm_http2: bool = Field(default=True, alias="LLM_HTTP2")
+    llm_timeout: float = Field(default=30.0, alias="LLM_TIMEOUT")
+    llm_max_retries: int = Field(default=2, alias="LLM_MAX_RETRIES")
+    llm_circuit_enabled: bool = Field(default=True, alias="LLM_CIRCUIT_ENABLED")
+    llm_circuit_failure_threshold: int = Field(default=5, alias="LLM_CIRCUIT_FAILURE_THRESHOLD")
+    llm_circuit_recovery_seconds: float = Field(
+        default=20.0, alias="LLM_CIRCUIT_RECOVERY_SECONDS"
+    )
+    llm_circuit_half_open_probes: int = Field(default=1, alias="LLM_CIRCUIT_HALF_OPEN_PROBES")
+    llm_cassette_mode: str = Field(default="off", alias="LLM_CASSETTE_MODE")
+    llm_cassette_path: str = Field(default="llm_cassette.jsonl.gz", alias="LLM_CASSETTE_PATH")
+    llm_cassette_latency: str = Field(default="original", alias="LLM_CASSETTE_LATENCY")
+    llm_routing: RoutingTable = Field(default_factory=RoutingTable, alias="LLM_ROUTING")
+    llm_pricing: Dict[str, Tuple[float, float]] = Field(
+        default_factory=dict, alias="LLM_PRICING"
+    )
+
     class Config:
         populate_by_name = True
 
+    @field_validator("llm_routing", mode="before")
+    @classmethod
+    def _parse_routing(cls, value: Any) -> Any:
+        # LLM_ROUTING acepta JSON inline o la ruta a un archivo JSON.
+        if isinstance(value, str):
+            return load_routing_table(value)
+        return value
+
+    @field_validator("llm_pricing", mode="before")
+    @classmethod
+    def _parse_pricing(cls, value: Any) -> Any:
+        # LLM_PRICING: {"modelo": [usd_input_1M, usd_output_1M]}
+        if isinstance(value, str):
+            return json.loads(value) if value.strip() else {}
+        return value
+
+    @field_validator("llm_cassette_mode", "llm_cassette_latency", mode="before")
+    @classmethod
+    def _normalize_cassette(cls, value: Any, info: Any) -> Any:
+        # LLM_CASSETTE_MODE: off | record | replay; LLM_CASSETTE_LATENCY: original | zero
+        if isinstance(value, str):
+            value = value.strip().lower()
+            allowed = (
+                ("off", "record", "replay")
+                if info.field_name == "llm_cassette_mode"
+                else ("original", "zero")
+            )
+            if value not in allowed:
+                raise ValueError(f"valor no soportado: {value!r} (usar {', '.join(allowed)})")
+        return value
+
     @property
     def supabase_api_key(self) -> Optional[str]:
         return self.supabase_service_role_key
@@ -53,6 +107,21 @@ def get_langchain_settings() -> LangChainSettings:
             "SUPABASE_SERVICE_ROLE_KEY",
             "VECTOR_SEARCH_LIMIT",
             "VECTOR_SEARCH_THRESHOLD",
+            "LLM_MAX_CONNECTIONS",
+            "LLM_MAX_KEEPALIVE_CONNECTIONS",
+            "LLM_KEEPALIVE_EXPIRY",
+            "LLM_HTTP2",
+            "LLM_TIMEOUT",
+            "LLM_MAX_RETRIES",
+            "LLM_CIRCUIT_ENABLED",
+            "LLM_CIRCUIT_FAILURE_THRESHOLD",
+            "LLM_CIRCUIT_RECOVERY_SECONDS",
+            "LLM_CIRCUIT_HALF_OPEN_PROBES",
+            "LLM_CASSETTE_MODE",
+            "LLM_CASSETTE_PATH",
+            "LLM_CASSETTE_LATENCY",
+            "LLM_ROUTING",
+            "LLM_PRICING",
         )
         if (value := os.getenv(key)) is not None
     }
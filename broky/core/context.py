@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 
 @dataclass
@@ -24,6 +24,10 @@ class BrokyContext:
     handoff_reason: Optional[str] = None
     memory_snapshot: Dict[str, Any] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Callback para entregar fragmentos en streaming; no se serializa.
+    stream_callback: Optional[Callable[[str], None]] = field(
+        default=None, repr=False, compare=False
+    )
 
     def append_log(self, message: str) -> None:
         """Add a log entry preserving order for trazabilidad."""
@@ -0,0 +1,34 @@
+"""Shared LLM client layer for Broky agents."""
+
+from .cassette import Cassette, CassetteMissError, CassetteTransport
+from .circuit import CircuitBreaker, LLMCircuitOpenError
+from .context import current_realtor, realtor_scope
+from .factory import (
+    AgentCallStats,
+    CallRecord,
+    ChatModelHandle,
+    LLMClientFactory,
+    OpenAIClientHandle,
+    get_llm_factory,
+)
+from .usage import UsageCollector, current_usage_collector, estimate_cost, usage_scope
+
+__all__ = [
+    "AgentCallStats",
+    "CallRecord",
+    "Cassette",
+    "CassetteMissError",
+    "CassetteTransport",
+    "ChatModelHandle",
+    "CircuitBreaker",
+    "LLMCircuitOpenError",
+    "LLMClientFactory",
+    "OpenAIClientHandle",
+    "UsageCollector",
+    "current_realtor",
+    "current_usage_collector",
+    "estimate_cost",
+    "get_llm_factory",
+    "realtor_scope",
+    "usage_scope",
+]
@@ -0,0 +1,213 @@
+"""Record/replay of OpenAI HTTP exchanges for reproducible benchmarks.
+
+The cassette sits at the transport level of the shared LLM pool, so every
+agent (`ChatModelHandle`) and the RAG client go through it, streaming included.
+Each exchange is keyed by the SHA-256 of the canonical request (method, path
+and JSON body with sorted keys) and appended to a gzip JSONL file.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+CASSETTE_MODES = (MODE_OFF, MODE_RECORD, MODE_REPLAY)
+
+# Cabeceras que dejan de ser válidas al guardar el cuerpo ya decodificado.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+# `code` del error que devuelve el transporte cuando falta una grabación.
+CASSETTE_MISS_CODE = "cassette_miss"
+
+
+class CassetteMissError(RuntimeError):
+    """La petición no está grabada en el cassette (modo replay).
+
+    No es un error de red: el transporte responde un 404 que el SDK no
+    reintenta y `LLMClientFactory.track` lo traduce a esta excepción.
+    """
+
+
+def cassette_miss(exc: BaseException) -> Optional[CassetteMissError]:
+    """The `CassetteMissError` behind an SDK status error raised for a replay miss."""
+
+    if isinstance(exc, CassetteMissError):
+        return exc
+    if getattr(exc, "code", None) == CASSETTE_MISS_CODE:
+        return CassetteMissError(str(getattr(exc, "message", exc)))
+    return None
+
+
+def request_key(request: httpx.Request) -> str:
+    """Stable hash of a request: host and headers are ignored on purpose."""
+
+    body = request.content
+    try:
+        canonical: Any = json.loads(body) if body else None
+    except ValueError:
+        canonical = body.decode("utf-8", errors="replace")
+    payload = json.dumps(
+        {"method": request.method, "path": request.url.path, "body": canonical},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Grabaciones indexadas por clave; las repeticiones se sirven en orden."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        cassette = cls(path)
+        if cassette.path.exists():
+            with gzip.open(cassette.path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        entry = json.loads(line)
+                        cassette._entries.setdefault(entry["key"], []).append(entry)
+        return cassette
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._entries.values())
+
+    def next_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the next recording for `key`; the last one repeats when exhausted."""
+
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return entries[min(index, len(entries) - 1)]
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Cada escritura agrega un miembro gzip; gzip.open los lee concatenados.
+            with gzip.open(self.path, "at", encoding="utf-8") as handle:
+                handle.write(line)
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport que graba (record) o sirve (replay) las respuestas de OpenAI."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        *,
+        mode: str,
+        inner: Optional[httpx.BaseTransport] = None,
+        replay_latency: bool = True,
+    ) -> None:
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Modo de cassette no soportado: {mode}")
+        if mode == MODE_RECORD and inner is None:
+            raise ValueError("El modo record necesita un transporte real")
+        self.cassette = cassette
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = request_key(request)
+        if self.mode == MODE_REPLAY:
+            return self._replay(key, request)
+        return self._record(key, request)
+
+    def close(self) -> None:
+        if self._inner is not None:
+            self._inner.close()
+
+    def _replay(self, key: str, request: httpx.Request) -> httpx.Response:
+        entry = self.cassette.next_entry(key)
+        if entry is None:
+            logger.warning("Petición LLM sin grabación en el cassette | path=%s", request.url.path)
+            # Una excepción del transporte se reintentaría y abriría el circuito como
+            # una caída de red; un 404 sin reintento falla en el acto.
+            return httpx.Response(
+                404,
+                headers={"x-should-retry": "false"},
+                json={
+                    "error": {
+                        "message": f"Sin grabación para {request.url.path} ({key[:12]})",
+                        "type": "invalid_request_error",
+                        "code": CASSETTE_MISS_CODE,
+                    }
+                },
+                request=request,
+            )
+        if self.replay_latency and entry.get("elapsed"):
+            time.sleep(float(entry["elapsed"]))
+        return httpx.Response(
+            entry["status"],
+            headers=entry.get("headers") or {},
+            content=entry["body"].encode("utf-8"),
+            request=request,
+        )
+
+    def _record(self, key: str, request: httpx.Request) -> httpx.Response:
+        assert self._inner is not None
+        started = time.perf_counter()
+        response = self._inner.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - started
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _DROPPED_HEADERS
+        }
+        self.cassette.append(
+            {
+                "key": key,
+                "path": request.url.path,
+                "status": response.status_code,
+                "headers": headers,
+                "body": body.decode("utf-8", errors="replace"),
+                "elapsed": round(elapsed, 4),
+            }
+        )
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+
+__all__ = [
+    "CASSETTE_MODES",
+    "Cassette",
+    "CASSETTE_MISS_CODE",
+    "CassetteMissError",
+    "CassetteTransport",
+    "cassette_miss",
+    "MODE_OFF",
+    "MODE_RECORD",
+    "MODE_REPLAY",
+    "request_key",
+]
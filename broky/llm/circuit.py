@@ -0,0 +1,169 @@
+"""Shared circuit breaker for OpenAI calls."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+import httpx
+import openai
+
+from app.core.metrics import count_circuit_rejection, set_circuit_state
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Errores que indican degradación del proveedor; un 400 o un 401 no abren el circuito.
+_TRIPPING_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    openai.RateLimitError,
+    httpx.TimeoutException,
+    httpx.TransportError,
+)
+
+
+class LLMCircuitOpenError(RuntimeError):
+    """Raised instead of calling OpenAI while the circuit is open."""
+
+
+def is_tripping_error(exc: BaseException) -> bool:
+    return isinstance(exc, _TRIPPING_ERRORS)
+
+
+class CircuitBreaker:
+    """Closed → open after N consecutive failures; open → half-open after a cooldown.
+
+    In half-open only `half_open_probes` calls go through: one success closes the
+    circuit again, one failure re-opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        name: str = "openai",
+        *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 20.0,
+        half_open_probes: int = 1,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._name = name
+        self._failure_threshold = max(1, failure_threshold)
+        self._recovery_timeout = max(0.0, recovery_timeout)
+        self._half_open_probes = max(1, half_open_probes)
+        self._enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._rejections = 0
+        set_circuit_state(self._name, self._state)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    @property
+    def rejecting(self) -> bool:
+        """True while calls would be rejected, without consuming a half-open probe."""
+
+        if not self._enabled:
+            return False
+        with self._lock:
+            if self._state == OPEN:
+                return self._clock() - self._opened_at < self._recovery_timeout
+            if self._state == HALF_OPEN:
+                return self._probes_in_flight >= self._half_open_probes
+            return False
+
+    def allow(self) -> bool:
+        if not self._enabled:
+            return True
+        with self._lock:
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self._recovery_timeout:
+                    return self._reject()
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes_in_flight >= self._half_open_probes:
+                    return self._reject()
+                self._probes_in_flight += 1
+            return True
+
+    def before_call(self) -> None:
+        if not self.allow():
+            raise LLMCircuitOpenError(f"Circuito LLM '{self._name}' abierto")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._transition(CLOSED)
+
+    def record_failure(self, exc: BaseException) -> None:
+        if not is_tripping_error(exc):
+            # El proveedor respondió: para el circuito cuenta como éxito.
+            self.record_success()
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._open()
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self._failure_threshold:
+                self._open()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self._name,
+                "enabled": self._enabled,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "rejections": self._rejections,
+                "failure_threshold": self._failure_threshold,
+                "recovery_timeout": self._recovery_timeout,
+            }
+
+    # ------------------------------------------------------------------
+
+    def _reject(self) -> bool:
+        self._rejections += 1
+        count_circuit_rejection(self._name)
+        return False
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._failures = 0
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        logger.warning("Circuito LLM '%s': %s -> %s", self._name, self._state, state)
+        self._state = state
+        if state != HALF_OPEN:
+            self._probes_in_flight = 0
+        set_circuit_state(self._name, state)
+
+
+__all__ = [
+    "CLOSED",
+    "HALF_OPEN",
+    "OPEN",
+    "CircuitBreaker",
+    "LLMCircuitOpenError",
+    "is_tripping_error",
+]
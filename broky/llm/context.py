@@ -0,0 +1,27 @@
+"""Call-scoped context consumed by the LLM factory."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_current_realtor: ContextVar[Optional[str]] = ContextVar("broky_llm_realtor", default=None)
+
+
+def current_realtor() -> Optional[str]:
+    return _current_realtor.get()
+
+
+@contextmanager
+def realtor_scope(realtor_id: Optional[str]) -> Iterator[None]:
+    """Expose `realtor_id` to model routing for the calls made inside the block."""
+
+    token = _current_realtor.set(str(realtor_id) if realtor_id else None)
+    try:
+        yield
+    finally:
+        _current_realtor.reset(token)
+
+
+__all__ = ["current_realtor", "realtor_scope"]
@@ -0,0 +1,467 @@
+"""Central factory for OpenAI chat models sharing a single HTTP connection pool."""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import OpenAI
+
+from app.core.metrics import observe_stage
+from broky.config import AgentRoute, LangChainSettings, RoutingTable, get_langchain_settings
+from broky.llm.cassette import MODE_OFF, MODE_RECORD, Cassette, CassetteTransport, cassette_miss
+from broky.llm.circuit import CircuitBreaker
+from broky.llm.context import current_realtor
+from broky.llm.usage import DEFAULT_PRICING, current_usage_collector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentCallStats:
+    """Contadores acumulados de llamadas LLM para un agente."""
+
+    requests: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_latency: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def record(
+        self,
+        latency: float,
+        *,
+        ok: bool,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        self.requests += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        if not ok:
+            self.errors += 1
+        self.total_latency += latency
+        self.last_latency = latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def to_dict(self) -> Dict[str, Any]:
+        average = self.total_latency / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": round(average * 1000, 2),
+            "max_latency_ms": round(self.max_latency * 1000, 2),
+            "last_latency_ms": round(self.last_latency * 1000, 2),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+@dataclass
+class CallRecord:
+    """Uso de tokens reportado por una llamada; lo completa quien invoca."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def add_usage(self, usage: Any) -> None:
+        """Accept LangChain `usage_metadata` or an OpenAI SDK `usage` object."""
+
+        if usage is None:
+            return
+        if not isinstance(usage, dict):
+            usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+        self.input_tokens += int(usage.get("input_tokens") or usage.get("prompt_tokens") or 0)
+        self.output_tokens += int(
+            usage.get("output_tokens") or usage.get("completion_tokens") or 0
+        )
+
+
+class ChatModelHandle:
+    """Envoltura de `ChatOpenAI` que aplica la ruta del agente y registra métricas.
+
+    La ruta se resuelve en cada llamada porque depende del realtor activo; los
+    modelos resultantes se cachean por combinación de modelo/límites y se
+    reconstruyen si la factory cerró el pool HTTP desde entonces.
+    """
+
+    def __init__(self, factory: "LLMClientFactory", agent: str, options: Dict[str, Any]) -> None:
+        self._factory = factory
+        self._agent = agent
+        self._options = options
+        self._models: Dict[Tuple[Any, ...], ChatOpenAI] = {}
+        self._generation = factory.generation
+        self._lock = threading.Lock()
+
+    @property
+    def agent(self) -> str:
+        return self._agent
+
+    @property
+    def model_name(self) -> str:
+        return self.model_for(current_realtor()).model_name
+
+    @property
+    def available(self) -> bool:
+        """False while the shared circuit breaker rejects calls (go straight to heuristics)."""
+
+        return not self._factory.circuit.rejecting
+
+    def model_for(self, realtor_id: Optional[str] = None) -> ChatOpenAI:
+        route = self._factory.route(self._agent, realtor_id)
+        key = (route.model, route.max_tokens, route.timeout)
+        with self._lock:
+            if self._generation != self._factory.generation:
+                # Los modelos cacheados apuntan a un cliente HTTP ya cerrado.
+                self._models.clear()
+                self._generation = self._factory.generation
+            model = self._models.get(key)
+            if model is None:
+                model = self._factory.build_chat_model(route, self._options)
+                self._models[key] = model
+            return model
+
+    def invoke(self, messages: Any, **kwargs: Any) -> Any:
+        model = self.model_for(current_realtor())
+        with self._factory.track(self._agent, model=model.model_name) as call:
+            response = model.invoke(messages, **kwargs)
+            call.add_usage(getattr(response, "usage_metadata", None))
+        return response
+
+    def stream(self, messages: Any, **kwargs: Any) -> Iterator[Any]:
+        """Yield message chunks as the model produces them; usage is recorded at the end."""
+
+        model = self.model_for(current_realtor())
+        with self._factory.track(self._agent, model=model.model_name) as call:
+            for chunk in model.stream(messages, stream_usage=True, **kwargs):
+                call.add_usage(getattr(chunk, "usage_metadata", None))
+                yield chunk
+
+
+class OpenAIClientHandle:
+    """Cliente OpenAI crudo que sigue al pool de la factory tras `close()`.
+
+    Delega todo en un `OpenAI` construido sobre el cliente HTTP vigente y lo
+    reconstruye cuando la factory cierra y vuelve a abrir el pool.
+    """
+
+    def __init__(self, factory: "LLMClientFactory", api_key: str) -> None:
+        self._factory = factory
+        self._api_key = api_key
+        self._client: Optional[OpenAI] = None
+        self._generation = -1
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._current(), name)
+
+    def _current(self) -> OpenAI:
+        with self._lock:
+            if self._client is None or self._generation != self._factory.generation:
+                self._generation = self._factory.generation
+                self._client = self._factory.build_openai_client(self._api_key)
+            return self._client
+
+
+class LLMClientFactory:
+    """Construye modelos de chat que comparten pool HTTP, keep-alive y HTTP/2."""
+
+    def __init__(
+        self,
+        settings: LangChainSettings,
+        *,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        self._settings = settings
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._generation = 0
+        self._stats: Dict[str, AgentCallStats] = {}
+        self._routing = settings.llm_routing
+        self._pricing = {**DEFAULT_PRICING, **settings.llm_pricing}
+        self._circuit = self._build_circuit("openai")
+        # Embeddings es otro endpoint: su caída no debe cortar las completions.
+        self._embeddings_circuit = self._build_circuit("openai.embeddings")
+
+    @property
+    def circuit(self) -> CircuitBreaker:
+        return self._circuit
+
+    @property
+    def embeddings_circuit(self) -> CircuitBreaker:
+        return self._embeddings_circuit
+
+    @property
+    def pricing(self) -> Dict[str, Tuple[float, float]]:
+        return self._pricing
+
+    @property
+    def routing(self) -> RoutingTable:
+        return self._routing
+
+    def set_routing(self, routing: RoutingTable) -> None:
+        """Swap the routing table at runtime (benchmarks, hot reloads)."""
+
+        self._routing = routing
+
+    def route(self, agent: str, realtor_id: Optional[str] = None) -> AgentRoute:
+        """Resolve model, max_tokens and timeout for `agent`, filling defaults."""
+
+        resolved = self._routing.resolve(agent, realtor_id)
+        return AgentRoute(
+            model=resolved.model or self._settings.openai_model,
+            max_tokens=resolved.max_tokens,
+            timeout=resolved.timeout or self._settings.llm_timeout,
+        )
+
+    @property
+    def generation(self) -> int:
+        """Incremented by `close()`; handles rebuild their clients when it changes."""
+
+        return self._generation
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._settings.openai_api_key)
+
+    def http_client(self) -> httpx.Client:
+        """Return the process-wide HTTP client used by every OpenAI call."""
+
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = self._build_http_client()
+            return self._http_client
+
+    def chat_model(
+        self,
+        agent: str,
+        *,
+        temperature: float = 0.2,
+        json_mode: bool = False,
+        api_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Optional[ChatModelHandle]:
+        """Return a chat model for `agent`, or None when OpenAI is not configured.
+
+        The model, max_tokens and timeout come from the routing table (see
+        `broky.config.RoutingTable`), falling back to `OPENAI_MODEL`.
+        """
+
+        key = api_key or self._settings.openai_api_key
+        if not key:
+            return None
+
+        model_kwargs = dict(kwargs.pop("model_kwargs", None) or {})
+        if json_mode:
+            model_kwargs["response_format"] = {"type": "json_object"}
+
+        options: Dict[str, Any] = {
+            "api_key": key,
+            "temperature": temperature,
+            "model_kwargs": model_kwargs,
+            **kwargs,
+        }
+        return ChatModelHandle(self, agent, options)
+
+    def build_chat_model(self, route: AgentRoute, options: Dict[str, Any]) -> ChatOpenAI:
+        params = dict(options)
+        if route.max_tokens:
+            params["max_tokens"] = route.max_tokens
+        return ChatOpenAI(
+            model=route.model,
+            timeout=route.timeout,
+            max_retries=self._settings.llm_max_retries,
+            http_client=self.http_client(),
+            **params,
+        )
+
+    def openai_client(self, *, api_key: Optional[str] = None) -> Optional[OpenAIClientHandle]:
+        """Raw OpenAI SDK client on the shared pool, for callers outside LangChain."""
+
+        key = api_key or self._settings.openai_api_key
+        if not key:
+            return None
+        return OpenAIClientHandle(self, key)
+
+    def build_openai_client(self, api_key: str) -> OpenAI:
+        return OpenAI(
+            api_key=api_key,
+            timeout=self._settings.llm_timeout,
+            max_retries=self._settings.llm_max_retries,
+            http_client=self.http_client(),
+        )
+
+    @contextmanager
+    def track(
+        self,
+        agent: str,
+        *,
+        model: Optional[str] = None,
+        circuit: Optional[CircuitBreaker] = None,
+    ) -> Iterator[CallRecord]:
+        """Time a call made on behalf of `agent` and count it as an error if it raises.
+
+        Besides the process-wide stats, the call is added to the turn's
+        `UsageCollector` when one is active. While the circuit breaker is open
+        it raises `LLMCircuitOpenError` immediately so callers fall back
+        without waiting for a timeout. A replay miss surfaces as
+        `CassetteMissError`. `circuit` defaults to the chat completions one.
+        """
+
+        breaker = circuit or self._circuit
+        breaker.before_call()
+        call = CallRecord()
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield call
+            ok = True
+            breaker.record_success()
+        except BaseException as exc:
+            breaker.record_failure(exc)
+            miss = cassette_miss(exc)
+            if miss is not None and miss is not exc:
+                raise miss from exc
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            self.record(
+                agent,
+                latency,
+                ok=ok,
+                input_tokens=call.input_tokens,
+                output_tokens=call.output_tokens,
+            )
+            collector = current_usage_collector()
+            if collector is not None:
+                collector.record(
+                    agent,
+                    model=model,
+                    latency=latency,
+                    ok=ok,
+                    input_tokens=call.input_tokens,
+                    output_tokens=call.output_tokens,
+                )
+
+    def record(
+        self,
+        agent: str,
+        latency: float,
+        *,
+        ok: bool,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(agent, AgentCallStats())
+            stats.record(latency, ok=ok, input_tokens=input_tokens, output_tokens=output_tokens)
+        observe_stage(f"llm.{agent}", latency)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent request counts and latency since the process started."""
+
+        with self._lock:
+            return {agent: stats.to_dict() for agent, stats in sorted(self._stats.items())}
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._http_client = self._http_client, None
+            self._generation += 1
+        if client is not None:
+            client.close()
+
+    # ------------------------------------------------------------------
+
+    def _build_circuit(self, name: str) -> CircuitBreaker:
+        settings = self._settings
+        return CircuitBreaker(
+            name,
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            recovery_timeout=settings.llm_circuit_recovery_seconds,
+            half_open_probes=settings.llm_circuit_half_open_probes,
+            enabled=settings.llm_circuit_enabled,
+        )
+
+    def _build_http_client(self) -> httpx.Client:
+        settings = self._settings
+        http2 = settings.llm_http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("Paquete h2 no disponible; el pool LLM usará HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        )
+        options: Dict[str, Any] = {
+            "limits": limits,
+            "timeout": httpx.Timeout(settings.llm_timeout),
+            "http2": http2,
+        }
+        if self._transport is not None:
+            options["transport"] = self._transport
+        if settings.llm_cassette_mode != MODE_OFF:
+            options["transport"] = self._build_cassette_transport(
+                options.get("transport") or httpx.HTTPTransport(limits=limits, http2=http2)
+            )
+        logger.info(
+            "Pool HTTP LLM creado | max_connections=%s | keepalive=%s | http2=%s",
+            settings.llm_max_connections,
+            settings.llm_max_keepalive_connections,
+            http2,
+        )
+        return httpx.Client(**options)
+
+    def _build_cassette_transport(self, inner: httpx.BaseTransport) -> CassetteTransport:
+        settings = self._settings
+        mode = settings.llm_cassette_mode
+        cassette = Cassette.load(Path(settings.llm_cassette_path))
+        logger.info(
+            "Cassette LLM activo | modo=%s | path=%s | grabaciones=%s | latencia=%s",
+            mode,
+            settings.llm_cassette_path,
+            len(cassette),
+            settings.llm_cassette_latency,
+        )
+        return CassetteTransport(
+            cassette,
+            mode=mode,
+            # En replay no se abre ninguna conexión: el benchmark corre offline.
+            inner=inner if mode == MODE_RECORD else None,
+            replay_latency=settings.llm_cassette_latency == "original",
+        )
+
+
+@lru_cache(maxsize=1)
+def get_llm_factory() -> LLMClientFactory:
+    """Factory compartida por todos los agentes del proceso."""
+
+    return LLMClientFactory(get_langchain_settings())
+
+
+__all__ = [
+    "AgentCallStats",
+    "CallRecord",
+    "ChatModelHandle",
+    "LLMClientFactory",
+    "OpenAIClientHandle",
+    "get_llm_factory",
+]
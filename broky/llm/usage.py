@@ -0,0 +1,144 @@
+"""Per-turn token, latency and cost accounting for LLM calls."""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+# USD por millón de tokens (input, output). Se puede ampliar con LLM_PRICING.
+DEFAULT_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+_current_collector: ContextVar[Optional["UsageCollector"]] = ContextVar(
+    "broky_llm_usage", default=None
+)
+
+
+def estimate_cost(
+    model: Optional[str],
+    input_tokens: int,
+    output_tokens: int,
+    pricing: Optional[Mapping[str, Tuple[float, float]]] = None,
+) -> float:
+    """Cost in USD; unknown models cost 0 so the rollup never breaks on a new name."""
+
+    table = pricing or DEFAULT_PRICING
+    if not model:
+        return 0.0
+    prices = table.get(model)
+    if prices is None:
+        # Modelos versionados ("gpt-4o-mini-2024-07-18") usan el precio del alias.
+        candidates = [name for name in table if model.startswith(f"{name}-")]
+        if not candidates:
+            return 0.0
+        prices = table[max(candidates, key=len)]
+    input_price, output_price = prices
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+@dataclass
+class AgentUsage:
+    model: Optional[str] = None
+    calls: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency: float = 0.0
+    cost: float = 0.0
+
+
+class UsageCollector:
+    """Acumula el uso de todas las llamadas LLM de un turno, agrupado por agente."""
+
+    def __init__(self, pricing: Optional[Mapping[str, Tuple[float, float]]] = None) -> None:
+        self._pricing = pricing
+        self._agents: Dict[str, AgentUsage] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        agent: str,
+        *,
+        model: Optional[str],
+        latency: float,
+        ok: bool,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        cost = estimate_cost(model, input_tokens, output_tokens, self._pricing)
+        with self._lock:
+            usage = self._agents.setdefault(agent, AgentUsage())
+            usage.model = model or usage.model
+            usage.calls += 1
+            usage.errors += 0 if ok else 1
+            usage.input_tokens += input_tokens
+            usage.output_tokens += output_tokens
+            usage.latency += latency
+            usage.cost += cost
+
+    @property
+    def empty(self) -> bool:
+        return not self._agents
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact per-turn totals plus `[calls, in, out, ms, usd]` per agent."""
+
+        with self._lock:
+            agents = dict(self._agents)
+        return {
+            "calls": sum(item.calls for item in agents.values()),
+            "errors": sum(item.errors for item in agents.values()),
+            "input_tokens": sum(item.input_tokens for item in agents.values()),
+            "output_tokens": sum(item.output_tokens for item in agents.values()),
+            "latency_ms": round(sum(item.latency for item in agents.values()) * 1000, 1),
+            "cost_usd": round(sum(item.cost for item in agents.values()), 6),
+            "agents": {
+                name: [
+                    item.calls,
+                    item.input_tokens,
+                    item.output_tokens,
+                    round(item.latency * 1000, 1),
+                    round(item.cost, 6),
+                ]
+                for name, item in sorted(agents.items())
+            },
+            "models": {name: item.model for name, item in sorted(agents.items()) if item.model},
+        }
+
+
+def current_usage_collector() -> Optional[UsageCollector]:
+    return _current_collector.get()
+
+
+@contextmanager
+def usage_scope(
+    pricing: Optional[Mapping[str, Tuple[float, float]]] = None,
+) -> Iterator[UsageCollector]:
+    """Collect every LLM call made inside the block (one scope per turn)."""
+
+    collector = UsageCollector(pricing)
+    token = _current_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_collector.reset(token)
+
+
+__all__ = [
+    "AgentUsage",
+    "DEFAULT_PRICING",
+    "UsageCollector",
+    "current_usage_collector",
+    "estimate_cost",
+    "usage_scope",
+]
@@ -1,5 +1,14 @@
 """Memory providers to share state between agents."""
 
+from .history_cache import HistoryCache
+from .summarizer import ConversationSummarizer, summary_prompt
 from .supabase import SupabaseConversationMemory
+from .write_behind import HistoryWriteBehind
 
-__all__ = ["SupabaseConversationMemory"]
+__all__ = [
+    "ConversationSummarizer",
+    "HistoryCache",
+    "HistoryWriteBehind",
+    "SupabaseConversationMemory",
+    "summary_prompt",
+]
@@ -0,0 +1,155 @@
+"""In-process cache of recent chat history per session."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.metrics import count_cache
+
+FRESH = "hit"
+STALE = "stale"
+MISS = "miss"
+
+
+@dataclass
+class _SessionHistory:
+    messages: Deque[Dict[str, Any]]
+    refreshed_at: float = field(default=0.0)
+    summary: Optional[Dict[str, Any]] = None
+    summary_loaded: bool = False
+
+
+@dataclass
+class CachedHistory:
+    """Resultado de una consulta: `status` es hit, stale o miss."""
+
+    status: str
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def last_id(self) -> Any:
+        for message in reversed(self.messages):
+            if message.get("id") is not None:
+                return message["id"]
+        return None
+
+
+class HistoryCache:
+    """LRU de sesiones con un ring buffer de los últimos `max_messages` mensajes.
+
+    Se llena con la primera lectura de cada sesión y se actualiza con cada
+    `append`. Pasados `stale_after` segundos desde la última lectura, la
+    entrada se reporta como `stale` para que el llamador reconcilie con
+    Supabase (mensajes escritos por otros workers) vía `reconcile`. El resumen
+    acumulado de la sesión viaja en la misma entrada y se descarta cada vez que
+    el historial se relee, así solo se consulta junto con el historial.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = 1000,
+        max_messages: int = 30,
+        stale_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_sessions = max(1, max_sessions)
+        self._max_messages = max(1, max_messages)
+        self._stale_after = stale_after
+        self._clock = clock
+        self._sessions: "OrderedDict[str, _SessionHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_messages(self) -> int:
+        return self._max_messages
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def get(self, session_id: str) -> CachedHistory:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                result = CachedHistory(MISS)
+            else:
+                self._sessions.move_to_end(session_id)
+                age = self._clock() - entry.refreshed_at
+                status = STALE if self._stale_after >= 0 and age > self._stale_after else FRESH
+                result = CachedHistory(status, list(entry.messages))
+        count_cache("history", result.status)
+        return result
+
+    def fill(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Replace the session buffer with an authoritative read."""
+
+        with self._lock:
+            self._sessions[session_id] = _SessionHistory(
+                deque(messages, maxlen=self._max_messages),
+                refreshed_at=self._clock(),
+            )
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+    def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Append-through: only sessions already cached are updated."""
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            last_id = next(
+                (m["id"] for m in reversed(entry.messages) if m.get("id") is not None), None
+            )
+            for message in messages:
+                # Una relectura concurrente pudo traer ya estos mensajes.
+                message_id = message.get("id")
+                if last_id is not None and message_id is not None and message_id <= last_id:
+                    continue
+                entry.messages.append(message)
+
+    def reconcile(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Append the messages found by an incremental read and mark the entry fresh."""
+
+        self.append(session_id, messages)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry.refreshed_at = self._clock()
+                # Otro worker pudo haber actualizado el resumen.
+                entry.summary_loaded = False
+
+    def get_summary(self, session_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """`(True, summary)` when the session's summary is cached (it may be None)."""
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or not entry.summary_loaded:
+                return False, None
+            return True, entry.summary
+
+    def set_summary(self, session_id: str, summary: Optional[Dict[str, Any]]) -> None:
+        """Store the summary read or written for a session already cached."""
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry.summary = summary
+                entry.summary_loaded = True
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+__all__ = ["CachedHistory", "HistoryCache"]
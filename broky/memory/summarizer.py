@@ -0,0 +1,214 @@
+"""Incremental conversation summarizer backed by Supabase."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.services.chat_history_repository import ChatHistoryRepository
+from app.services.conversation_summary_repository import ConversationSummaryRepository
+from broky.llm import ChatModelHandle, get_llm_factory
+
+logger = logging.getLogger(__name__)
+
+RefreshCallback = Callable[[str, Dict[str, Any]], None]
+
+SUMMARY_PROMPT = (
+    "Eres un asistente que mantiene un resumen breve de una conversación de WhatsApp "
+    "entre un prospecto inmobiliario y el asistente virtual de la inmobiliaria. "
+    "Actualiza el resumen previo incorporando los mensajes nuevos. Conserva nombres de "
+    "proyectos, presupuestos, formas de pago, fechas mencionadas, solicitudes pendientes "
+    "y compromisos asumidos. Escribe en español, en prosa compacta y sin inventar datos. "
+    "Responde únicamente con el resumen actualizado."
+)
+
+
+def summary_prompt(snapshot: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Return the system text agents prepend when the snapshot carries a summary."""
+
+    if not snapshot:
+        return None
+    summary = snapshot.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        return f"Resumen de la conversación previa: {summary.strip()}"
+    return None
+
+
+class ConversationSummarizer:
+    """Mantiene un resumen acumulado por sesión, refrescado cada N turnos."""
+
+    def __init__(
+        self,
+        history_repository: ChatHistoryRepository,
+        summary_repository: ConversationSummaryRepository,
+        *,
+        every_n_turns: int = 6,
+        keep_last: int = 6,
+        window: int = 30,
+        max_chars: int = 1200,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self._history_repo = history_repository
+        self._summary_repo = summary_repository
+        self._every_n_turns = max(1, every_n_turns)
+        self._keep_last = max(0, keep_last)
+        self._window = window
+        self._max_chars = max_chars
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="history-summary"
+        )
+        self._in_flight: set[str] = set()
+        self._lock = threading.Lock()
+        self._on_refresh: Optional[RefreshCallback] = None
+
+        self._model: Optional[ChatModelHandle] = get_llm_factory().chat_model(
+            "summary", temperature=0
+        )
+        if self._model is None:
+            logger.warning(
+                "OPENAI_API_KEY no configurado; ConversationSummarizer usará resumen extractivo"
+            )
+
+    @property
+    def keep_last(self) -> int:
+        return self._keep_last
+
+    @property
+    def every_n_turns(self) -> int:
+        return self._every_n_turns
+
+    def set_refresh_callback(self, callback: Optional[RefreshCallback]) -> None:
+        self._on_refresh = callback
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        if not session_id:
+            return None
+        return self._summary_repo.get(session_id)
+
+    def maybe_refresh(self, session_id: str) -> None:
+        """Schedule a background refresh unless one is already running for the session."""
+
+        if not session_id:
+            return
+        with self._lock:
+            if session_id in self._in_flight:
+                return
+            self._in_flight.add(session_id)
+        try:
+            self._executor.submit(self._refresh_guarded, session_id)
+        except RuntimeError:  # pragma: no cover - executor apagado
+            with self._lock:
+                self._in_flight.discard(session_id)
+
+    def refresh(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Fold pending messages into the stored summary when enough turns accumulated."""
+
+        current = self._summary_repo.get(session_id) or {}
+        covered_id = current.get("last_message_id")
+        history = self._history_repo.fetch_history(session_id, limit=self._window)
+        pending = messages_after(history, covered_id)
+
+        threshold = self._keep_last + 2 * self._every_n_turns
+        if len(pending) < threshold:
+            return None
+
+        to_fold = pending[: len(pending) - self._keep_last] if self._keep_last else pending
+        last_id = to_fold[-1].get("id")
+        if last_id is None:
+            logger.debug("Mensajes sin id; no se puede resumir session_id=%s", session_id)
+            return None
+
+        previous = current.get("summary") if isinstance(current.get("summary"), str) else ""
+        summary = self._summarize(previous, to_fold)
+        if not summary:
+            return None
+
+        turns = int(current.get("turns") or 0) + max(1, len(to_fold) // 2)
+        self._summary_repo.upsert(
+            session_id=session_id,
+            summary=summary,
+            last_message_id=last_id,
+            turns=turns,
+        )
+        logger.info(
+            "Resumen de conversación actualizado | session_id=%s | mensajes=%d | chars=%d",
+            session_id,
+            len(to_fold),
+            len(summary),
+        )
+        return {"summary": summary, "last_message_id": last_id, "turns": turns}
+
+    # ------------------------------------------------------------------
+
+    def _refresh_guarded(self, session_id: str) -> None:
+        try:
+            result = self.refresh(session_id)
+            if result is not None and self._on_refresh is not None:
+                self._on_refresh(session_id, result)
+        except Exception:  # pragma: no cover - background logging only
+            logger.exception("Error refrescando resumen de conversación | session_id=%s", session_id)
+        finally:
+            with self._lock:
+                self._in_flight.discard(session_id)
+
+    def _summarize(self, previous: str, messages: List[Dict[str, Any]]) -> str:
+        if self._model and self._model.available:
+            prompt: List[Any] = [SystemMessage(content=SUMMARY_PROMPT)]
+            if previous:
+                prompt.append(SystemMessage(content=f"Resumen previo: {previous}"))
+            for item in messages:
+                content = item.get("message")
+                if not isinstance(content, str) or not content.strip():
+                    continue
+                if item.get("sender_role") == "assistant":
+                    prompt.append(AIMessage(content=content.strip()))
+                else:
+                    prompt.append(HumanMessage(content=content.strip()))
+            prompt.append(HumanMessage(content="Devuelve el resumen actualizado."))
+            try:
+                response = self._model.invoke(prompt)
+            except Exception:
+                logger.exception("OpenAI falló al resumir la conversación; usando resumen extractivo")
+            else:
+                content = response.content if isinstance(response, AIMessage) else None
+                if isinstance(content, str) and content.strip():
+                    return self._clip(content.strip())
+
+        return self._extractive_summary(previous, messages)
+
+    def _extractive_summary(self, previous: str, messages: List[Dict[str, Any]]) -> str:
+        lines: List[str] = [previous] if previous else []
+        for item in messages:
+            content = item.get("message")
+            if not isinstance(content, str) or not content.strip():
+                continue
+            speaker = "Asistente" if item.get("sender_role") == "assistant" else "Usuario"
+            lines.append(f"{speaker}: {' '.join(content.split())}")
+        return self._clip(" | ".join(lines))
+
+    def _clip(self, text: str) -> str:
+        if len(text) <= self._max_chars:
+            return text
+        # Conserva lo más reciente: el inicio del resumen es lo que más envejece.
+        return "..." + text[-(self._max_chars - 3) :].lstrip()
+
+
+def messages_after(history: List[Dict[str, Any]], covered_id: Any) -> List[Dict[str, Any]]:
+    if covered_id is None:
+        return list(history)
+    pending: List[Dict[str, Any]] = []
+    for item in history:
+        item_id = item.get("id")
+        try:
+            if item_id is not None and item_id > covered_id:
+                pending.append(item)
+        except TypeError:
+            continue
+    return pending
+
+
+__all__ = ["ConversationSummarizer", "messages_after", "summary_prompt", "SUMMARY_PROMPT"]
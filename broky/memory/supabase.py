@@ -5,6 +5,9 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 
 from app.services.chat_history_repository import ChatHistoryRepository
+from broky.memory.history_cache import FRESH, STALE, HistoryCache
+from broky.memory.summarizer import ConversationSummarizer, messages_after
+from broky.memory.write_behind import HistoryWriteBehind
 
 
 class SupabaseConversationMemory:
@@ -15,9 +18,19 @@ class SupabaseConversationMemory:
         repository: ChatHistoryRepository | None,
         *,
         window: int = 30,
+        summarizer: Optional[ConversationSummarizer] = None,
+        cache: Optional[HistoryCache] = None,
+        writer: Optional[HistoryWriteBehind] = None,
     ) -> None:
         self._repo = repository
         self._window = window
+        self._summarizer = summarizer
+        self._cache = cache
+        self._writer = writer
+        if writer is not None:
+            writer.set_flush_callback(self._on_flushed)
+        if summarizer is not None:
+            summarizer.set_refresh_callback(self._on_summary)
 
     def load(self, session_id: str) -> List[Dict[str, Any]]:
         """Retorna los últimos mensajes persistidos para el session_id."""
@@ -26,17 +39,46 @@ class SupabaseConversationMemory:
             return []
         if not self._repo:
             return []
-        return self._repo.fetch_history(session_id, limit=self._window)
+        if self._writer is not None and self._writer.pending(session_id):
+            self._writer.flush(session_id)
+        if self._cache is None:
+            return self._repo.fetch_history(session_id, limit=self._window)
+
+        cached = self._cache.get(session_id)
+        if cached.status == FRESH:
+            return cached.messages[-self._window :]
+        if cached.status == STALE and cached.last_id is not None:
+            # Lectura incremental: solo lo que otros workers escribieron después.
+            newer = self._repo.fetch_history_after(session_id, cached.last_id, limit=self._window)
+            if len(newer) < self._window:
+                self._cache.reconcile(session_id, newer)
+                return (cached.messages + newer)[-self._window :]
+        history = self._repo.fetch_history(session_id, limit=self._window)
+        self._cache.fill(session_id, history)
+        return history
 
     def snapshot(self, session_id: str) -> Dict[str, Any]:
-        """Pequeño helper para serializar el estado de memoria actual."""
+        """Pequeño helper para serializar el estado de memoria actual.
+
+        Cuando existe un resumen acumulado, los mensajes ya resumidos se omiten y
+        solo viajan los posteriores (a lo sumo `keep_last + 2 * every_n_turns`).
+        """
 
         history = self.load(session_id)
-        return {
+        snapshot: Dict[str, Any] = {
             "session_id": session_id,
             "messages": history,
         }
 
+        summary = self._load_summary(session_id) if self._summarizer else None
+        if summary and isinstance(summary.get("summary"), str) and summary["summary"].strip():
+            recent = messages_after(history, summary.get("last_message_id"))
+            limit = self._summarizer.keep_last + 2 * self._summarizer.every_n_turns
+            snapshot["messages"] = recent[-limit:] if limit else []
+            snapshot["summary"] = summary["summary"].strip()
+
+        return snapshot
+
     def append(
         self,
         *,
@@ -50,18 +92,62 @@ class SupabaseConversationMemory:
         if not self._repo:
             return
 
+        records: List[Dict[str, Any]] = []
         if user_message:
-            self._repo.append_message(
-                session_id=session_id,
-                sender_role="user",
-                message=user_message,
-                metadata={"source": "langchain"},
+            records.append(
+                {
+                    "session_id": session_id,
+                    "sender_role": "user",
+                    "message": user_message,
+                    "metadata": {"source": "langchain"},
+                }
             )
 
         if assistant_message:
-            self._repo.append_message(
-                session_id=session_id,
-                sender_role="assistant",
-                message=assistant_message,
-                metadata=metadata,
+            records.append(
+                {
+                    "session_id": session_id,
+                    "sender_role": "assistant",
+                    "message": assistant_message,
+                    "metadata": metadata,
+                }
             )
+
+        if records:
+            if self._writer is not None:
+                self._writer.submit(records)
+            else:
+                stored = self._repo.append_messages(records)
+                self._on_flushed(session_id, stored, expected=len(records))
+
+    def _load_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        if self._cache is not None:
+            cached, summary = self._cache.get_summary(session_id)
+            if cached:
+                return summary
+        summary = self._summarizer.load(session_id)
+        if self._cache is not None:
+            self._cache.set_summary(session_id, summary)
+        return summary
+
+    def _on_summary(self, session_id: str, summary: Dict[str, Any]) -> None:
+        if self._cache is not None:
+            self._cache.set_summary(session_id, summary)
+
+    def _on_flushed(
+        self,
+        session_id: str,
+        stored: List[Dict[str, Any]],
+        *,
+        expected: Optional[int] = None,
+    ) -> None:
+        if self._cache is not None:
+            complete = expected is None or len(stored) == expected
+            if complete and stored and all(entry.get("id") is not None for entry in stored):
+                self._cache.append(session_id, stored)
+            else:
+                # Sin ids el resumen no puede ubicar los mensajes: mejor releer.
+                self._cache.invalidate(session_id)
+        if self._summarizer is not None and stored:
+            # Recién ahora el historial persistido incluye el turno a resumir.
+            self._summarizer.maybe_refresh(session_id)
@@ -0,0 +1,123 @@
+"""Write-behind buffer for chat history inserts."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.services.chat_history_repository import ChatHistoryRepository
+
+logger = logging.getLogger(__name__)
+
+FlushCallback = Callable[[str, List[Dict[str, Any]]], None]
+
+
+class HistoryWriteBehind:
+    """Acumula mensajes y los inserta en lote desde un hilo de fondo.
+
+    El lote se envía cuando pasan `flush_interval` segundos o se juntan
+    `max_batch` filas, en un solo insert que puede mezclar sesiones. Quien vaya
+    a leer una sesión debe llamar antes a `flush(session_id)` para no perder
+    los mensajes aún pendientes; los flushes se serializan, así una lectura
+    nunca adelanta a un insert en curso.
+    """
+
+    def __init__(
+        self,
+        repository: ChatHistoryRepository,
+        *,
+        max_batch: int = 50,
+        flush_interval: float = 0.5,
+        on_flush: Optional[FlushCallback] = None,
+    ) -> None:
+        self._repo = repository
+        self._max_batch = max(1, max_batch)
+        self._flush_interval = max(0.01, flush_interval)
+        self._on_flush = on_flush
+        self._pending: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="history-write-behind", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def set_flush_callback(self, callback: Optional[FlushCallback]) -> None:
+        self._on_flush = callback
+
+    def submit(self, records: Sequence[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        with self._condition:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._pending.extend(records)
+                if len(self._pending) >= self._max_batch:
+                    self._condition.notify()
+        if closed:
+            # Tras el cierre se escribe en línea para no perder mensajes.
+            self._write(list(records))
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        with self._condition:
+            if session_id is None:
+                return len(self._pending)
+            return sum(1 for record in self._pending if record["session_id"] == session_id)
+
+    def flush(self, session_id: Optional[str] = None) -> int:
+        """Insert pending rows now (all of them, or only those of `session_id`)."""
+
+        with self._flush_lock:
+            with self._condition:
+                if session_id is None:
+                    batch, self._pending = self._pending, []
+                else:
+                    batch = [r for r in self._pending if r["session_id"] == session_id]
+                    self._pending = [r for r in self._pending if r["session_id"] != session_id]
+            return self._write(batch)
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> int:
+        if not batch:
+            return 0
+        stored = self._repo.append_messages(batch)
+        if stored and self._on_flush is not None:
+            by_session: Dict[str, List[Dict[str, Any]]] = {}
+            for record, entry in zip(batch, stored):
+                by_session.setdefault(record["session_id"], []).append(entry)
+            for session_id, entries in by_session.items():
+                try:
+                    self._on_flush(session_id, entries)
+                except Exception:  # pragma: no cover - defensivo
+                    logger.exception("Fallo el callback de write-behind | session_id=%s", session_id)
+        return len(stored)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self._max_batch:
+                    self._condition.wait(self._flush_interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - el hilo no debe morir
+                logger.exception("No se pudo vaciar el buffer de historial")
+            if closed:
+                return
+
+
+__all__ = ["HistoryWriteBehind"]
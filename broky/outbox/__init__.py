@@ -0,0 +1,52 @@
+"""Local durable outbox for side effects that do not gate the reply."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional
+
+from .handlers import (
+    ASSIGN_VENDOR_OP,
+    FOLLOWUP_OP,
+    HISTORY_APPEND_OP,
+    OutboxHistoryWriter,
+    register_default_handlers,
+)
+from .outbox import Outbox
+from .store import SQLiteOutboxStore
+
+
+@lru_cache(maxsize=1)
+def get_outbox() -> Optional[Outbox]:
+    """Outbox compartido del proceso, o None si `OUTBOX_ENABLED` está apagado."""
+
+    from app.core.config import get_settings
+    from app.services.supabase_client import get_supabase_client
+
+    settings = get_settings()
+    if not settings.outbox_enabled:
+        return None
+    client = get_supabase_client(settings)
+    if client is None:
+        return None
+
+    outbox = Outbox(
+        SQLiteOutboxStore(settings.outbox_path),
+        batch_size=settings.outbox_batch_size,
+        flush_interval=settings.outbox_flush_ms / 1000,
+        max_attempts=settings.outbox_max_attempts,
+    )
+    register_default_handlers(outbox, client)
+    return outbox
+
+
+__all__ = [
+    "ASSIGN_VENDOR_OP",
+    "FOLLOWUP_OP",
+    "HISTORY_APPEND_OP",
+    "Outbox",
+    "OutboxHistoryWriter",
+    "SQLiteOutboxStore",
+    "get_outbox",
+    "register_default_handlers",
+]
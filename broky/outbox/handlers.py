@@ -0,0 +1,106 @@
+"""Outbox operations that apply deferred side effects to Supabase."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.services.chat_history_repository import ChatHistoryRepository
+from app.services.followup_repository import FollowupRepository
+from app.services.project_interest_service import INTEREST_LINK_OP, ProjectInterestService
+from app.services.prospect_repository import ProspectRepository
+from broky.outbox.outbox import Outbox
+
+logger = logging.getLogger(__name__)
+
+HISTORY_APPEND_OP = "history.append"
+FOLLOWUP_OP = "followup.schedule"
+ASSIGN_VENDOR_OP = "prospect.assign_vendor"
+
+
+def register_default_handlers(outbox: Outbox, client: Any) -> None:
+    """Followups, vendor assignment and interest links (history registers its own)."""
+
+    # Import diferido: broky.processes importa este paquete.
+    from broky.processes.followups import apply_followup
+
+    followups = FollowupRepository(client)
+    prospects = ProspectRepository(client)
+    interests = ProjectInterestService(client)
+
+    def schedule_followup(plan: Dict[str, Any]) -> None:
+        if apply_followup(followups, plan) is None:
+            raise RuntimeError("create_followup no devolvió registro")
+
+    def assign_vendor(payload: Dict[str, Any]) -> None:
+        prospects.assign_vendor(payload["prospect_id"], payload.get("vendor_id"))
+
+    def link_interests(payload: Dict[str, Any]) -> None:
+        interests.insert_links(
+            prospect_id=payload["prospect_id"],
+            project_ids=list(payload.get("project_ids") or []),
+        )
+
+    outbox.register(FOLLOWUP_OP, schedule_followup)
+    outbox.register(ASSIGN_VENDOR_OP, assign_vendor)
+    outbox.register(INTEREST_LINK_OP, link_interests)
+
+
+class OutboxHistoryWriter:
+    """Writer para `SupabaseConversationMemory` que persiste el historial vía outbox.
+
+    Expone la misma interfaz que `HistoryWriteBehind`, pero los mensajes quedan
+    en SQLite hasta que Supabase confirma el insert; todas las entradas
+    pendientes se envían en un único insert masivo.
+    """
+
+    def __init__(self, outbox: Outbox, repository: ChatHistoryRepository) -> None:
+        self._outbox = outbox
+        self._repo = repository
+        self._on_flush: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None
+        outbox.register(HISTORY_APPEND_OP, self._apply, batch=True)
+
+    def set_flush_callback(self, callback: Optional[Callable[[str, List[Dict[str, Any]]], None]]) -> None:
+        self._on_flush = callback
+
+    def submit(self, records: Sequence[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        self._outbox.enqueue(
+            HISTORY_APPEND_OP,
+            {"records": list(records)},
+            key=str(records[0]["session_id"]),
+        )
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        return self._outbox.pending(HISTORY_APPEND_OP, session_id)
+
+    def flush(self, session_id: Optional[str] = None) -> int:
+        return self._outbox.flush(op=HISTORY_APPEND_OP, key=session_id)
+
+    def _apply(self, payloads: List[Dict[str, Any]]) -> None:
+        records = [record for payload in payloads for record in payload.get("records") or []]
+        if not records:
+            return
+        stored = self._repo.append_messages(records)
+        if not stored:
+            raise RuntimeError("append_messages no insertó filas")
+        if self._on_flush is None:
+            return
+        by_session: Dict[str, List[Dict[str, Any]]] = {}
+        for record, entry in zip(records, stored):
+            by_session.setdefault(record["session_id"], []).append(entry)
+        for session_id, entries in by_session.items():
+            try:
+                self._on_flush(session_id, entries)
+            except Exception:  # pragma: no cover - defensivo
+                logger.exception("Fallo el callback del outbox de historial | session_id=%s", session_id)
+
+
+__all__ = [
+    "ASSIGN_VENDOR_OP",
+    "FOLLOWUP_OP",
+    "HISTORY_APPEND_OP",
+    "OutboxHistoryWriter",
+    "register_default_handlers",
+]
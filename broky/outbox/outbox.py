@@ -0,0 +1,236 @@
+"""Durable outbox: side effects recorded locally and applied to Supabase in the background."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.metrics import observe_stage
+from broky.outbox.store import OutboxEntry, SQLiteOutboxStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Registration:
+    handler: Callable[..., None]
+    batch: bool
+
+
+class Outbox:
+    """Registra operaciones en SQLite y las aplica con reintentos desde un hilo.
+
+    Cada operación (`op`) tiene un handler registrado. Los handlers `batch`
+    reciben todas las cargas pendientes de su tipo en una sola llamada (p. ej.
+    un insert masivo); si el lote falla se reintenta clave por clave. El resto
+    se aplica entrada por entrada. Si el handler lanza, la entrada se
+    reintenta con backoff exponencial hasta `max_attempts` y luego queda como
+    `dead` para revisión manual. Las entradas con la misma `key` se aplican en
+    orden: ninguna adelanta a una anterior que espera su reintento.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteOutboxStore,
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_attempts: int = 8,
+        base_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        start: bool = True,
+    ) -> None:
+        self._store = store
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0.01, flush_interval)
+        self._max_attempts = max(1, max_attempts)
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._handlers: Dict[str, _Registration] = {}
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._counters = {"enqueued": 0, "applied": 0, "retries": 0, "dead": 0}
+        self._counter_lock = threading.Lock()
+        self._last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="outbox-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def register(self, op: str, handler: Callable[..., None], *, batch: bool = False) -> None:
+        self._handlers[op] = _Registration(handler, batch)
+
+    def enqueue(self, op: str, payload: Dict[str, Any], *, key: Optional[str] = None) -> int:
+        if op not in self._handlers:
+            raise KeyError(f"Operación de outbox sin handler: {op}")
+        entry_id = self._store.add(op, payload, key=key)
+        self._count("enqueued")
+        if self._closed:
+            self.flush(op=op, key=key)
+        return entry_id
+
+    def pending(self, op: Optional[str] = None, key: Optional[str] = None) -> int:
+        return self._store.count(op=op, key=key)
+
+    def flush(self, *, op: Optional[str] = None, key: Optional[str] = None) -> int:
+        """Apply due entries now (only `op`/`key` when given); returns entries applied."""
+
+        applied = 0
+        with self._flush_lock:
+            while True:
+                entries = self._store.due(limit=self._batch_size, op=op, key=key)
+                if not entries:
+                    break
+                done = self._apply(entries)
+                applied += done
+                # Con filtro (p. ej. antes de leer el historial) basta una pasada.
+                if op is not None or key is not None:
+                    break
+                if len(entries) < self._batch_size or done == 0:
+                    break
+        return applied
+
+    def stats(self) -> Dict[str, Any]:
+        depth = self._store.depth()
+        with self._counter_lock:
+            counters = dict(self._counters)
+            last_error = self._last_error
+        return {
+            "depth": sum(depth.get("pending", {}).values()),
+            "pending": depth.get("pending", {}),
+            "dead": depth.get("dead", {}),
+            **{f"{name}_total": value for name, value in counters.items()},
+            "last_error": last_error,
+        }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception:  # pragma: no cover - best effort al apagar
+            logger.exception("No se pudo vaciar el outbox al cerrar")
+
+    # ------------------------------------------------------------------
+
+    def _apply(self, entries: List[OutboxEntry]) -> int:
+        grouped: Dict[str, List[OutboxEntry]] = defaultdict(list)
+        for entry in entries:
+            grouped[entry.op].append(entry)
+
+        applied = 0
+        for op, group in grouped.items():
+            registration = self._handlers.get(op)
+            if registration is None:
+                # El handler puede registrarse más tarde (p. ej. el writer de historial).
+                logger.debug("Outbox sin handler todavía | op=%s | entradas=%s", op, len(group))
+                continue
+            started = time.perf_counter()
+            if registration.batch:
+                applied += self._run_batch(group, registration.handler)
+            else:
+                failed_keys = set()
+                for entry in group:
+                    if entry.key is not None and entry.key in failed_keys:
+                        # No adelantar a una entrada anterior de la misma clave que falló.
+                        continue
+                    done = self._run_handler([entry], registration.handler, entry.payload)
+                    if not done and entry.key is not None:
+                        failed_keys.add(entry.key)
+                    applied += done
+            observe_stage(f"outbox.{op}", time.perf_counter() - started)
+        return applied
+
+    def _run_batch(self, group: List[OutboxEntry], handler: Callable[..., None]) -> int:
+        by_key: Dict[Optional[str], List[OutboxEntry]] = defaultdict(list)
+        for entry in group:
+            by_key[entry.key].append(entry)
+        if len(by_key) == 1:
+            return self._run_handler(group, handler, [e.payload for e in group])
+        try:
+            handler([e.payload for e in group])
+        except Exception as exc:
+            # El lote mezcla claves: se reintenta por clave para que una sola
+            # sesión con problemas no deje a las demás en backoff.
+            logger.warning(
+                "Fallo el lote de outbox; se aplica por clave | op=%s | claves=%s | error=%s",
+                group[0].op,
+                len(by_key),
+                exc,
+            )
+            return sum(
+                self._run_handler(entries, handler, [e.payload for e in entries])
+                for entries in by_key.values()
+            )
+        self._store.delete([entry.id for entry in group])
+        self._count("applied", len(group))
+        return len(group)
+
+    def _run_handler(
+        self,
+        entries: List[OutboxEntry],
+        handler: Callable[..., None],
+        argument: Any,
+    ) -> int:
+        try:
+            handler(argument)
+        except Exception as exc:
+            logger.warning(
+                "Fallo aplicando outbox | op=%s | entradas=%s | error=%s",
+                entries[0].op,
+                len(entries),
+                exc,
+            )
+            for entry in entries:
+                self._fail(entry, f"{type(exc).__name__}: {exc}")
+            return 0
+        self._store.delete([entry.id for entry in entries])
+        self._count("applied", len(entries))
+        return len(entries)
+
+    def _fail(self, entry: OutboxEntry, error: str) -> None:
+        attempts = entry.attempts + 1
+        with self._counter_lock:
+            self._last_error = error
+        if attempts >= self._max_attempts:
+            self._store.bury(entry.id, attempts=attempts, error=error)
+            self._count("dead")
+            logger.error(
+                "Entrada de outbox descartada tras %s intentos | op=%s | id=%s",
+                attempts,
+                entry.op,
+                entry.id,
+            )
+            return
+        delay = min(self._max_backoff, self._base_backoff * 2 ** (attempts - 1))
+        self._store.retry(entry.id, attempts=attempts, next_attempt_at=time.time() + delay, error=error)
+        self._count("retries")
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            self._counters[name] += amount
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - el hilo no debe morir
+                logger.exception("No se pudo vaciar el outbox")
+
+
+__all__ = ["Outbox"]
@@ -0,0 +1,158 @@
+"""SQLite storage for the local outbox."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PENDING = "pending"
+DEAD = "dead"
+
+_SCHEMA = """
+create table if not exists outbox (
+    id integer primary key autoincrement,
+    op text not null,
+    key text,
+    payload text not null,
+    status text not null default 'pending',
+    attempts integer not null default 0,
+    next_attempt_at real not null,
+    last_error text,
+    created_at real not null
+);
+create index if not exists outbox_due_idx on outbox (status, next_attempt_at);
+create index if not exists outbox_op_key_idx on outbox (op, key);
+"""
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    op: str
+    key: Optional[str]
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class SQLiteOutboxStore:
+    """Cola durable en un archivo SQLite (WAL); `:memory:` sirve para tests."""
+
+    def __init__(self, path: str) -> None:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("pragma journal_mode=wal")
+            self._conn.execute("pragma synchronous=normal")
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, op: str, payload: Dict[str, Any], *, key: Optional[str] = None) -> int:
+        now = time.time()
+        encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            cursor = self._conn.execute(
+                "insert into outbox (op, key, payload, next_attempt_at, created_at) values (?, ?, ?, ?, ?)",
+                (op, key, encoded, now, now),
+            )
+            return int(cursor.lastrowid)
+
+    def due(
+        self,
+        *,
+        limit: int,
+        op: Optional[str] = None,
+        key: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> List[OutboxEntry]:
+        """Pending entries whose retry delay has passed, in insertion order.
+
+        The delay also applies with `op`/`key`: a flush from the read path must
+        not spend attempts of an entry that is backing off. Entries sharing
+        `op` and `key` keep FIFO order: while an earlier one waits for its
+        retry, the later ones are not returned either, so a newer write never
+        overtakes an older one for the same session or prospect.
+        """
+
+        moment = time.time() if now is None else now
+        clauses = [
+            "status = ?",
+            "next_attempt_at <= ?",
+            "not exists (select 1 from outbox earlier where earlier.status = ? "
+            "and earlier.op = outbox.op and earlier.key = outbox.key "
+            "and earlier.id < outbox.id and earlier.next_attempt_at > ?)",
+        ]
+        params: List[Any] = [PENDING, moment, PENDING, moment]
+        if op is not None:
+            clauses.append("op = ?")
+            params.append(op)
+        if key is not None:
+            clauses.append("key = ?")
+            params.append(key)
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"select id, op, key, payload, attempts from outbox where {' and '.join(clauses)} "
+                "order by id limit ?",
+                params,
+            ).fetchall()
+        return [OutboxEntry(row[0], row[1], row[2], json.loads(row[3]), row[4]) for row in rows]
+
+    def delete(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany("delete from outbox where id = ?", [(entry_id,) for entry_id in ids])
+
+    def retry(self, entry_id: int, *, attempts: int, next_attempt_at: float, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "update outbox set attempts = ?, next_attempt_at = ?, last_error = ? where id = ?",
+                (attempts, next_attempt_at, error[:500], entry_id),
+            )
+
+    def bury(self, entry_id: int, *, attempts: int, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "update outbox set status = ?, attempts = ?, last_error = ? where id = ?",
+                (DEAD, attempts, error[:500], entry_id),
+            )
+
+    def count(self, *, op: Optional[str] = None, key: Optional[str] = None) -> int:
+        clauses = ["status = ?"]
+        params: List[Any] = [PENDING]
+        if op is not None:
+            clauses.append("op = ?")
+            params.append(op)
+        if key is not None:
+            clauses.append("key = ?")
+            params.append(key)
+        with self._lock:
+            row = self._conn.execute(
+                f"select count(*) from outbox where {' and '.join(clauses)}", params
+            ).fetchone()
+        return int(row[0])
+
+    def depth(self) -> Dict[str, Dict[str, int]]:
+        """`{status: {op: rows}}` for the health endpoint."""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "select status, op, count(*) from outbox group by status, op"
+            ).fetchall()
+        result: Dict[str, Dict[str, int]] = {PENDING: {}, DEAD: {}}
+        for status, op, total in rows:
+            result.setdefault(status, {})[op] = int(total)
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["DEAD", "OutboxEntry", "PENDING", "SQLiteOutboxStore"]
@@ -1,12 +1,21 @@
 """Utility processes executed alongside LangChain agents."""
 
 from .assignment import assign_broker_if_needed
-from .followups import schedule_broker_followup, schedule_prospect_followup
+from .followups import (
+    apply_followup,
+    plan_broker_followup,
+    plan_prospect_followup,
+    schedule_broker_followup,
+    schedule_prospect_followup,
+)
 from .handoff import process_contact_request, process_user_opt_out
 from .notifications import build_notifications
 
 __all__ = [
+    "apply_followup",
     "assign_broker_if_needed",
+    "plan_broker_followup",
+    "plan_prospect_followup",
     "schedule_broker_followup",
     "schedule_prospect_followup",
     "process_contact_request",
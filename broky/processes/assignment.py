@@ -6,6 +6,7 @@ from typing import Any, Dict, Optional
 
 from app.services.profile_repository import ProfileRepository
 from app.services.prospect_repository import ProspectRepository
+from broky.outbox import ASSIGN_VENDOR_OP, Outbox
 
 
 def assign_broker_if_needed(
@@ -13,10 +14,13 @@ def assign_broker_if_needed(
     prospect_repo: Optional[ProspectRepository],
     *,
     official_data: Dict[str, Any],
+    outbox: Optional[Outbox] = None,
 ) -> Dict[str, Any]:
     """Assign a broker to the prospect when none is linked.
 
     Returns metadata describing the decision so that higher layers can act upon it.
+    With an `outbox` the broker is still chosen inline, but the `vendor_id`
+    update is queued and applied in the background.
     """
 
     result: Dict[str, Any] = {
@@ -48,7 +52,15 @@ def assign_broker_if_needed(
 
     selected = brokers[0]
 
-    record = prospect_repo.assign_vendor(str(prospect_id), selected.get("id"))
+    if outbox is not None:
+        outbox.enqueue(
+            ASSIGN_VENDOR_OP,
+            {"prospect_id": str(prospect_id), "vendor_id": selected.get("id")},
+            key=str(prospect_id),
+        )
+        record = {**prospect, "vendor_id": selected.get("id")}
+    else:
+        record = prospect_repo.assign_vendor(str(prospect_id), selected.get("id"))
 
     result.update(
         {
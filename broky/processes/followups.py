@@ -8,11 +8,9 @@ from typing import Any, Dict, Optional
 from app.services.followup_repository import FollowupRepository
 
 
-def schedule_prospect_followup(
-    repository: FollowupRepository,
-    *,
-    official_data: Dict[str, Any],
-) -> Optional[Dict[str, Any]]:
+def plan_prospect_followup(official_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Compute the prospect follow-up to (re)schedule without touching Supabase."""
+
     config = official_data.get("followup_configuration")
     if not config:
         return None
@@ -26,33 +24,18 @@ def schedule_prospect_followup(
     if not scheduled_at:
         return None
 
-    pending = repository.list_open_followups(
-        prospect_id=prospect_id,
-        realtor_id=realtor_id,
-        followup_type="prospect",
-    )
-    repository.delete_followups(pending)
-
-    record = repository.create_followup(
-        prospect_id=prospect_id,
-        realtor_id=realtor_id,
-        followup_type="prospect",
-        scheduled_at=scheduled_at,
-        type_followup="1",
-    )
-
     return {
+        "prospect_id": prospect_id,
+        "realtor_id": realtor_id,
+        "followup_type": "prospect",
         "scheduled_at": scheduled_at,
-        "type": "prospect",
-        "record": record,
+        "type_followup": "1",
     }
 
 
-def schedule_broker_followup(
-    repository: FollowupRepository,
-    *,
-    official_data: Dict[str, Any],
-) -> Optional[Dict[str, Any]]:
+def plan_broker_followup(official_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Compute the broker follow-up to (re)schedule without touching Supabase."""
+
     notifications = official_data.get("notifications_brokers_configurations") or {}
     config = notifications.get("no_response") or {}
 
@@ -71,24 +54,63 @@ def schedule_broker_followup(
     if not prospect_id or not realtor_id:
         return None
 
+    return {
+        "prospect_id": prospect_id,
+        "realtor_id": realtor_id,
+        "followup_type": "broker",
+        "scheduled_at": scheduled_at,
+        "type_followup": None,
+    }
+
+
+def apply_followup(repository: FollowupRepository, plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Replace the open follow-ups of the same type with the planned one."""
+
     pending = repository.list_open_followups(
-        prospect_id=prospect_id,
-        realtor_id=realtor_id,
-        followup_type="broker",
+        prospect_id=plan["prospect_id"],
+        realtor_id=plan["realtor_id"],
+        followup_type=plan["followup_type"],
     )
     repository.delete_followups(pending)
 
-    record = repository.create_followup(
-        prospect_id=prospect_id,
-        realtor_id=realtor_id,
-        followup_type="broker",
-        scheduled_at=scheduled_at,
+    return repository.create_followup(
+        prospect_id=plan["prospect_id"],
+        realtor_id=plan["realtor_id"],
+        followup_type=plan["followup_type"],
+        scheduled_at=plan["scheduled_at"],
+        type_followup=plan.get("type_followup"),
     )
 
+
+def schedule_prospect_followup(
+    repository: FollowupRepository,
+    *,
+    official_data: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    plan = plan_prospect_followup(official_data)
+    if plan is None:
+        return None
+
     return {
-        "scheduled_at": scheduled_at,
+        "scheduled_at": plan["scheduled_at"],
+        "type": "prospect",
+        "record": apply_followup(repository, plan),
+    }
+
+
+def schedule_broker_followup(
+    repository: FollowupRepository,
+    *,
+    official_data: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    plan = plan_broker_followup(official_data)
+    if plan is None:
+        return None
+
+    return {
+        "scheduled_at": plan["scheduled_at"],
         "type": "broker",
-        "record": record,
+        "record": apply_followup(repository, plan),
     }
 
 
@@ -3,12 +3,21 @@
 from __future__ import annotations
 
 import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from app.core.config import Settings
+from app.core.metrics import bind_metrics_context
 from app.services.chat_history_repository import ChatHistoryRepository
+from app.services.conversation_summary_repository import ConversationSummaryRepository
 from app.services.followup_repository import FollowupRepository
+from app.services.history_diagnostics_repository import (
+    FileDiagnosticsSink,
+    HistoryDiagnosticsRepository,
+)
+from app.services.llm_usage_repository import LLMUsageRepository
 from app.services.profile_repository import ProfileRepository
 from app.services.prospect_repository import ProspectRepository
 from app.services.supabase_client import get_supabase_client
@@ -26,19 +35,31 @@ from broky.agents import (
     FilesAgentExecutor,
 )
 from broky.core import BrokyContext
-from broky.memory import SupabaseConversationMemory
+from broky.llm import get_llm_factory, usage_scope
+from broky.memory import (
+    ConversationSummarizer,
+    HistoryCache,
+    HistoryWriteBehind,
+    SupabaseConversationMemory,
+)
 from broky.tools import ToolRegistry, register_default_tools
 from broky.processes import (
     assign_broker_if_needed,
     build_notifications,
     process_contact_request,
+    plan_broker_followup,
+    plan_prospect_followup,
     process_user_opt_out,
     schedule_broker_followup,
     schedule_prospect_followup,
 )
+from broky.outbox import FOLLOWUP_OP, Outbox, OutboxHistoryWriter, get_outbox
 
 logger = logging.getLogger(__name__)
 
+_USAGE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-usage")
+_DIAGNOSTICS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="turn-diagnostics")
+
 
 @dataclass
 class MasterAgentOutput:
@@ -55,18 +76,30 @@ class MasterAgentRuntime:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         client = get_supabase_client(settings)
+        self._outbox: Optional[Outbox] = (
+            get_outbox() if client and settings.outbox_enabled else None
+        )
         self._history_repo = ChatHistoryRepository(client) if client else None
         self._profile_repo = ProfileRepository(client) if client else None
         self._prospect_repo = ProspectRepository(client) if client else None
-        self._memory = SupabaseConversationMemory(self._history_repo) if self._history_repo else None
+        self._memory = (
+            SupabaseConversationMemory(
+                self._history_repo,
+                summarizer=self._build_summarizer(settings, client),
+                cache=self._build_history_cache(settings),
+                writer=self._build_history_writer(settings),
+            )
+            if self._history_repo
+            else None
+        )
         self._executor = MasterAgentExecutor()
-        self._response_agent = ResponseAgentExecutor()
         self._fixing_agent = FixingResponseAgentExecutor()
+        self._response_agent = ResponseAgentExecutor(fixer=self._fixing_agent)
         self._splitter_agent = SplitResponseAgentExecutor()
         self._justification_agent = JustificationAgentExecutor()
 
         self._tool_registry = ToolRegistry()
-        register_default_tools(self._tool_registry, supabase_client=client)
+        register_default_tools(self._tool_registry, supabase_client=client, outbox=self._outbox)
 
         self._rag_agent: Optional[RAGAgentExecutor]
         try:
@@ -106,8 +139,26 @@ class MasterAgentRuntime:
             self._files_agent = None
 
         self._followup_repo = FollowupRepository(client) if client else None
+        self._usage_repo = (
+            LLMUsageRepository(client, table=settings.llm_usage_table)
+            if client and settings.llm_usage_enabled
+            else None
+        )
+        self._diagnostics_sink = self._build_diagnostics_sink(settings, client)
+
+    def run(
+        self,
+        state: Dict[str, Any],
+        *,
+        on_segment: Optional[Callable[[str], None]] = None,
+    ) -> MasterAgentOutput:
+        """Ejecuta el turno completo.
+
+        Con `RESPONSE_STREAMING_ENABLED`, `on_segment` recibe el primer fragmento
+        de la respuesta apenas el LLM lo genera; `postprocess["streamed_segments"]`
+        indica cuántos de `split_messages` ya se entregaron por esa vía.
+        """
 
-    def run(self, state: Dict[str, Any]) -> MasterAgentOutput:
         payload = dict(state.get("payload") or {})
         normalized = dict(state.get("normalized") or {})
 
@@ -118,6 +169,25 @@ class MasterAgentRuntime:
             realtor_id=normalized.get("realtor_id") or payload.get("realtor_id"),
             prospect_id=normalized.get("prospect_id") or payload.get("prospect_id"),
         )
+        bind_metrics_context(session_id=session_id, realtor_id=context.realtor_id)
+        if on_segment is not None and self._settings.response_streaming_enabled:
+            context.stream_callback = on_segment
+
+        with usage_scope(get_llm_factory().pricing) as usage:
+            output = self._run_chain(context, payload, state)
+
+        llm_usage = usage.summary()
+        output.metadata["llm_usage"] = llm_usage
+        self._persist_usage(context, llm_usage)
+        return output
+
+    def _run_chain(
+        self,
+        context: BrokyContext,
+        payload: Dict[str, Any],
+        state: Dict[str, Any],
+    ) -> MasterAgentOutput:
+        session_id = context.session_id
 
         if self._memory and session_id:
             context.memory_snapshot = self._memory.snapshot(session_id)
@@ -139,6 +209,7 @@ class MasterAgentRuntime:
         updated_context = self._run_response(updated_context)
         updated_context = self._run_fixing_response(updated_context)
         updated_context = self._run_splitter(updated_context)
+        updated_context = self._merge_streamed_segments(updated_context)
         updated_context = self._run_justification(updated_context)
 
         metadata = updated_context.metadata
@@ -169,6 +240,62 @@ class MasterAgentRuntime:
 
     # ------------------------------------------------------------------
 
+    def _persist_usage(self, context: BrokyContext, llm_usage: Dict[str, Any]) -> None:
+        repo = self._usage_repo
+        if repo is None or not llm_usage.get("calls"):
+            return
+        # La escritura no debe sumar latencia al turno.
+        _USAGE_EXECUTOR.submit(
+            repo.record_turn,
+            session_id=context.session_id,
+            realtor_id=context.realtor_id,
+            usage=llm_usage,
+        )
+
+    @staticmethod
+    def _build_diagnostics_sink(settings: Settings, client: Any) -> Optional[Any]:
+        sink = settings.history_diagnostics_sink
+        if sink == "file":
+            return FileDiagnosticsSink(settings.history_diagnostics_path)
+        if sink == "table" and client:
+            return HistoryDiagnosticsRepository(client, table=settings.history_diagnostics_table)
+        return None
+
+    @staticmethod
+    def _build_history_cache(settings: Settings) -> Optional[HistoryCache]:
+        if not settings.history_cache_enabled:
+            return None
+        return HistoryCache(
+            max_sessions=settings.history_cache_max_sessions,
+            stale_after=settings.history_cache_stale_seconds,
+        )
+
+    def _build_history_writer(self, settings: Settings) -> Optional[Any]:
+        if not self._history_repo:
+            return None
+        if self._outbox is not None:
+            return OutboxHistoryWriter(self._outbox, self._history_repo)
+        if not settings.history_write_behind_enabled:
+            return None
+        return HistoryWriteBehind(
+            self._history_repo,
+            max_batch=settings.history_write_behind_max_batch,
+            flush_interval=settings.history_write_behind_flush_ms / 1000,
+        )
+
+    def _build_summarizer(self, settings: Settings, client: Any) -> Optional[ConversationSummarizer]:
+        if not client or not self._history_repo:
+            return None
+        if not settings.history_summary_enabled:
+            return None
+        return ConversationSummarizer(
+            self._history_repo,
+            ConversationSummaryRepository(client, table=settings.history_summary_table),
+            every_n_turns=settings.history_summary_every_n_turns,
+            keep_last=settings.history_summary_keep_last,
+            max_chars=settings.history_summary_max_chars,
+        )
+
     @staticmethod
     def _resolve_session_id(payload: Dict[str, Any], normalized: Dict[str, Any]) -> str:
         def _clean_phone(value: Any) -> Optional[str]:
@@ -246,6 +373,16 @@ class MasterAgentRuntime:
                 response = value.get("response")
                 if response:
                     merged.setdefault("informacion_para_responder", f"Contexto relevante: {response}")
+                elif value.get("mode") == "retrieval_only":
+                    # Sin respuesta intermedia: el agente de respuesta redacta con los datos recuperados.
+                    context_text = value.get("context")
+                    merged.setdefault(
+                        "informacion_para_responder",
+                        "Datos de proyectos para responder (usa solo estos datos y menciona el proyecto):\n"
+                        f"{context_text}"
+                        if context_text
+                        else "No se encontró información de proyectos para esta consulta; no inventes datos.",
+                    )
             elif key == "filter_calification" and isinstance(value, dict):
                 calification = value.get("calification")
                 stage = value.get("stage") or metadata.get("stage")
@@ -393,6 +530,22 @@ class MasterAgentRuntime:
                     updated.metadata["reply"] = first.strip()
         return updated
 
+    @staticmethod
+    def _merge_streamed_segments(context: BrokyContext) -> BrokyContext:
+        postprocess = context.metadata.get("postprocess")
+        if not isinstance(postprocess, dict):
+            return context
+        streamed = postprocess.get("streamed_segments")
+        if not isinstance(streamed, list) or not streamed:
+            return context
+
+        remaining = postprocess.get("split_messages")
+        if not isinstance(remaining, list):
+            remaining = []
+        postprocess["split_messages"] = [*streamed, *remaining]
+        context.metadata["reply"] = streamed[0]
+        return context
+
     def _run_justification(self, context: BrokyContext) -> BrokyContext:
         try:
             return self._justification_agent.invoke(context)
@@ -449,14 +602,18 @@ class MasterAgentRuntime:
         if not isinstance(official, dict):
             return context
 
-        prospect_result = schedule_prospect_followup(
-            self._followup_repo,
-            official_data=official,
-        )
-        broker_result = schedule_broker_followup(
-            self._followup_repo,
-            official_data=official,
-        )
+        if self._outbox is not None:
+            prospect_result = self._queue_followup(plan_prospect_followup(official))
+            broker_result = self._queue_followup(plan_broker_followup(official))
+        else:
+            prospect_result = schedule_prospect_followup(
+                self._followup_repo,
+                official_data=official,
+            )
+            broker_result = schedule_broker_followup(
+                self._followup_repo,
+                official_data=official,
+            )
 
         if prospect_result or broker_result:
             followups_meta = context.metadata.setdefault("followups", {})
@@ -467,6 +624,17 @@ class MasterAgentRuntime:
 
         return context
 
+    def _queue_followup(self, plan: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if plan is None or self._outbox is None:
+            return None
+        self._outbox.enqueue(FOLLOWUP_OP, plan, key=str(plan["prospect_id"]))
+        return {
+            "scheduled_at": plan["scheduled_at"],
+            "type": plan["followup_type"],
+            "record": None,
+            "queued": True,
+        }
+
     def _run_handoff(self, context: BrokyContext) -> BrokyContext:
         filters = context.metadata.get("filters") or {}
         replies = context.metadata.setdefault("subagent_replies", [])
@@ -498,6 +666,7 @@ class MasterAgentRuntime:
                 self._profile_repo,
                 self._prospect_repo,
                 official_data=official,
+                outbox=self._outbox,
             )
             context.metadata.setdefault("assignments", {})["broker"] = broker_assignment
 
@@ -538,14 +707,25 @@ class MasterAgentRuntime:
             return
 
         user_message = self._extract_message(payload)
-        metadata = {
+        metadata: Dict[str, Any] = {
             "intents": intents,
             "filters": filters,
         }
+        diagnostics: Dict[str, Any] = {}
         if extra_metadata:
-            metadata["subagents"] = extra_metadata
+            diagnostics["subagents"] = extra_metadata
         if postprocess:
-            metadata["postprocess"] = postprocess
+            diagnostics["postprocess"] = postprocess
+        sink = self._diagnostics_sink
+        if diagnostics and sink is not None:
+            # La fila del historial solo guarda el id del turno; el detalle va al sink frío.
+            metadata["turn"] = uuid.uuid4().hex
+            _DIAGNOSTICS_EXECUTOR.submit(
+                sink.record,
+                session_id=session_id,
+                turn_id=metadata["turn"],
+                diagnostics=diagnostics,
+            )
         self._memory.append(
             session_id=session_id,
             user_message=user_message,
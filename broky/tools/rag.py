@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from app.services.rag.service import RAGService
+if TYPE_CHECKING:  # pragma: no cover - solo tipos; evita el import circular con app.services.rag
+    from app.services.rag.service import RAGService
 
 
 class RAGSearchInput(BaseModel):
@@ -23,7 +24,8 @@ class RAGSearchInput(BaseModel):
 class RAGSearchTool(BaseTool):
     name: str = "rag_search"
     description: str = (
-        "Consulta el microservicio vectorial y genera respuesta enriquecida usando RAGService."
+        "Consulta el microservicio vectorial y genera respuesta enriquecida usando RAGService "
+        "(con RAG_MODE=retrieval_only devuelve solo el contexto y las fuentes)."
     )
     args_schema: type[BaseModel] = RAGSearchInput
 
@@ -39,6 +41,10 @@ class RAGSearchTool(BaseTool):
         limit: Optional[int] = None,
         threshold: Optional[float] = None,
     ) -> Dict[str, Any]:
+        if self._service.retrieval_only:
+            return self._service.retrieve_context(
+                message=message, realtor_id=realtor_id, limit=limit, threshold=threshold
+            )
         response = self._service.answer_query(
             message=message,
             realtor_id=realtor_id,
@@ -48,5 +54,22 @@ class RAGSearchTool(BaseTool):
         )
         return response
 
-    async def _arun(self, *args, **kwargs) -> Dict[str, Any]:  # pragma: no cover
-        return self._run(*args, **kwargs)
+    async def _arun(  # type: ignore[override]
+        self,
+        message: str,
+        realtor_id: str,
+        history: Optional[list[Dict[str, Any]]] = None,
+        limit: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        if self._service.retrieval_only:
+            return await self._service.aretrieve_context(
+                message=message, realtor_id=realtor_id, limit=limit, threshold=threshold
+            )
+        return await self._service.aanswer_query(
+            message=message,
+            realtor_id=realtor_id,
+            history=history,
+            limit=limit,
+            threshold=threshold,
+        )
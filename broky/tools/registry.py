@@ -13,7 +13,6 @@ from app.services.prospect_repository import ProspectRepository
 from app.services.project_files_repository import ProjectFilesRepository
 from app.services.prospect_repository import ProspectRepository
 from app.services.realtor_repository import RealtorRepository
-from app.services.rag.service import RAGService
 from app.services.supabase_client import get_supabase_client
 
 from broky.tools.rag import RAGSearchTool
@@ -53,6 +52,7 @@ def register_default_tools(
     registry: ToolRegistry,
     *,
     supabase_client=None,
+    outbox=None,
 ) -> None:
     """Hook donde iremos registrando herramientas comunes."""
 
@@ -69,7 +69,7 @@ def register_default_tools(
         registry.register(ProspectCreateTool(prospect_repo))
         registry.register(PropertiesByProspectTool(project_repo))
 
-        project_interest_service = ProjectInterestService(client)
+        project_interest_service = ProjectInterestService(client, outbox=outbox)
         registry.register(ProjectInterestLinkTool(project_interest_service))
 
         registry.register(CalificationUpdateTool(prospect_repo))
@@ -80,5 +80,20 @@ def register_default_tools(
         registry.register(ProjectFilesTool(project_files_repo))
 
     if settings.vector_service_configured and settings.openai_api_key:
-        rag_service = RAGService(settings)
+        # Import diferido: app.services.rag importa broky.llm, que carga este paquete.
+        from app.services.rag import (
+            RAGService,
+            get_answer_cache,
+            get_lexical_index,
+            get_local_index,
+            get_retrieval_cache,
+        )
+
+        rag_service = RAGService(
+            settings,
+            retrieval_cache=get_retrieval_cache(),
+            local_index=get_local_index(),
+            lexical_index=get_lexical_index(),
+            answer_cache=get_answer_cache(),
+        )
         registry.register(RAGSearchTool(rag_service))
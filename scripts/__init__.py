@@ -0,0 +1 @@
+"""Operational scripts (benchmarks, maintenance) run with `python -m scripts.<name>`."""
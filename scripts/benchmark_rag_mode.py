@@ -0,0 +1,133 @@
+"""Compare turn latency with `RAG_MODE=generate` vs `RAG_MODE=retrieval_only`.
+
+Runs `scripts.replay_webhooks` once per mode, each in its own process (the
+settings are read at import time), over the same informational traffic and
+fake backends, and prints turn latency, the `agent.rag` stage and the number
+of OpenAI completions side by side. Without a payloads file it generates
+`--chats` conversations with property questions.
+
+Usage::
+
+    python -m scripts.benchmark_rag_mode --openai-latency lognormal:700,0.3
+    python -m scripts.benchmark_rag_mode traffic.jsonl --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MODES = ("generate", "retrieval_only")
+QUESTIONS = [
+    "Hola, ¿qué proyectos tienen en Quilmes?",
+    "¿Cuánto cuesta el de 2 dormitorios?",
+    "¿Cuándo es la entrega?",
+    "¿Tienen estacionamiento?",
+]
+DEFAULT_SCRIPT = Path(__file__).resolve().parents[1] / "docs" / "fakes" / "openai_script.example.json"
+
+
+def write_traffic(path: Path, chats: int) -> None:
+    with path.open("w", encoding="utf-8") as handle:
+        for chat in range(chats):
+            phone = f"569{chat:08d}"
+            for question in QUESTIONS:
+                payload = {
+                    "from": phone,
+                    "chat_id": f"{phone}@s.whatsapp.net",
+                    "channel_id": "BENCH-RAG",
+                    "message": question,
+                }
+                handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+
+def run_mode(mode: str, payloads: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    command = [
+        sys.executable,
+        "-m",
+        "scripts.replay_webhooks",
+        str(payloads),
+        "--json",
+        "--rag-mode",
+        mode,
+        "--concurrency",
+        str(args.concurrency),
+        "--openai-latency",
+        args.openai_latency,
+        "--vector-latency",
+        args.vector_latency,
+        "--openai-script",
+        str(args.openai_script),
+        "--random-seed",
+        str(args.random_seed),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def summarize(mode: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    openai = report.get("backends", {}).get("openai", {})
+    rag = report.get("stages", {}).get("agent.rag", {})
+    return {
+        "mode": mode,
+        "turns": report["turns"],
+        "errors": report["errors"],
+        "turn_p50_ms": report["turn_latency_ms"]["p50"],
+        "turn_p95_ms": report["turn_latency_ms"]["p95"],
+        "rag_p50_ms": rag.get("p50", 0.0),
+        "completions": openai.get("/v1/chat/completions", 0),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("payloads", type=Path, nargs="?", default=None, help="JSONL de webhooks (opcional)")
+    parser.add_argument("--chats", type=int, default=8, help="Chats sintéticos si no se pasa un archivo")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--openai-latency", default="lognormal:700,0.3")
+    parser.add_argument("--vector-latency", default="uniform:40,120")
+    parser.add_argument("--openai-script", type=Path, default=DEFAULT_SCRIPT)
+    parser.add_argument("--random-seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="broky-rag-mode-") as tmp:
+        payloads = args.payloads
+        if payloads is None:
+            payloads = Path(tmp) / "traffic.jsonl"
+            write_traffic(payloads, max(1, args.chats))
+        rows = [summarize(mode, run_mode(mode, payloads, args)) for mode in MODES]
+
+    generate, retrieval = rows
+    saved = {
+        "turn_p50_ms": round(generate["turn_p50_ms"] - retrieval["turn_p50_ms"], 1),
+        "turn_p95_ms": round(generate["turn_p95_ms"] - retrieval["turn_p95_ms"], 1),
+        "completions": generate["completions"] - retrieval["completions"],
+    }
+
+    if args.json:
+        print(json.dumps({"modes": rows, "saved": saved}, indent=2, ensure_ascii=False))
+        return 0
+
+    header = f"{'modo':<16}{'turnos':>8}{'errores':>9}{'p50 ms':>10}{'p95 ms':>10}{'rag p50':>10}{'LLM calls':>11}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['mode']:<16}{row['turns']:>8}{row['errors']:>9}{row['turn_p50_ms']:>10}"
+            f"{row['turn_p95_ms']:>10}{row['rag_p50_ms']:>10}{row['completions']:>11}"
+        )
+    print(
+        f"\nahorro: p50={saved['turn_p50_ms']} ms, p95={saved['turn_p95_ms']} ms, "
+        f"{saved['completions']} completions menos"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Compare latency and recall of the lexical (BM25), vector and hybrid retrievers.
+
+Builds a synthetic `projects` catalog (communes, property types, bedrooms,
+names) and literal queries whose relevant projects are known, then runs each
+retriever over the same queries and reports p50/p95 latency and recall@k.
+
+The vector side is the embedded `LocalVectorIndex`. By default it uses the
+deterministic hashing embeddings of the fakes (no network); `--embeddings
+openai` embeds with `OPENAI_EMBEDDINGS_MODEL`, and then the reported vector
+latency includes the query embedding round trip.
+
+Usage::
+
+    python -m scripts.benchmark_retrieval --projects 300 --queries 200
+    python -m scripts.benchmark_retrieval --embeddings openai --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.rag import LexicalIndex, LocalVectorIndex, build_realtor_index, fuse_results
+from scripts.fakes import fake_embedding
+
+REALTOR_ID = "benchmark-realtor"
+COMMUNES = [
+    "Quilmes", "Palermo", "Belgrano", "Caballito", "Núñez", "Ñuñoa", "Providencia",
+    "Las Condes", "La Florida", "Maipú", "Vitacura", "San Miguel", "Lanús", "Avellaneda",
+]
+TYPES = ["departamentos", "casas", "lofts", "oficinas", "dúplex"]
+NAMES = ["Torre", "Parque", "Altos", "Vista", "Jardín", "Mirador", "Portal", "Plaza"]
+ADJECTIVES = ["Norte", "Sur", "Verde", "Azul", "Real", "Central", "Alto", "Nuevo", "Andino"]
+STATUSES = ["en construcción", "entrega inmediata", "en blanco", "preventa"]
+
+Catalog = List[Dict[str, Any]]
+Query = Tuple[str, Set[str]]
+
+
+class _HashEmbedder:
+    model = "fake-hash-64"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray([fake_embedding(text) for text in texts], dtype=np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+def build_catalog(size: int, rng: random.Random) -> Catalog:
+    catalog: Catalog = []
+    for index in range(size):
+        commune = rng.choice(COMMUNES)
+        kind = rng.choice(TYPES)
+        bedrooms = rng.randint(1, 4)
+        name = f"{rng.choice(NAMES)} {rng.choice(ADJECTIVES)} {index + 1}"
+        catalog.append(
+            {
+                "id": f"p{index + 1}",
+                "realtor_id": REALTOR_ID,
+                "name_property": name,
+                "location": f"{commune}",
+                "type": kind,
+                "status": rng.choice(STATUSES),
+                "prices": {"desde": rng.randrange(60, 400) * 1000},
+                "currency": "USD",
+                "description": (
+                    f"{kind.capitalize()} de {bedrooms} dormitorios en {commune}, "
+                    f"con {rng.choice(['cochera', 'balcón', 'terraza', 'patio'])} y amenities."
+                ),
+                "bedrooms": bedrooms,
+            }
+        )
+    return catalog
+
+
+def build_queries(catalog: Catalog, count: int, rng: random.Random) -> List[Query]:
+    queries: List[Query] = []
+    for _ in range(count):
+        target = rng.choice(catalog)
+        shape = rng.randrange(3)
+        if shape == 0:
+            text = f"¿Qué me cuentas del {target['name_property']}?"
+            relevant = {target["id"]}
+        elif shape == 1:
+            text = f"{target['type']} de {target['bedrooms']} dormitorios en {target['location']}"
+            relevant = {
+                row["id"]
+                for row in catalog
+                if row["type"] == target["type"]
+                and row["bedrooms"] == target["bedrooms"]
+                and row["location"] == target["location"]
+            }
+        else:
+            text = f"¿Qué proyectos tienen en {target['location']}?"
+            relevant = {row["id"] for row in catalog if row["location"] == target["location"]}
+        queries.append((text, relevant))
+    return queries
+
+
+def _percentile(values: Sequence[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+
+def run_retriever(
+    name: str,
+    search: Callable[[str], List[Any]],
+    queries: Sequence[Query],
+    k: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for text, relevant in queries:
+        started = time.perf_counter()
+        results = search(text)
+        latencies.append(time.perf_counter() - started)
+        found = {item.project_id for item in results[:k]}
+        recalls.append(len(found & relevant) / min(len(relevant), k))
+    return {
+        "retriever": name,
+        "queries": len(queries),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p95": round(_percentile(latencies, 95) * 1000, 3),
+        },
+        f"recall@{k}": round(statistics.fmean(recalls), 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.5, help="Peso del vector en el modo híbrido")
+    parser.add_argument("--embeddings", choices=("fake", "openai"), default="fake")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    catalog = build_catalog(max(1, args.projects), rng)
+    queries = build_queries(catalog, max(1, args.queries), rng)
+
+    if args.embeddings == "openai":
+        from app.core.config import get_settings
+        from app.services.rag import EmbeddingClient
+
+        embedder: Any = EmbeddingClient(get_settings())
+    else:
+        embedder = _HashEmbedder()
+
+    lexical = LexicalIndex()
+    lexical.sync_catalog(REALTOR_ID, catalog)
+    dense = LocalVectorIndex(tempfile.mkdtemp(prefix="broky-bench-index-"))
+    build_realtor_index(catalog, realtor_id=REALTOR_ID, embedder=embedder, index=dense)
+
+    k = max(1, args.k)
+    # Se piden más candidatos por lado para que la fusión tenga de dónde elegir.
+    depth = k * 4
+
+    def lexical_search(text: str) -> List[Any]:
+        return lexical.search(REALTOR_ID, text, limit=k) or []
+
+    def vector_search(text: str, limit: int = k) -> List[Any]:
+        vector = embedder.embed_query(text)
+        return dense.search(REALTOR_ID, vector, limit=limit, threshold=-1.0) or []
+
+    def hybrid_search(text: str) -> List[Any]:
+        return fuse_results(
+            vector_search(text, depth),
+            lexical.search(REALTOR_ID, text, limit=depth) or [],
+            alpha=args.alpha,
+            limit=k,
+        )
+
+    results = [
+        run_retriever("bm25", lexical_search, queries, k),
+        run_retriever(f"vector ({args.embeddings})", vector_search, queries, k),
+        run_retriever(f"hybrid (alpha={args.alpha})", hybrid_search, queries, k),
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+
+    recall_key = f"recall@{k}"
+    header = f"{'retriever':<24}{'consultas':>10}{'p50 ms':>10}{'p95 ms':>10}{'media ms':>10}{recall_key:>12}"
+    print(f"catálogo={len(catalog)} proyectos")
+    print(header)
+    print("-" * len(header))
+    for item in results:
+        latency = item["latency_ms"]
+        print(
+            f"{item['retriever']:<24}{item['queries']:>10}{latency['p50']:>10}{latency['p95']:>10}"
+            f"{latency['mean']:>10}{item[recall_key]:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
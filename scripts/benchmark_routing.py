@@ -0,0 +1,201 @@
+"""Compare turn latency and token spend across LLM routing profiles.
+
+Replays recorded conversations through `MasterAgentRuntime` once per profile
+and reports per-turn latency percentiles plus token usage per agent.
+
+Conversations are read from a JSONL file, one conversation per line::
+
+    {"realtor_id": "...", "session_id": "...", "messages": ["hola", "..."]}
+
+`messages` may also hold history rows (`{"sender_role": ..., "message": ...}`);
+only the user turns are replayed. Profiles are a JSON object mapping a name to
+a routing table (see `docs/llm_routing_profiles.example.json`).
+
+Supabase is disabled during the run so nothing is persisted; history lives in
+memory for the duration of each conversation.
+
+Usage::
+
+    python -m scripts.benchmark_routing conversations.jsonl \
+        --profiles docs/llm_routing_profiles.example.json --repeat 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import get_settings
+from broky.config import RoutingTable, load_routing_table
+from broky.llm import get_llm_factory
+from broky.memory import SupabaseConversationMemory
+from broky.runtime.master import MasterAgentRuntime
+
+
+class _InMemoryHistory:
+    """Sustituto mínimo de ChatHistoryRepository para no tocar Supabase."""
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    def fetch_history(self, session_id: str, limit: int = 30) -> List[Dict[str, Any]]:
+        return list(self._rows.get(session_id, [])[-limit:])
+
+    def append_message(
+        self,
+        *,
+        session_id: str,
+        sender_role: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        rows = self._rows.setdefault(session_id, [])
+        rows.append({"id": len(rows) + 1, "sender_role": sender_role, "message": message})
+        return rows[-1]
+
+    def append_messages(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.append_message(**record) for record in records]
+
+
+def load_conversations(path: Path) -> List[Dict[str, Any]]:
+    conversations: List[Dict[str, Any]] = []
+    for index, line in enumerate(path.read_text(encoding="utf-8").splitlines()):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        turns: List[str] = []
+        for item in record.get("messages") or []:
+            if isinstance(item, str):
+                turns.append(item)
+            elif isinstance(item, dict) and item.get("sender_role", "user") == "user":
+                text = item.get("message") or item.get("content")
+                if isinstance(text, str) and text.strip():
+                    turns.append(text)
+        if turns:
+            conversations.append(
+                {
+                    "session_id": str(record.get("session_id") or f"bench-{index}"),
+                    "realtor_id": record.get("realtor_id"),
+                    "turns": turns,
+                }
+            )
+    return conversations
+
+
+def load_profiles(path: Optional[Path]) -> Dict[str, RoutingTable]:
+    if path is None:
+        return {"baseline": RoutingTable()}
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    return {name: load_routing_table(table or {}) for name, table in raw.items()}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+def run_profile(
+    runtime: MasterAgentRuntime,
+    name: str,
+    table: RoutingTable,
+    conversations: Iterable[Dict[str, Any]],
+    *,
+    repeat: int,
+) -> Dict[str, Any]:
+    factory = get_llm_factory()
+    factory.set_routing(table)
+    factory.reset_stats()
+
+    latencies: List[float] = []
+    for round_index in range(repeat):
+        runtime._memory = SupabaseConversationMemory(_InMemoryHistory())  # type: ignore[arg-type]
+        for conversation in conversations:
+            session_id = f"{conversation['session_id']}-{name}-{round_index}"
+            for message in conversation["turns"]:
+                state = {
+                    "payload": {
+                        "message": message,
+                        "session_id": session_id,
+                        "realtor_id": conversation["realtor_id"],
+                    },
+                    "normalized": {"realtor_id": conversation["realtor_id"]},
+                }
+                started = time.perf_counter()
+                runtime.run(state)
+                latencies.append(time.perf_counter() - started)
+
+    agents = factory.stats()
+    return {
+        "profile": name,
+        "turns": len(latencies),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+            "p50": round(_percentile(latencies, 50) * 1000, 1),
+            "p95": round(_percentile(latencies, 95) * 1000, 1),
+            "max": round(max(latencies, default=0.0) * 1000, 1),
+        },
+        "input_tokens": sum(item["input_tokens"] for item in agents.values()),
+        "output_tokens": sum(item["output_tokens"] for item in agents.values()),
+        "agents": agents,
+    }
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    header = f"{'perfil':<26}{'turnos':>8}{'p50 ms':>10}{'p95 ms':>10}{'media ms':>10}{'tok in':>10}{'tok out':>10}"
+    print(header)
+    print("-" * len(header))
+    for item in results:
+        latency = item["latency_ms"]
+        print(
+            f"{item['profile']:<26}{item['turns']:>8}{latency['p50']:>10}{latency['p95']:>10}"
+            f"{latency['mean']:>10}{item['input_tokens']:>10}{item['output_tokens']:>10}"
+        )
+    for item in results:
+        print(f"\n[{item['profile']}]")
+        for agent, stats in item["agents"].items():
+            print(
+                f"  {agent:<18} llamadas={stats['requests']:<4} errores={stats['errors']:<3} "
+                f"media={stats['avg_latency_ms']}ms tokens={stats['input_tokens']}/{stats['output_tokens']}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("conversations", type=Path, help="JSONL con conversaciones grabadas")
+    parser.add_argument("--profiles", type=Path, default=None, help="JSON nombre -> tabla de ruteo")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por perfil")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args(argv)
+
+    conversations = load_conversations(args.conversations)
+    if not conversations:
+        print("No se encontraron conversaciones con turnos de usuario", file=sys.stderr)
+        return 1
+
+    settings = get_settings().model_copy(
+        update={"supabase_url": None, "supabase_anon_key": None, "supabase_service_role_key": None}
+    )
+    runtime = MasterAgentRuntime(settings)
+
+    results = [
+        run_profile(runtime, name, table, conversations, repeat=max(1, args.repeat))
+        for name, table in load_profiles(args.profiles).items()
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        _print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""Offline stand-ins for Supabase, OpenAI, the vector service and Whapi.
+
+Used by `scripts.replay_webhooks` to benchmark the webhook without touching
+external services, and runnable on their own with `python -m scripts.fakes`.
+"""
+
+from .faults import FailureProfile, InjectedFailure
+from .latency import LatencyProfile
+from .openai import FakeOpenAI, OpenAIScript, ScriptRule, fake_embedding
+from .postgrest import FakePostgREST
+from .server import FakeHTTPService, FakeRequest, FakeResponse
+from .stack import FakeStack, add_fake_arguments
+from .supabase import InMemoryStore, InMemorySupabase
+from .vector import FakeVectorService
+from .whapi import FakeWhapi
+
+__all__ = [
+    "FailureProfile",
+    "FakeHTTPService",
+    "FakeOpenAI",
+    "FakePostgREST",
+    "FakeRequest",
+    "FakeResponse",
+    "FakeStack",
+    "FakeVectorService",
+    "FakeWhapi",
+    "InMemoryStore",
+    "InMemorySupabase",
+    "InjectedFailure",
+    "LatencyProfile",
+    "OpenAIScript",
+    "ScriptRule",
+    "add_fake_arguments",
+    "fake_embedding",
+]
@@ -0,0 +1,53 @@
+"""Run every fake backend on fixed ports until interrupted.
+
+Usage::
+
+    python -m scripts.fakes --host 0.0.0.0 \
+        --openai-script docs/fakes/openai_script.example.json \
+        --seed docs/fakes/supabase_seed.example.json
+
+Then point the app at them (see the printed variables) or use the `fakes`
+profile of `docker-compose.yml`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+from typing import List, Optional
+
+from scripts.fakes.stack import DEFAULT_PORTS, FakeStack, add_fake_arguments
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    for name, port in DEFAULT_PORTS.items():
+        parser.add_argument(f"--{name}-port", type=int, default=port)
+    parser.add_argument("--log-level", default="INFO")
+    add_fake_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, str(args.log_level).upper(), logging.INFO))
+
+    stack = FakeStack.from_args(args)
+    env = stack.start(
+        host=args.host,
+        ports={name: getattr(args, f"{name}_port") for name in DEFAULT_PORTS},
+    )
+    for key, value in env.items():
+        print(f"{key}={value}", flush=True)
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stack.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Failure injection shared by every fake backend."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+STATUS = "status"
+TIMEOUT = "timeout"
+RESET = "reset"
+
+
+class InjectedFailure(RuntimeError):
+    """Raised by in-process fakes when a failure is injected."""
+
+
+@dataclass(frozen=True)
+class FailureProfile:
+    """Probabilidad de fallar y cómo.
+
+    Especificación: ``0.05`` (5 % de HTTP 503), ``0.05:500`` (otro código),
+    ``0.02:timeout`` (cuelga `hang_seconds` y luego responde 504) o
+    ``0.02:reset`` (cierra la conexión sin responder).
+    """
+
+    rate: float = 0.0
+    kind: str = STATUS
+    status: int = 503
+    hang_seconds: float = 30.0
+
+    @classmethod
+    def parse(cls, spec: Optional[str], *, hang_seconds: float = 30.0) -> "FailureProfile":
+        if spec is None or not str(spec).strip() or str(spec).strip().lower() == "none":
+            return cls(hang_seconds=hang_seconds)
+        raw_rate, _, mode = str(spec).strip().lower().partition(":")
+        rate = float(raw_rate)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"La tasa de fallos debe estar entre 0 y 1: {spec!r}")
+        if not mode:
+            return cls(rate, hang_seconds=hang_seconds)
+        if mode in {TIMEOUT, RESET}:
+            return cls(rate, mode, hang_seconds=hang_seconds)
+        if mode.isdigit():
+            return cls(rate, STATUS, int(mode), hang_seconds=hang_seconds)
+        raise ValueError(f"Especificación de fallos inválida: {spec!r}")
+
+    def draw(self, rng: Optional[random.Random] = None) -> Optional[str]:
+        """Return the failure kind for this call, or None when it should succeed."""
+
+        if self.rate <= 0.0:
+            return None
+        return self.kind if (rng or random).random() < self.rate else None
+
+    def __str__(self) -> str:
+        if self.rate <= 0.0:
+            return "none"
+        suffix = str(self.status) if self.kind == STATUS else self.kind
+        return f"{self.rate:g}:{suffix}"
+
+
+__all__ = ["FailureProfile", "InjectedFailure", "RESET", "STATUS", "TIMEOUT"]
@@ -0,0 +1,64 @@
+"""Injectable latency distributions for the fake backends."""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Latencia simulada en milisegundos.
+
+    Se construye desde una especificación corta, p. ej. ``const:40``,
+    ``uniform:20,80``, ``normal:300,50`` o ``lognormal:900,0.35`` (mediana en ms
+    y sigma). ``none`` o ``0`` desactivan la espera.
+    """
+
+    kind: str = "const"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "LatencyProfile":
+        if spec is None or not str(spec).strip() or str(spec).strip().lower() == "none":
+            return cls()
+        text = str(spec).strip().lower()
+        kind, _, raw_args = text.partition(":")
+        if not raw_args:
+            # "120" equivale a "const:120".
+            return cls("const", float(kind))
+        args = [float(item) for item in raw_args.split(",") if item.strip()]
+        if kind == "const" and len(args) == 1:
+            return cls("const", args[0])
+        if kind in {"uniform", "normal", "lognormal"} and len(args) == 2:
+            return cls(kind, args[0], args[1])
+        raise ValueError(f"Especificación de latencia inválida: {spec!r}")
+
+    def sample_ms(self, rng: Optional[random.Random] = None) -> float:
+        source = rng or random
+        if self.kind == "uniform":
+            value = source.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = source.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = self.a * source.lognormvariate(0.0, self.b) if self.a > 0 else 0.0
+        else:
+            value = self.a
+        return max(0.0, value)
+
+    def sleep(self, rng: Optional[random.Random] = None) -> float:
+        delay = self.sample_ms(rng)
+        if delay:
+            time.sleep(delay / 1000)
+        return delay
+
+    def __str__(self) -> str:
+        if self.kind == "const":
+            return f"const:{self.a:g}"
+        return f"{self.kind}:{self.a:g},{self.b:g}"
+
+
+__all__ = ["LatencyProfile"]
@@ -0,0 +1,270 @@
+"""Deterministic OpenAI-compatible `/v1/chat/completions` and `/v1/embeddings` endpoints."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from scripts.fakes.faults import FailureProfile
+from scripts.fakes.latency import LatencyProfile
+from scripts.fakes.server import FakeHTTPService, FakeRequest, FakeResponse
+
+DEFAULT_REPLY = (
+    "¡Hola! Gracias por escribirnos. Tenemos varias opciones que podrían interesarte. "
+    "¿Me cuentas qué comuna prefieres y cuántos dormitorios buscas? Así te envío las "
+    "alternativas que mejor se ajustan a lo que necesitas."
+)
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dimensions: int = 64) -> List[float]:
+    """Hashing-trick embedding: texts sharing words get a higher cosine similarity."""
+
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    vector = [0.0] * dimensions
+    for token in re.findall(r"[a-z0-9]+", normalized):
+        digest = zlib.crc32(token.encode("utf-8"))
+        vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return [value / norm for value in vector]
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return " ".join(str(part.get("text") or "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+@dataclass
+class ScriptRule:
+    """Una regla del guion: si `match` aparece en los mensajes, responde `replies` en rotación.
+
+    Los elementos de `replies` que no son texto se serializan como JSON, así una
+    regla puede alimentar a los agentes en modo JSON. `latency` se suma a la del
+    servicio y `failures` se evalúa solo para esta regla.
+    """
+
+    name: str
+    match: Optional["re.Pattern[str]"]
+    replies: List[Any]
+    json_mode: Optional[bool] = None
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    failures: FailureProfile = field(default_factory=FailureProfile)
+    _turns: "itertools.count[int]" = field(default_factory=itertools.count, repr=False)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any], index: int = 0) -> "ScriptRule":
+        replies = raw["reply"] if "reply" in raw else raw.get("json")
+        if replies is None:
+            raise ValueError(f"La regla {raw.get('name') or index} no define 'reply' ni 'json'")
+        if not isinstance(replies, list):
+            replies = [replies]
+        pattern = raw.get("match")
+        return cls(
+            name=str(raw.get("name") or f"regla-{index}"),
+            match=re.compile(pattern, re.IGNORECASE) if pattern else None,
+            replies=list(replies),
+            json_mode=raw.get("json_mode"),
+            latency=LatencyProfile.parse(raw.get("latency")),
+            failures=FailureProfile.parse(raw.get("failures")),
+        )
+
+    def applies(self, text: str, json_mode: bool) -> bool:
+        if self.json_mode is not None and self.json_mode != json_mode:
+            return False
+        return self.match is None or bool(self.match.search(text))
+
+    def next_reply(self) -> str:
+        reply = self.replies[next(self._turns) % len(self.replies)]
+        return reply if isinstance(reply, str) else json.dumps(reply, ensure_ascii=False)
+
+
+class OpenAIScript:
+    """Guion determinista: la primera regla que coincide decide la respuesta."""
+
+    def __init__(self, rules: Optional[List[ScriptRule]] = None) -> None:
+        self.rules = list(rules or [])
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, source: Union[str, Path, Dict[str, Any], List[Any]]) -> "OpenAIScript":
+        raw: Any = source
+        if isinstance(source, (str, Path)):
+            raw = json.loads(Path(source).read_text(encoding="utf-8"))
+        if isinstance(raw, dict):
+            raw = raw.get("rules") or []
+        return cls([ScriptRule.from_dict(item, index) for index, item in enumerate(raw)])
+
+    def resolve(self, body: Dict[str, Any]) -> Optional[ScriptRule]:
+        text = "\n".join(_message_text(message) for message in body.get("messages") or [])
+        json_mode = _is_json_mode(body)
+        for rule in self.rules:
+            if rule.applies(text, json_mode):
+                return rule
+        return None
+
+    def reply(self, rule: ScriptRule) -> str:
+        with self._lock:
+            return rule.next_reply()
+
+
+def _is_json_mode(body: Dict[str, Any]) -> bool:
+    response_format = body.get("response_format") or {}
+    return isinstance(response_format, dict) and response_format.get("type") in {"json_object", "json_schema"}
+
+
+class FakeOpenAI(FakeHTTPService):
+    """Chat completions deterministas guiados por un `OpenAIScript`.
+
+    Sin regla aplicable responde `reply` en texto libre y `json_reply` en modo
+    JSON. La latencia se aplica una vez por llamada (antes del primer token);
+    en streaming el texto se emite en trozos de `chunk_chars` caracteres.
+    `/v1/embeddings` devuelve vectores deterministas (`fake_embedding`).
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        *,
+        latency: Optional[LatencyProfile] = None,
+        failures: Optional[FailureProfile] = None,
+        script: Optional[OpenAIScript] = None,
+        reply: str = DEFAULT_REPLY,
+        json_reply: Optional[Dict[str, Any]] = None,
+        chunk_chars: int = 24,
+        embedding_dimensions: int = 64,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(latency=latency, failures=failures, seed=seed)
+        self.script = script or OpenAIScript()
+        self.reply = reply
+        self.json_reply = json_reply or {}
+        self.chunk_chars = max(1, chunk_chars)
+        self.embedding_dimensions = max(1, embedding_dimensions)
+        self.route("POST", "/v1/chat/completions", self._chat_completions)
+        self.route("POST", "/v1/embeddings", self._embeddings)
+
+    def completion_text(self, body: Dict[str, Any]) -> str:
+        rule = self.script.resolve(body)
+        if rule is not None:
+            return self.script.reply(rule)
+        if _is_json_mode(body):
+            return json.dumps(self.json_reply, ensure_ascii=False)
+        return self.reply
+
+    def _chat_completions(self, request: FakeRequest) -> FakeResponse:
+        body = request.json() or {}
+        rule = self.script.resolve(body)
+        if rule is not None:
+            with self._rng_lock:
+                delay = rule.latency.sample_ms(self._rng)
+                failure = rule.failures.draw(self._rng)
+            if delay:
+                time.sleep(delay / 1000)
+            if failure is not None:
+                return self._fail(failure)
+            content = self.script.reply(rule)
+        else:
+            content = self.completion_text(body)
+        model = body.get("model") or "gpt-4o-mini"
+        prompt_tokens = sum(
+            _approx_tokens(_message_text(message)) for message in body.get("messages") or []
+        )
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _approx_tokens(content),
+            "total_tokens": prompt_tokens + _approx_tokens(content),
+        }
+        if body.get("stream"):
+            return FakeResponse(
+                body=self._stream(model, content, usage),
+                headers={"Content-Type": "text/event-stream"},
+            )
+        return FakeResponse.json(
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+        )
+
+    def _embeddings(self, request: FakeRequest) -> FakeResponse:
+        body = request.json() or {}
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        tokens = sum(_approx_tokens(str(text)) for text in inputs)
+        return FakeResponse.json(
+            {
+                "object": "list",
+                "model": body.get("model") or "text-embedding-3-small",
+                "data": [
+                    {
+                        "object": "embedding",
+                        "index": index,
+                        "embedding": fake_embedding(str(text), self.embedding_dimensions),
+                    }
+                    for index, text in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        )
+
+    def _stream(self, model: str, content: str, usage: Dict[str, int]) -> Iterator[bytes]:
+        created = int(time.time())
+        pieces: List[str] = [
+            content[index : index + self.chunk_chars] for index in range(0, len(content), self.chunk_chars)
+        ]
+        for piece in pieces:
+            yield self._event(model, created, {"content": piece})
+        yield self._event(model, created, {}, finish_reason="stop")
+        yield self._event(model, created, None, usage=usage)
+        yield b"data: [DONE]\n\n"
+
+    @staticmethod
+    def _event(
+        model: str,
+        created: int,
+        delta: Optional[Dict[str, Any]],
+        *,
+        finish_reason: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+    ) -> bytes:
+        payload: Dict[str, Any] = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": []
+            if delta is None
+            else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if usage is not None:
+            payload["usage"] = usage
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+__all__ = ["DEFAULT_REPLY", "FakeOpenAI", "OpenAIScript", "ScriptRule", "fake_embedding"]
@@ -0,0 +1,197 @@
+"""PostgREST-compatible HTTP facade over `InMemoryStore` (`/rest/v1/...`).
+
+Covers what `supabase-py` emits for the repositories in `app/services`:
+`select`, `eq`/`neq`/`gt`/`gte`/`lt`/`lte`/`in`/`is` filters, `order`,
+`limit`/`offset`, insert, upsert (`on_conflict` + `resolution=merge-duplicates`),
+update, delete and `rpc/<name>`.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from scripts.fakes.faults import FailureProfile
+from scripts.fakes.latency import LatencyProfile
+from scripts.fakes.server import FakeHTTPService, FakeRequest, FakeResponse
+from scripts.fakes.supabase import Filter, InMemoryStore
+
+REST_PREFIX = "/rest/v1/"
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+_OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "in", "is"}
+_INTEGER = re.compile(r"-?\d{1,15}")
+_NUMBER = re.compile(r"-?\d+\.\d+")
+
+
+def _coerce(token: str) -> Any:
+    lowered = token.lower()
+    if lowered == "null":
+        return None
+    if lowered in {"true", "false"}:
+        return lowered == "true"
+    if _INTEGER.fullmatch(token):
+        return int(token)
+    if _NUMBER.fullmatch(token):
+        return float(token)
+    if len(token) >= 2 and token[0] == token[-1] == '"':
+        return token[1:-1]
+    return token
+
+
+def _split_list(raw: str) -> List[str]:
+    """Parse `(a,"b,c",d)` respecting double quotes."""
+
+    inner = raw.strip()
+    if inner.startswith("(") and inner.endswith(")"):
+        inner = inner[1:-1]
+    items: List[str] = []
+    current = ""
+    quoted = False
+    for char in inner:
+        if char == '"':
+            quoted = not quoted
+            continue
+        if char == "," and not quoted:
+            items.append(current)
+            current = ""
+            continue
+        current += char
+    if current or items:
+        items.append(current)
+    return items
+
+
+def parse_filters(query: Sequence[Tuple[str, str]]) -> List[Filter]:
+    filters: List[Filter] = []
+    for column, raw in query:
+        if column in _RESERVED_PARAMS:
+            continue
+        operator, _, value = raw.partition(".")
+        if operator not in _OPERATORS:
+            raise ValueError(f"Operador PostgREST no soportado: {raw!r}")
+        if operator == "in":
+            filters.append(("in", column, [_coerce(item) for item in _split_list(value)]))
+        else:
+            filters.append((operator, column, _coerce(value)))
+    return filters
+
+
+def parse_order(raw: Optional[str]) -> List[Tuple[str, bool]]:
+    order: List[Tuple[str, bool]] = []
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        column, *modifiers = part.strip().split(".")
+        order.append((column, "desc" in modifiers))
+    return order
+
+
+class FakePostgREST(FakeHTTPService):
+    """Supabase falso accesible por HTTP: `create_client(base_url, clave)` funciona tal cual."""
+
+    name = "postgrest"
+
+    def __init__(
+        self,
+        store: Optional[InMemoryStore] = None,
+        *,
+        latency: Optional[LatencyProfile] = None,
+        failures: Optional[FailureProfile] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(latency=latency, failures=failures, seed=seed)
+        self.store = store or InMemoryStore()
+        self.route("POST", f"{REST_PREFIX}rpc/", self._rpc)
+        self.route("GET", REST_PREFIX, self._select)
+        self.route("HEAD", REST_PREFIX, self._select)
+        self.route("POST", REST_PREFIX, self._insert)
+        self.route("PATCH", REST_PREFIX, self._update)
+        self.route("DELETE", REST_PREFIX, self._delete)
+
+    # ------------------------------------------------------------------
+
+    def _select(self, request: FakeRequest) -> FakeResponse:
+        params = dict(request.query)
+        try:
+            filters = parse_filters(request.query)
+        except ValueError as exc:
+            return self._error(str(exc))
+        offset = int(params.get("offset") or 0)
+        rows = self.store.select(
+            self._table(request),
+            columns=params.get("select") or "*",
+            filters=filters,
+            order=parse_order(params.get("order")),
+            limit=int(params["limit"]) if params.get("limit") else None,
+            offset=offset,
+        )
+        return self._rows(request, rows, offset=offset)
+
+    def _insert(self, request: FakeRequest) -> FakeResponse:
+        params = dict(request.query)
+        prefer = request.headers.get("prefer", "")
+        payload = request.json()
+        if "resolution=merge-duplicates" in prefer:
+            rows = self.store.upsert(self._table(request), payload, on_conflict=params.get("on_conflict"))
+        elif "resolution=ignore-duplicates" in prefer:
+            rows = self._insert_ignoring_duplicates(request, payload, params.get("on_conflict"))
+        else:
+            rows = self.store.insert(self._table(request), payload)
+        return self._rows(request, rows, status=201)
+
+    def _update(self, request: FakeRequest) -> FakeResponse:
+        try:
+            filters = parse_filters(request.query)
+        except ValueError as exc:
+            return self._error(str(exc))
+        rows = self.store.update(self._table(request), request.json() or {}, filters=filters)
+        return self._rows(request, rows)
+
+    def _delete(self, request: FakeRequest) -> FakeResponse:
+        try:
+            filters = parse_filters(request.query)
+        except ValueError as exc:
+            return self._error(str(exc))
+        rows = self.store.delete(self._table(request), filters=filters)
+        return self._rows(request, rows)
+
+    def _rpc(self, request: FakeRequest) -> FakeResponse:
+        name = request.path[len(f"{REST_PREFIX}rpc/") :].strip("/")
+        return FakeResponse.json(self.store.rpc(name, request.json() or {}))
+
+    # ------------------------------------------------------------------
+
+    def _insert_ignoring_duplicates(
+        self, request: FakeRequest, payload: Any, on_conflict: Optional[str]
+    ) -> List[dict]:
+        table = self._table(request)
+        keys = [key.strip() for key in (on_conflict or "id").split(",") if key.strip()]
+        incoming = [payload] if isinstance(payload, dict) else list(payload or [])
+        fresh = [
+            row
+            for row in incoming
+            if not self.store.select(table, filters=[("eq", key, row.get(key)) for key in keys], limit=1)
+        ]
+        return self.store.insert(table, fresh) if fresh else []
+
+    @staticmethod
+    def _table(request: FakeRequest) -> str:
+        return request.path[len(REST_PREFIX) :].strip("/")
+
+    @staticmethod
+    def _rows(request: FakeRequest, rows: List[dict], *, status: int = 200, offset: int = 0) -> FakeResponse:
+        prefer = request.headers.get("prefer", "")
+        if request.method != "GET" and "return=representation" not in prefer:
+            response = FakeResponse(status=204 if status == 200 else status)
+        else:
+            response = FakeResponse.json(rows, status=status)
+        end = offset + len(rows) - 1
+        response.headers["Content-Range"] = f"{offset}-{end}/{len(rows)}" if rows else "*/0"
+        return response
+
+    @staticmethod
+    def _error(message: str) -> FakeResponse:
+        return FakeResponse.json({"code": "PGRST100", "message": message, "details": None, "hint": None}, status=400)
+
+
+__all__ = ["FakePostgREST", "parse_filters", "parse_order"]
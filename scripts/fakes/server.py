@@ -0,0 +1,205 @@
+"""Minimal threaded HTTP server shared by the fake OpenAI, vector and Whapi backends."""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from scripts.fakes.faults import RESET, TIMEOUT, FailureProfile
+from scripts.fakes.latency import LatencyProfile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FakeRequest:
+    method: str
+    path: str
+    query: List[Tuple[str, str]]
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body or b"null")
+
+
+@dataclass
+class FakeResponse:
+    status: int = 200
+    body: Union[bytes, Iterable[bytes]] = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, payload: Any, status: int = 200) -> "FakeResponse":
+        return cls(
+            status=status,
+            body=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+
+
+Route = Callable[[FakeRequest], FakeResponse]
+
+
+class _DropConnection(Exception):
+    """Cierra el socket sin responder (fallo `reset`)."""
+
+
+class FakeHTTPService:
+    """Servicio HTTP falso con rutas `(método, prefijo)`, latencia y fallos inyectables.
+
+    Las subclases registran rutas con `route()`. `start()` levanta el servidor
+    en un hilo (puerto 0 = libre) y devuelve la URL base.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        *,
+        latency: Optional[LatencyProfile] = None,
+        failures: Optional[FailureProfile] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency or LatencyProfile()
+        self.failures = failures or FailureProfile()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._routes: List[Tuple[str, str, Route]] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._counts: Dict[str, int] = {}
+        self._failed: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+
+    def route(self, method: str, prefix: str, handler: Route) -> None:
+        self._routes.append((method.upper(), prefix, handler))
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        with self._counts_lock:
+            return dict(self._counts)
+
+    @property
+    def failed(self) -> Dict[str, int]:
+        with self._counts_lock:
+            return dict(self._failed)
+
+    def dispatch(self, request: FakeRequest) -> FakeResponse:
+        for method, prefix, handler in self._routes:
+            if request.method == method and request.path.startswith(prefix):
+                with self._counts_lock:
+                    self._counts[prefix] = self._counts.get(prefix, 0) + 1
+                self.sleep()
+                failure = self._draw_failure()
+                if failure is None:
+                    return handler(request)
+                with self._counts_lock:
+                    self._failed[prefix] = self._failed.get(prefix, 0) + 1
+                return self._fail(failure)
+        return FakeResponse.json({"error": "not_found", "path": request.path}, status=404)
+
+    def sleep(self) -> float:
+        with self._rng_lock:
+            delay = self.latency.sample_ms(self._rng)
+        if delay:
+            time.sleep(delay / 1000)
+        return delay
+
+    def _draw_failure(self) -> Optional[str]:
+        with self._rng_lock:
+            return self.failures.draw(self._rng)
+
+    def _fail(self, kind: str) -> FakeResponse:
+        if kind == RESET:
+            raise _DropConnection()
+        if kind == TIMEOUT:
+            time.sleep(self.failures.hang_seconds)
+            return FakeResponse.json({"error": "injected_timeout"}, status=504)
+        return FakeResponse.json(
+            {"error": {"message": "injected failure", "type": "server_error"}},
+            status=self.failures.status,
+        )
+
+    # ------------------------------------------------------------------
+    # Server lifecycle
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        service = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Sin esto Nagle + delayed ACK suman ~40 ms a cada respuesta.
+            disable_nagle_algorithm = True
+
+            def _handle(self) -> None:
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request = FakeRequest(
+                    method=self.command,
+                    path=parts.path,
+                    query=parse_qsl(parts.query, keep_blank_values=True),
+                    headers={key.lower(): value for key, value in self.headers.items()},
+                    body=self.rfile.read(length) if length else b"",
+                )
+                try:
+                    response = service.dispatch(request)
+                except _DropConnection:
+                    self.close_connection = True
+                    return
+                except Exception:  # pragma: no cover - el fake no debe tumbar el servidor
+                    logger.exception("Error en el backend falso %s", service.name)
+                    response = FakeResponse.json({"error": "fake_failure"}, status=500)
+                self._write(response)
+
+            def _write(self, response: FakeResponse) -> None:
+                self.send_response(response.status)
+                for key, value in response.headers.items():
+                    self.send_header(key, value)
+                if isinstance(response.body, bytes):
+                    self.send_header("Content-Length", str(len(response.body)))
+                    self.end_headers()
+                    self.wfile.write(response.body)
+                    return
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in response.body:
+                    self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                logger.debug("%s | " + format, service.name, *args)
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"fake-{self.name}", daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError(f"El backend falso {self.name} no está iniciado")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+__all__ = ["FakeHTTPService", "FakeRequest", "FakeResponse"]
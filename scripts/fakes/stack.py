@@ -0,0 +1,126 @@
+"""The full set of fakes, configured from CLI flags and started together."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from scripts.fakes.faults import FailureProfile
+from scripts.fakes.latency import LatencyProfile
+from scripts.fakes.openai import FakeOpenAI, OpenAIScript
+from scripts.fakes.postgrest import FakePostgREST
+from scripts.fakes.supabase import InMemoryStore, InMemorySupabase
+from scripts.fakes.vector import FakeVectorService
+from scripts.fakes.whapi import FakeWhapi
+
+# Clave con forma de JWT: supabase-py valida el formato antes de conectar.
+FAKE_SUPABASE_KEY = "fake.supabase.key"
+
+DEFAULT_PORTS = {"postgrest": 54321, "openai": 8101, "vector": 8102, "whapi": 8103}
+
+
+def add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    """Flags de latencia, fallos y datos compartidos por el replay y `python -m scripts.fakes`."""
+
+    group = parser.add_argument_group("backends falsos")
+    group.add_argument("--openai-latency", default="lognormal:700,0.3")
+    group.add_argument("--supabase-latency", default="uniform:10,30")
+    group.add_argument("--vector-latency", default="uniform:40,120")
+    group.add_argument("--whapi-latency", default="uniform:30,90")
+    group.add_argument("--openai-failures", default=None, help="p. ej. 0.05, 0.05:500, 0.02:timeout")
+    group.add_argument("--supabase-failures", default=None)
+    group.add_argument("--vector-failures", default=None)
+    group.add_argument("--whapi-failures", default=None)
+    group.add_argument("--hang-seconds", type=float, default=30.0, help="Duración de los fallos 'timeout'")
+    group.add_argument("--openai-script", type=Path, default=None, help="Guion JSON de respuestas")
+    group.add_argument("--seed", type=Path, default=None, help="JSON tabla -> filas para el Supabase falso")
+    group.add_argument("--random-seed", type=int, default=None, help="Semilla de latencias y fallos")
+
+
+@dataclass
+class FakeStack:
+    store: InMemoryStore
+    supabase: InMemorySupabase
+    postgrest: FakePostgREST
+    openai: FakeOpenAI
+    vector: FakeVectorService
+    whapi: FakeWhapi
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "FakeStack":
+        store = InMemoryStore()
+        if args.seed:
+            for table, rows in json.loads(args.seed.read_text(encoding="utf-8")).items():
+                store.seed(table, rows)
+
+        def failures(spec: Optional[str]) -> FailureProfile:
+            return FailureProfile.parse(spec, hang_seconds=args.hang_seconds)
+
+        supabase_latency = LatencyProfile.parse(args.supabase_latency)
+        return cls(
+            store=store,
+            supabase=InMemorySupabase(
+                store, latency=supabase_latency, failures=failures(args.supabase_failures)
+            ),
+            postgrest=FakePostgREST(
+                store,
+                latency=supabase_latency,
+                failures=failures(args.supabase_failures),
+                seed=args.random_seed,
+            ),
+            openai=FakeOpenAI(
+                latency=LatencyProfile.parse(args.openai_latency),
+                failures=failures(args.openai_failures),
+                script=OpenAIScript.load(args.openai_script) if args.openai_script else None,
+                seed=args.random_seed,
+            ),
+            vector=FakeVectorService(
+                latency=LatencyProfile.parse(args.vector_latency),
+                failures=failures(args.vector_failures),
+                seed=args.random_seed,
+            ),
+            whapi=FakeWhapi(
+                latency=LatencyProfile.parse(args.whapi_latency),
+                failures=failures(args.whapi_failures),
+                seed=args.random_seed,
+            ),
+        )
+
+    def start(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        ports: Optional[Dict[str, int]] = None,
+        postgrest: bool = True,
+    ) -> Dict[str, str]:
+        """Start the HTTP fakes (port 0 = any free port) and return the env that points the app at them."""
+
+        ports = ports or {}
+        env = {
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": f"{self.openai.start(host, ports.get('openai', 0))}/v1",
+            "VECTOR_SERVICE_URL": self.vector.start(host, ports.get("vector", 0)),
+            "WHAPI_BASE_URL": self.whapi.start(host, ports.get("whapi", 0)),
+            "SUPABASE_SERVICE_ROLE_KEY": FAKE_SUPABASE_KEY,
+            "SUPABASE_URL": "http://supabase.invalid",
+        }
+        if postgrest:
+            env["SUPABASE_URL"] = self.postgrest.start(host, ports.get("postgrest", 0))
+        return env
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        return {
+            service.name: {**service.counts, **{f"{key}:failed": value for key, value in service.failed.items()}}
+            for service in (self.postgrest, self.openai, self.vector, self.whapi)
+            if service.counts
+        }
+
+    def stop(self) -> None:
+        for service in (self.postgrest, self.openai, self.vector, self.whapi):
+            service.stop()
+
+
+__all__ = ["DEFAULT_PORTS", "FAKE_SUPABASE_KEY", "FakeStack", "add_fake_arguments"]
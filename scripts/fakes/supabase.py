@@ -0,0 +1,350 @@
+"""In-memory stand-in for the Supabase client used by the repositories."""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from scripts.fakes.faults import TIMEOUT, FailureProfile, InjectedFailure
+from scripts.fakes.latency import LatencyProfile
+
+Filter = Tuple[str, str, Any]
+
+# Tablas con id entero autoincremental; el resto usa uuid como en Supabase
+# (ver docs/tables_completas_supabase.md).
+INTEGER_ID_TABLES = frozenset({"chats_history_n8n", "llm_usage"})
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    return value == expected or (value is not None and str(value) == str(expected))
+
+
+def _compare(value: Any, expected: Any) -> Optional[int]:
+    """-1/0/1 like SQL; values that arrive as text over HTTP are compared as text."""
+
+    if value is None or expected is None:
+        return None
+    try:
+        return (value > expected) - (value < expected)
+    except TypeError:
+        left, right = str(value), str(expected)
+        return (left > right) - (left < right)
+
+
+def _ordered(check: Callable[[int], bool]) -> Callable[[Any, Any], bool]:
+    def operator(value: Any, expected: Any) -> bool:
+        result = _compare(value, expected)
+        return result is not None and check(result)
+
+    return operator
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": _equals,
+    "neq": lambda value, expected: not _equals(value, expected),
+    "gt": _ordered(lambda result: result > 0),
+    "gte": _ordered(lambda result: result >= 0),
+    "lt": _ordered(lambda result: result < 0),
+    "lte": _ordered(lambda result: result <= 0),
+    "in": lambda value, expected: value in expected or str(value) in {str(item) for item in expected},
+    "is": lambda value, expected: value is expected,
+}
+
+
+class InMemoryStore:
+    """Tablas en memoria con los filtros que usan los repositorios (eq, in, gte, order, limit)."""
+
+    def __init__(self, *, integer_id_tables: Iterable[str] = INTEGER_ID_TABLES) -> None:
+        self._integer_id_tables = frozenset(integer_id_tables)
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._sequences: Dict[str, itertools.count] = {}
+        self._rpcs: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Seeding / inspection
+
+    def seed(self, table: str, rows: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                self._insert_row(table, dict(row))
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(self._tables.get(table, []))
+
+    def register_rpc(self, name: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        self._rpcs[name] = handler
+
+    # ------------------------------------------------------------------
+    # Operations
+
+    def select(
+        self,
+        table: str,
+        *,
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        order: Sequence[Tuple[str, bool]] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [row for row in self._tables.get(table, []) if _matches(row, filters)]
+            for column, desc in reversed(list(order)):
+                rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+            if offset:
+                rows = rows[offset:]
+            if limit is not None:
+                rows = rows[:limit]
+            return [_project(row, columns) for row in rows]
+
+    def insert(self, table: str, payload: Any) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [copy.deepcopy(self._insert_row(table, dict(row))) for row in _as_rows(payload)]
+
+    def upsert(self, table: str, payload: Any, *, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        keys = [key.strip() for key in (on_conflict or "id").split(",") if key.strip()]
+        result: List[Dict[str, Any]] = []
+        with self._lock:
+            rows = self._tables.setdefault(table, [])
+            for incoming in _as_rows(payload):
+                existing = next(
+                    (
+                        row
+                        for row in rows
+                        if all(key in incoming and row.get(key) == incoming[key] for key in keys)
+                    ),
+                    None,
+                )
+                if existing is None:
+                    result.append(copy.deepcopy(self._insert_row(table, dict(incoming))))
+                else:
+                    existing.update(copy.deepcopy(incoming))
+                    result.append(copy.deepcopy(existing))
+        return result
+
+    def update(self, table: str, values: Dict[str, Any], *, filters: Sequence[Filter] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            updated = []
+            for row in self._tables.get(table, []):
+                if _matches(row, filters):
+                    row.update(copy.deepcopy(values))
+                    updated.append(copy.deepcopy(row))
+            return updated
+
+    def delete(self, table: str, *, filters: Sequence[Filter] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._tables.get(table, [])
+            kept = [row for row in rows if not _matches(row, filters)]
+            removed = [row for row in rows if _matches(row, filters)]
+            self._tables[table] = kept
+            return removed
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        handler = self._rpcs.get(name)
+        return handler(params) if handler else []
+
+    # ------------------------------------------------------------------
+
+    def _insert_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        if row.get("id") is None:
+            if table in self._integer_id_tables:
+                row["id"] = next(self._sequences.setdefault(table, itertools.count(1)))
+            else:
+                row["id"] = str(uuid.uuid4())
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        self._tables.setdefault(table, []).append(row)
+        return row
+
+
+def _as_rows(payload: Any) -> List[Dict[str, Any]]:
+    if isinstance(payload, dict):
+        return [payload]
+    return [dict(item) for item in payload or []]
+
+
+def _matches(row: Dict[str, Any], filters: Sequence[Filter]) -> bool:
+    return all(_OPERATORS[op](row.get(column), value) for op, column, value in filters)
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # None al final, como en PostgREST por defecto.
+    return (1, "") if value is None else (0, value)
+
+
+def _project(row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+    names = [name.strip() for name in (columns or "*").split(",") if name.strip()]
+    if not names or "*" in names:
+        return copy.deepcopy(row)
+    return {name: copy.deepcopy(row.get(name)) for name in names}
+
+
+@dataclass
+class QueryResponse:
+    data: Any
+    count: Optional[int] = None
+
+
+class _Query:
+    """Builder con la misma forma encadenable que `postgrest` (`table().select().eq()...`)."""
+
+    def __init__(self, client: "InMemorySupabase", table: str) -> None:
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._filters: List[Filter] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    def select(self, columns: str = "*", *_: Any, **__: Any) -> "_Query":
+        if self._action == "select":
+            self._columns = columns
+        return self
+
+    def insert(self, payload: Any, *_: Any, **__: Any) -> "_Query":
+        self._action, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload: Any, *_: Any, on_conflict: Optional[str] = None, **__: Any) -> "_Query":
+        self._action, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload: Dict[str, Any], *_: Any, **__: Any) -> "_Query":
+        self._action, self._payload = "update", payload
+        return self
+
+    def delete(self, *_: Any, **__: Any) -> "_Query":
+        self._action = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        return self._filter("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "_Query":
+        return self._filter("neq", column, value)
+
+    def gt(self, column: str, value: Any) -> "_Query":
+        return self._filter("gt", column, value)
+
+    def gte(self, column: str, value: Any) -> "_Query":
+        return self._filter("gte", column, value)
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        return self._filter("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "_Query":
+        return self._filter("lte", column, value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "_Query":
+        return self._filter("in", column, list(values))
+
+    def is_(self, column: str, value: Any) -> "_Query":
+        return self._filter("is", column, None if value in (None, "null") else value)
+
+    def order(self, column: str, *, desc: bool = False, **__: Any) -> "_Query":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, *_: Any, **__: Any) -> "_Query":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def execute(self) -> QueryResponse:
+        self._client.before_execute()
+        store = self._client.store
+        if self._action == "insert":
+            data = store.insert(self._table, self._payload)
+        elif self._action == "upsert":
+            data = store.upsert(self._table, self._payload, on_conflict=self._on_conflict)
+        elif self._action == "update":
+            data = store.update(self._table, self._payload, filters=self._filters)
+        elif self._action == "delete":
+            data = store.delete(self._table, filters=self._filters)
+        else:
+            limit = self._limit
+            max_rows = self._client.max_rows
+            if max_rows is not None:
+                limit = max_rows if limit is None else min(limit, max_rows)
+            data = store.select(
+                self._table,
+                columns=self._columns,
+                filters=self._filters,
+                order=self._order,
+                limit=limit,
+                offset=self._offset,
+            )
+        return QueryResponse(data=data, count=len(data))
+
+    def _filter(self, op: str, column: str, value: Any) -> "_Query":
+        self._filters.append((op, column, value))
+        return self
+
+
+class _RpcCall:
+    def __init__(self, client: "InMemorySupabase", name: str, params: Dict[str, Any]) -> None:
+        self._client = client
+        self._name = name
+        self._params = params
+
+    def execute(self) -> QueryResponse:
+        self._client.before_execute()
+        return QueryResponse(data=self._client.store.rpc(self._name, self._params))
+
+
+class InMemorySupabase:
+    """Drop-in for `supabase.Client` limited to `table(...)` and `rpc(...)`.
+
+    Every `execute()` sleeps according to `latency` so repository spans look
+    like a real round trip to PostgREST, and raises `InjectedFailure` at the
+    rate configured in `failures`. `max_rows` truncates selects like the
+    PostgREST `max-rows` setting (1000 in Supabase) does.
+    """
+
+    def __init__(
+        self,
+        store: Optional[InMemoryStore] = None,
+        *,
+        latency: Optional[LatencyProfile] = None,
+        failures: Optional[FailureProfile] = None,
+        max_rows: Optional[int] = None,
+    ) -> None:
+        self.store = store or InMemoryStore()
+        self.latency = latency or LatencyProfile()
+        self.failures = failures or FailureProfile()
+        self.max_rows = max_rows
+
+    def before_execute(self) -> None:
+        self.latency.sleep()
+        failure = self.failures.draw()
+        if failure is None:
+            return
+        if failure == TIMEOUT:
+            time.sleep(self.failures.hang_seconds)
+        raise InjectedFailure(f"Fallo inyectado en Supabase falso ({failure})")
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def from_(self, name: str) -> _Query:
+        return self.table(name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> _RpcCall:
+        return _RpcCall(self, name, dict(params or {}))
+
+
+__all__ = ["INTEGER_ID_TABLES", "InMemoryStore", "InMemorySupabase", "QueryResponse"]
@@ -0,0 +1,54 @@
+"""Stub for the vector microservice (`POST /vectors/search`)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from scripts.fakes.faults import FailureProfile
+from scripts.fakes.latency import LatencyProfile
+from scripts.fakes.server import FakeHTTPService, FakeRequest, FakeResponse
+
+
+class FakeVectorService(FakeHTTPService):
+    """Devuelve `results_per_query` proyectos sintéticos por realtor, con score decreciente."""
+
+    name = "vector"
+
+    def __init__(
+        self,
+        *,
+        latency: Optional[LatencyProfile] = None,
+        failures: Optional[FailureProfile] = None,
+        results_per_query: int = 3,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(latency=latency, failures=failures, seed=seed)
+        self.results_per_query = max(0, results_per_query)
+        self.route("POST", "/vectors/search", self._search)
+
+    def results_for(self, query: str, realtor_id: str, limit: int) -> List[Dict[str, Any]]:
+        count = min(limit, self.results_per_query)
+        return [
+            {
+                "project_id": f"{realtor_id}-proyecto-{index + 1}",
+                "score": round(0.92 - index * 0.05, 3),
+                "metadata": {"name": f"Proyecto {index + 1}", "realtor_id": realtor_id},
+                "content": (
+                    f"Proyecto {index + 1}: departamentos de 1 a 3 dormitorios, "
+                    f"desde 3.500 UF, entrega inmediata. Consulta: {query[:80]}"
+                ),
+            }
+            for index in range(count)
+        ]
+
+    def _search(self, request: FakeRequest) -> FakeResponse:
+        body = request.json() or {}
+        results = self.results_for(
+            str(body.get("query") or ""),
+            str(body.get("realtor_id") or "realtor"),
+            int(body.get("limit") or 5),
+        )
+        return FakeResponse.json({"results": results})
+
+
+__all__ = ["FakeVectorService"]
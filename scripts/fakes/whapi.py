@@ -0,0 +1,47 @@
+"""Whapi sink: accepts every outbound message and keeps them for inspection."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+
+from scripts.fakes.faults import FailureProfile
+from scripts.fakes.latency import LatencyProfile
+from scripts.fakes.server import FakeHTTPService, FakeRequest, FakeResponse
+
+
+class FakeWhapi(FakeHTTPService):
+    name = "whapi"
+
+    def __init__(
+        self,
+        *,
+        latency: Optional[LatencyProfile] = None,
+        failures: Optional[FailureProfile] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(latency=latency, failures=failures, seed=seed)
+        self._messages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.route("POST", "/messages/", self._message)
+        self.route("PUT", "/presences/", self._presence)
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._messages)
+
+    def _message(self, request: FakeRequest) -> FakeResponse:
+        body = request.json() or {}
+        with self._lock:
+            message_id = f"fake-{next(self._ids)}"
+            self._messages.append({"id": message_id, "endpoint": request.path, **body})
+        return FakeResponse.json({"sent": True, "message": {"id": message_id, "status": "pending"}})
+
+    def _presence(self, request: FakeRequest) -> FakeResponse:
+        return FakeResponse.json({"success": True})
+
+
+__all__ = ["FakeWhapi"]
@@ -0,0 +1,108 @@
+"""Incremental, resumable embedding ingestion of the `projects` catalog.
+
+Streams each realtor's active projects by keyset pages, splits descriptions
+into chunks, and only embeds chunks whose content hash changed since the last
+run (`OPENAI_EMBEDDINGS_MODEL`, batched, with a bounded number of concurrent
+requests). Chunks of projects that disappeared are deleted. Destinations:
+
+* `supabase`: the pgvector table `VECTOR_TABLE_NAME` (see
+  `docs/tables_completas_supabase.md`).
+* `local`: the embedded index under `RAG_LOCAL_INDEX_PATH` (`LocalVectorIndex`).
+
+Progress is checkpointed after every page; re-running the same command after
+an interruption resumes where it stopped. A throughput report is printed at
+the end.
+
+Usage::
+
+    python -m scripts.ingest_embeddings --all --store supabase
+    python -m scripts.ingest_embeddings --realtor <realtor_id> --store local --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, List, Optional
+
+from app.core.config import get_settings
+from app.services.project_repository import ProjectRepository
+from app.services.rag import EmbeddingClient, LocalVectorIndex
+from app.services.rag.ingest import CatalogIngestor, IngestCheckpoint, LocalChunkStore, SupabaseChunkStore
+from app.services.supabase_client import get_supabase_client
+
+
+def _all_realtors(client: Any) -> List[str]:
+    response = client.table("projects").select("realtor_id").eq("is_active", True).execute()
+    rows = getattr(response, "data", None) or []
+    return sorted({str(row["realtor_id"]) for row in rows if row.get("realtor_id")})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--realtor", action="append", dest="realtors", help="Repetible")
+    target.add_argument("--all", action="store_true", help="Todos los realtors con proyectos activos")
+    parser.add_argument("--store", choices=("supabase", "local"), default="supabase")
+    parser.add_argument("--path", default=None, help="Con --store local; por defecto RAG_LOCAL_INDEX_PATH")
+    parser.add_argument("--table", default=None, help="Con --store supabase; por defecto VECTOR_TABLE_NAME")
+    parser.add_argument("--page-size", type=int, default=500, help="Proyectos por página (y por checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=128, help="Textos por solicitud de embeddings")
+    parser.add_argument("--concurrency", type=int, default=4, help="Solicitudes de embeddings en paralelo")
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=150)
+    parser.add_argument("--checkpoint", default="data/ingest_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="Ignora el checkpoint existente")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    client = get_supabase_client(settings)
+    if client is None:
+        print("Supabase no configurado", file=sys.stderr)
+        return 1
+
+    if args.store == "local":
+        store: Any = LocalChunkStore(LocalVectorIndex(args.path or settings.rag_local_index_path))
+    else:
+        store = SupabaseChunkStore(client, args.table or settings.vector_table_name)
+
+    checkpoint = IngestCheckpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.clear()
+
+    ingestor = CatalogIngestor(
+        ProjectRepository(client).catalog_page,
+        EmbeddingClient(settings, batch_size=max(1, args.batch_size)),
+        store,
+        checkpoint=checkpoint,
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        chunk_chars=args.chunk_chars,
+        chunk_overlap=args.chunk_overlap,
+    )
+    realtors = _all_realtors(client) if args.all else args.realtors
+    stats = ingestor.run(realtors)
+    report = stats.as_dict()
+
+    if args.json:
+        print(json.dumps(dict(report, per_realtor=stats.per_realtor), indent=2, ensure_ascii=False))
+        return 0
+
+    for realtor_id, counters in stats.per_realtor.items():
+        print(
+            f"{realtor_id}: {counters['projects']} proyectos, {counters['chunks']} chunks, "
+            f"{counters['embedded']} embebidos, {counters['skipped']} sin cambios, {counters['deleted']} eliminados"
+        )
+    print(
+        f"total: {report['chunks']} chunks en {report['elapsed_s']}s "
+        f"({report['chunks_per_s']} chunks/s, {report['embedded_per_s']} embebidos/s, "
+        f"{report['chars_per_s']} caracteres/s; {report['embed_s']}s en embeddings)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
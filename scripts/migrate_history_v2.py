@@ -0,0 +1,126 @@
+"""Rewrite legacy `chats_history_n8n` rows into the compact v2 format.
+
+Rows written before v2 carry the whole turn metadata (`subagents`,
+`postprocess`, RAG context, usage) inside `message`. This script walks the
+table by `id` (keyset pages), moves that payload to the diagnostics sink
+(`chats_history_diagnostics` or a JSONL file) and leaves only the fields the
+prompts need. Rows already in v2 are skipped, so it can be re-run safely.
+
+Until it runs, `ChatHistoryRepository` trims legacy rows when reading them.
+
+Usage::
+
+    python -m scripts.migrate_history_v2 --dry-run
+    python -m scripts.migrate_history_v2 --batch-size 500 --sink table
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.chat_history_repository import HISTORY_FORMAT_VERSION, split_message
+from app.services.history_diagnostics_repository import (
+    FileDiagnosticsSink,
+    HistoryDiagnosticsRepository,
+)
+from app.services.supabase_client import get_supabase_client
+
+
+def migrate_row(row: Dict[str, Any]) -> Optional[tuple[str, Dict[str, Any]]]:
+    """Return `(new_message_json, diagnostics)` for a legacy row, or None if already v2."""
+
+    raw = row.get("message")
+    decoded = raw if isinstance(raw, dict) else None
+    if isinstance(raw, str):
+        try:
+            decoded = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return None
+    if not isinstance(decoded, dict) or decoded.get("v") == HISTORY_FORMAT_VERSION:
+        return None
+
+    compact, diagnostics = split_message(decoded)
+    if diagnostics:
+        compact.setdefault("metadata", {})["turn"] = f"legacy-{row.get('id')}"
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":")), diagnostics
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--table", default="chats_history_n8n")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--sink", choices=("table", "file", "drop"), default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Solo cuenta filas y bytes")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    client = get_supabase_client(settings)
+    if client is None:
+        print("Supabase no está configurado", file=sys.stderr)
+        return 1
+
+    sink_kind = args.sink or settings.history_diagnostics_sink
+    if sink_kind == "off" and not args.dry_run:
+        # La migración reescribe las filas: sin destino explícito el detalle se perdería.
+        print(
+            "HISTORY_DIAGNOSTICS_SINK=off: indica --sink table, --sink file o --sink drop",
+            file=sys.stderr,
+        )
+        return 2
+    sink: Any = None
+    if sink_kind == "table":
+        sink = HistoryDiagnosticsRepository(client, table=settings.history_diagnostics_table)
+    elif sink_kind == "file":
+        sink = FileDiagnosticsSink(settings.history_diagnostics_path)
+
+    cursor: Any = 0
+    scanned = migrated = bytes_before = bytes_after = 0
+    while True:
+        rows = (
+            client.table(args.table)
+            .select("id, session_id, message")
+            .gt("id", cursor)
+            .order("id", desc=False)
+            .limit(args.batch_size)
+            .execute()
+            .data
+            or []
+        )
+        if not rows:
+            break
+        cursor = rows[-1]["id"]
+        for row in rows:
+            scanned += 1
+            result = migrate_row(row)
+            if result is None:
+                continue
+            message, diagnostics = result
+            migrated += 1
+            original = row.get("message")
+            bytes_before += len(original if isinstance(original, str) else json.dumps(original))
+            bytes_after += len(message)
+            if args.dry_run:
+                continue
+            if diagnostics and sink is not None:
+                sink.record(
+                    session_id=row.get("session_id") or "",
+                    turn_id=f"legacy-{row['id']}",
+                    diagnostics=diagnostics,
+                )
+            client.table(args.table).update({"message": message}).eq("id", row["id"]).execute()
+        print(f"id<={cursor} revisadas={scanned} migradas={migrated}", flush=True)
+
+    print(
+        f"Filas revisadas={scanned} migradas={migrated} "
+        f"bytes antes={bytes_before} después={bytes_after}"
+        + (" (dry-run)" if args.dry_run else "")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Replay recorded webhook traffic in-process against fake backends.
+
+Each line of the input JSONL is a Whapi webhook payload (the same shape the
+`tests/test_webhook_*.py` tests post), optionally wrapped as
+``{"payload": {...}}``. Payloads are posted to `/webhook` through the ASGI app,
+so the full path runs: inbound workflow, agents, repositories, vector search
+and Whapi delivery. Supabase is replaced by an in-memory store (or, with
+``--supabase-mode http``, by the PostgREST fake behind a real supabase-py
+client) and OpenAI, the vector service and Whapi by the local HTTP fakes in
+`scripts.fakes`, each with its own latency distribution (``const:40``,
+``uniform:20,80``, ``normal:300,50``, ``lognormal:900,0.35``) and failure
+rate. ``--openai-script`` scripts the LLM outputs per agent.
+
+Messages from the same chat are replayed in order; different chats run
+concurrently up to ``--concurrency``. Realtors are seeded automatically for
+every ``channel_id`` found in the payloads (``--seed`` adds more rows).
+
+The report includes throughput, turn latency percentiles, per-stage
+percentiles from `app.core.metrics` (last samples of each stage) and the
+peak RSS of the process.
+
+Usage::
+
+    python -m scripts.replay_webhooks traffic.jsonl --concurrency 8 \
+        --openai-latency lognormal:900,0.35 --supabase-latency uniform:15,40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from scripts.fakes import FakeStack, InMemoryStore, add_fake_arguments
+
+FAKE_WHAPI_TOKEN = "fake-whapi-token"
+
+
+def load_payloads(path: Path) -> List[Dict[str, Any]]:
+    payloads: List[Dict[str, Any]] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, dict) and isinstance(record.get("payload"), dict):
+            record = record["payload"]
+        if isinstance(record, dict):
+            payloads.append(record)
+    return payloads
+
+
+def chat_key(payload: Dict[str, Any]) -> str:
+    messages = payload.get("messages")
+    if isinstance(messages, list) and messages and isinstance(messages[0], dict):
+        first = messages[0]
+        return str(first.get("chat_id") or first.get("from") or "unknown")
+    return str(payload.get("session_id") or payload.get("from") or "unknown")
+
+
+def seed_realtors(store: InMemoryStore, payloads: List[Dict[str, Any]]) -> None:
+    known = {str(row.get("channel_id")) for row in store.rows("realtors")}
+    for payload in payloads:
+        channel_id = payload.get("channel_id") or (payload.get("metadata") or {}).get("channel_id")
+        if not channel_id or str(channel_id) in known:
+            continue
+        known.add(str(channel_id))
+        index = len(known)
+        store.seed(
+            "realtors",
+            [
+                {
+                    "id": f"00000000-0000-0000-0000-{index:012d}",
+                    "channel_id": str(channel_id),
+                    "name": f"Inmobiliaria {index}",
+                    "token_whapi": FAKE_WHAPI_TOKEN,
+                    "bot_name": "Broky",
+                }
+            ],
+        )
+
+
+def start_backends(args: argparse.Namespace) -> FakeStack:
+    """Start the fakes and point the app settings at them (before importing `app.main`)."""
+
+    stack = FakeStack.from_args(args)
+    http_supabase = args.supabase_mode == "http"
+    os.environ.update(stack.start(postgrest=http_supabase))
+    os.environ.update(
+        {
+            "RESPONSE_STREAMING_ENABLED": "true" if args.streaming else "false",
+            "LLM_USAGE_ENABLED": "false",
+        }
+    )
+    if getattr(args, "rag_mode", None):
+        os.environ["RAG_MODE"] = args.rag_mode
+
+    from app.services.supabase_client import set_supabase_client
+
+    # En modo "http" la app crea un cliente supabase-py real contra el PostgREST falso.
+    set_supabase_client(None if http_supabase else stack.supabase)  # type: ignore[arg-type]
+    return stack
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+def _summary_ms(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values) * 1000, 1) if values else 0.0,
+        "p50": round(_percentile(values, 50) * 1000, 1),
+        "p95": round(_percentile(values, 95) * 1000, 1),
+        "p99": round(_percentile(values, 99) * 1000, 1),
+        "max": round(max(values, default=0.0) * 1000, 1),
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB; macOS, bytes.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+async def replay(
+    app: Any,
+    payloads: List[Dict[str, Any]],
+    *,
+    concurrency: int,
+    repeat: int,
+) -> Dict[str, Any]:
+    chats: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    for round_index in range(repeat):
+        for payload in payloads:
+            chats.setdefault(f"{chat_key(payload)}#{round_index}", []).append(payload)
+
+    queue: "asyncio.Queue[List[Dict[str, Any]]]" = asyncio.Queue()
+    for turns in chats.values():
+        queue.put_nowait(turns)
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=None) as client:
+
+        async def worker() -> None:
+            while True:
+                try:
+                    turns = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                for payload in turns:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post("/webhook", json=payload)
+                        status = response.status_code
+                    except Exception:  # pragma: no cover - se cuenta como error
+                        logging.getLogger(__name__).exception("Fallo reproduciendo webhook")
+                        status = 599
+                    latencies.append(time.perf_counter() - started)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        elapsed = time.perf_counter() - started
+
+    return {"latencies": latencies, "statuses": statuses, "elapsed": elapsed, "chats": len(chats)}
+
+
+def build_report(
+    run: Dict[str, Any],
+    stages: Dict[str, List[float]],
+    backends: FakeStack,
+    *,
+    concurrency: int,
+    rss_before_mb: float,
+) -> Dict[str, Any]:
+    turns = len(run["latencies"])
+    return {
+        "turns": turns,
+        "chats": run["chats"],
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in run["statuses"].items() if status != 200),
+        "statuses": {str(status): count for status, count in sorted(run["statuses"].items())},
+        "elapsed_s": round(run["elapsed"], 3),
+        "throughput_tps": round(turns / run["elapsed"], 2) if run["elapsed"] else 0.0,
+        "turn_latency_ms": _summary_ms(run["latencies"]),
+        "stages": {stage: _summary_ms(values) for stage, values in sorted(stages.items())},
+        "backends": {**backends.counts(), "whapi_messages": len(backends.whapi.messages)},
+        "rss_mb": {"before": rss_before_mb, "peak": _peak_rss_mb()},
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    latency = report["turn_latency_ms"]
+    print(
+        f"turnos={report['turns']} chats={report['chats']} concurrencia={report['concurrency']} "
+        f"errores={report['errors']} duración={report['elapsed_s']}s "
+        f"throughput={report['throughput_tps']} turnos/s"
+    )
+    print(
+        f"latencia turno ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} "
+        f"max={latency['max']}"
+    )
+    print(f"RSS MB: inicio={report['rss_mb']['before']} pico={report['rss_mb']['peak']}")
+    header = f"\n{'etapa':<44}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * (len(header) - 1))
+    for stage, values in report["stages"].items():
+        print(f"{stage:<44}{values['count']:>7}{values['p50']:>10}{values['p95']:>10}{values['p99']:>10}")
+    print(f"\nbackends: {json.dumps(report['backends'], ensure_ascii=False)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("payloads", type=Path, help="JSONL con payloads de webhook")
+    parser.add_argument("--concurrency", type=int, default=4, help="Chats reproducidos en paralelo")
+    parser.add_argument("--repeat", type=int, default=1, help="Veces que se reproduce el archivo")
+    parser.add_argument(
+        "--supabase-mode",
+        choices=("memory", "http"),
+        default="memory",
+        help="memory: cliente en memoria; http: supabase-py real contra el PostgREST falso",
+    )
+    parser.add_argument("--streaming", action="store_true", help="Activa RESPONSE_STREAMING_ENABLED")
+    parser.add_argument(
+        "--rag-mode",
+        choices=("generate", "retrieval_only"),
+        default=None,
+        help="Fija RAG_MODE (por defecto el del entorno)",
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    add_fake_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, str(args.log_level).upper(), logging.WARNING))
+
+    payloads = load_payloads(args.payloads)
+    if not payloads:
+        print("No se encontraron payloads de webhook", file=sys.stderr)
+        return 1
+
+    rss_before = _peak_rss_mb()
+    backends = start_backends(args)
+    seed_realtors(backends.store, payloads)
+    try:
+        # La app se importa después de configurar el entorno falso.
+        from app.core.metrics import reset_metrics, stage_samples
+        from app.main import app
+
+        reset_metrics()
+        run = asyncio.run(
+            replay(app, payloads, concurrency=args.concurrency, repeat=max(1, args.repeat))
+        )
+        report = build_report(
+            run,
+            stage_samples(),
+            backends,
+            concurrency=args.concurrency,
+            rss_before_mb=rss_before,
+        )
+    finally:
+        backends.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+from concurrent.futures import Executor, Future
+
+from broky.memory import ConversationSummarizer, SupabaseConversationMemory, summary_prompt
+
+
+class _InlineExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class _FakeHistoryRepo:
+    def __init__(self, total: int):
+        self.rows = [
+            {"id": index, "sender_role": "user" if index % 2 else "assistant", "message": f"msg-{index}"}
+            for index in range(1, total + 1)
+        ]
+
+    def fetch_history(self, session_id: str, limit: int = 30):
+        return self.rows[-limit:]
+
+    def append_message(self, *, session_id, sender_role, message, metadata=None):
+        next_id = self.rows[-1]["id"] + 1 if self.rows else 1
+        self.rows.append({"id": next_id, "sender_role": sender_role, "message": message})
+        return self.rows[-1]
+
+    def append_messages(self, records):
+        return [self.append_message(**record) for record in records]
+
+
+class _FakeSummaryRepo:
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, session_id):
+        return self.rows.get(session_id)
+
+    def upsert(self, *, session_id, summary, last_message_id, turns):
+        self.rows[session_id] = {
+            "session_id": session_id,
+            "summary": summary,
+            "last_message_id": last_message_id,
+            "turns": turns,
+        }
+        return self.rows[session_id]
+
+
+def _build(total: int, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    from broky.config import get_langchain_settings
+
+    get_langchain_settings.cache_clear()
+    history = _FakeHistoryRepo(total)
+    summaries = _FakeSummaryRepo()
+    summarizer = ConversationSummarizer(
+        history,
+        summaries,
+        every_n_turns=2,
+        keep_last=2,
+        executor=_InlineExecutor(),
+    )
+    get_langchain_settings.cache_clear()
+    return history, summaries, summarizer
+
+
+def test_summarizer_waits_for_enough_turns(monkeypatch):
+    _, summaries, summarizer = _build(5, monkeypatch)
+
+    assert summarizer.refresh("session-1") is None
+    assert summaries.rows == {}
+
+
+def test_summarizer_folds_all_but_last_messages(monkeypatch):
+    _, summaries, summarizer = _build(8, monkeypatch)
+
+    result = summarizer.refresh("session-1")
+
+    assert result is not None
+    assert summaries.rows["session-1"]["last_message_id"] == 6
+    assert "msg-1" in result["summary"] and "msg-6" in result["summary"]
+    assert "msg-7" not in result["summary"]
+
+
+def test_snapshot_returns_summary_and_recent_messages(monkeypatch):
+    history, summaries, summarizer = _build(8, monkeypatch)
+    memory = SupabaseConversationMemory(history, summarizer=summarizer)
+
+    memory.append(session_id="session-1", user_message="hola", assistant_message="¿en qué te ayudo?")
+    snapshot = memory.snapshot("session-1")
+
+    assert summaries.rows["session-1"]["last_message_id"] == 8
+    assert [item["message"] for item in snapshot["messages"]] == ["hola", "¿en qué te ayudo?"]
+    assert summary_prompt(snapshot).startswith("Resumen de la conversación previa:")
+
+
+def test_summary_is_cached_with_history_and_refreshed_after_flush(monkeypatch):
+    from broky.memory import HistoryCache, HistoryWriteBehind
+
+    history, summaries, summarizer = _build(8, monkeypatch)
+    reads = []
+    original_get = summaries.get
+    summaries.get = lambda session_id: reads.append(session_id) or original_get(session_id)
+
+    writer = HistoryWriteBehind(history, flush_interval=60)
+    memory = SupabaseConversationMemory(history, summarizer=summarizer, cache=HistoryCache(), writer=writer)
+    memory.snapshot("session-1")
+    memory.snapshot("session-1")
+    assert reads == ["session-1"]
+
+    # Mientras el turno siga en el buffer, el resumen no se recalcula.
+    memory.append(session_id="session-1", user_message="hola", assistant_message="¿en qué te ayudo?")
+    assert summaries.rows == {}
+
+    writer.flush("session-1")
+    writer.close()
+    assert summaries.rows["session-1"]["last_message_id"] == 8
+    snapshot = memory.snapshot("session-1")
+    assert snapshot["summary"] == summaries.rows["session-1"]["summary"]
+    assert [item["message"] for item in snapshot["messages"]] == ["hola", "¿en qué te ayudo?"]
+    assert reads.count("session-1") == 2  # la lectura inicial y la del refresco en segundo plano
@@ -0,0 +1,73 @@
+import time
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from broky.config import LangChainSettings
+from broky.llm import CassetteMissError, LLMClientFactory
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8},
+    }
+
+
+def _factory(tmp_path, mode: str, transport=None, retries: int = 0) -> LLMClientFactory:
+    settings = LangChainSettings(
+        OPENAI_API_KEY="sk-test",
+        LLM_HTTP2=False,
+        LLM_MAX_RETRIES=retries,
+        LLM_CASSETTE_MODE=mode,
+        LLM_CASSETTE_PATH=str(tmp_path / "cassette.jsonl.gz"),
+        LLM_CASSETTE_LATENCY="zero",
+    )
+    return LLMClientFactory(settings, transport=transport)
+
+
+def test_cassette_records_and_replays_offline(tmp_path):
+    replies = iter(["primera", "segunda", "rag"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=_completion(next(replies)))
+
+    recorder = _factory(tmp_path, "record", httpx.MockTransport(handler))
+    model = recorder.chat_model("response")
+    assert [model.invoke([HumanMessage(content="hola")]).content for _ in range(2)] == [
+        "primera",
+        "segunda",
+    ]
+    rag = recorder.openai_client()
+    rag.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+    recorder.close()
+
+    def offline(request: httpx.Request) -> httpx.Response:  # pragma: no cover - no debe llamarse
+        raise AssertionError("replay no debe salir a la red")
+
+    player = _factory(tmp_path, "replay", httpx.MockTransport(offline))
+    model = player.chat_model("response")
+    # Las repeticiones de una misma petición se sirven en el orden grabado.
+    assert [model.invoke([HumanMessage(content="hola")]).content for _ in range(3)] == [
+        "primera",
+        "segunda",
+        "segunda",
+    ]
+    assert player.stats()["response"]["input_tokens"] == 15
+
+    # Una petición sin grabar falla en el acto, sin reintentos ni abrir el circuito.
+    strict = _factory(tmp_path, "replay", httpx.MockTransport(offline), retries=3)
+    model = strict.chat_model("response")
+    started = time.perf_counter()
+    for _ in range(6):
+        with pytest.raises(CassetteMissError):
+            model.invoke([HumanMessage(content="nunca grabado")])
+    assert time.perf_counter() - started < 1.0
+    assert strict.circuit.snapshot()["state"] == "closed"
@@ -0,0 +1,106 @@
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from broky.config import LangChainSettings
+from broky.llm import CircuitBreaker, LLMCircuitOpenError, LLMClientFactory
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = _Clock()
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=10.0, clock=clock)
+    timeout = httpx.ReadTimeout("lento")
+
+    breaker.record_failure(timeout)
+    assert breaker.state == "closed"
+    breaker.record_failure(timeout)
+    assert breaker.state == "open"
+    assert breaker.rejecting
+    with pytest.raises(LLMCircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 11.0
+    assert not breaker.rejecting
+    assert breaker.allow()  # sonda semiabierta
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # solo una sonda a la vez
+    breaker.record_failure(timeout)
+    assert breaker.state == "open"
+
+    clock.now = 22.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["rejections"] == 2
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    breaker.record_failure(ValueError("json inválido"))
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_skips_openai_calls():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503, json={"error": {"message": "unavailable"}})
+
+    settings = LangChainSettings(
+        OPENAI_API_KEY="sk-test",
+        LLM_HTTP2=False,
+        LLM_MAX_RETRIES=0,
+        LLM_CIRCUIT_FAILURE_THRESHOLD=2,
+    )
+    factory = LLMClientFactory(settings, transport=httpx.MockTransport(handler))
+    handle = factory.chat_model("response", temperature=0.2)
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            handle.invoke([HumanMessage(content="hola")])
+    assert factory.circuit.state == "open"
+    assert not handle.available
+
+    with pytest.raises(LLMCircuitOpenError):
+        handle.invoke([HumanMessage(content="hola")])
+    assert len(calls) == 2
+    factory.close()
+
+
+def test_embeddings_outage_does_not_open_the_chat_circuit(monkeypatch):
+    from app.core.config import Settings
+    from app.services.rag import embeddings as embeddings_module
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/embeddings"):
+            return httpx.Response(503, json={"error": {"message": "unavailable"}})
+        return httpx.Response(500, json={"error": {"message": "boom"}})
+
+    settings = LangChainSettings(
+        OPENAI_API_KEY="sk-test",
+        LLM_HTTP2=False,
+        LLM_MAX_RETRIES=0,
+        LLM_CIRCUIT_FAILURE_THRESHOLD=2,
+    )
+    factory = LLMClientFactory(settings, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(embeddings_module, "get_llm_factory", lambda: factory)
+    embedder = embeddings_module.EmbeddingClient(
+        Settings(OPENAI_API_KEY="sk-test"), client=factory.openai_client(api_key="sk-test")
+    )
+
+    for _ in range(2):
+        with pytest.raises(embeddings_module.EmbeddingServiceError):
+            embedder.embed_query("hola")
+    assert factory.embeddings_circuit.state == "open"
+    assert factory.circuit.state == "closed"
+    assert factory.chat_model("response", temperature=0.2).available
+    factory.close()
@@ -0,0 +1,116 @@
+import json
+
+import httpx
+from langchain_core.messages import HumanMessage
+
+from broky.config import LangChainSettings, load_routing_table
+from broky.llm import LLMClientFactory, realtor_scope
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    }
+
+
+def test_chat_models_share_pool_and_record_stats():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        return httpx.Response(200, json=_completion('{"ok": true}'))
+
+    settings = LangChainSettings(OPENAI_API_KEY="sk-test", LLM_HTTP2=False)
+    factory = LLMClientFactory(settings, transport=httpx.MockTransport(handler))
+
+    master = factory.chat_model("master", temperature=0.2, json_mode=True)
+    response = factory.chat_model("response", temperature=0.2)
+
+    assert master is not None and response is not None
+    assert master.model_for().http_client is response.model_for().http_client
+
+    assert master.invoke([HumanMessage(content="hola")]).content == '{"ok": true}'
+    response.invoke([HumanMessage(content="hola")])
+
+    assert requests[0]["response_format"] == {"type": "json_object"}
+    assert "response_format" not in requests[1]
+    stats = factory.stats()
+    assert stats["master"]["requests"] == 1
+    assert stats["master"]["input_tokens"] == 5
+    assert stats["response"]["errors"] == 0
+
+    factory.close()
+
+
+def test_chat_model_without_api_key_returns_none():
+    factory = LLMClientFactory(LangChainSettings())
+
+    assert factory.chat_model("master") is None
+    assert factory.openai_client() is None
+
+
+def test_routing_table_applies_agent_route_and_realtor_override():
+    models = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        models.append((body["model"], body.get("max_completion_tokens", body.get("max_tokens"))))
+        return httpx.Response(200, json=_completion("ok"))
+
+    routing = load_routing_table(
+        json.dumps(
+            {
+                "agents": {"splitter": {"model": "gpt-4.1-nano", "max_tokens": 300}},
+                "realtors": {"r-1": {"splitter": {"model": "gpt-4o"}}},
+            }
+        )
+    )
+    settings = LangChainSettings(OPENAI_API_KEY="sk-test", LLM_HTTP2=False, LLM_ROUTING=routing)
+    factory = LLMClientFactory(settings, transport=httpx.MockTransport(handler))
+
+    splitter = factory.chat_model("splitter", temperature=0)
+    response = factory.chat_model("response")
+    splitter.invoke([HumanMessage(content="hola")])
+    response.invoke([HumanMessage(content="hola")])
+    with realtor_scope("r-1"):
+        splitter.invoke([HumanMessage(content="hola")])
+
+    assert models == [
+        ("gpt-4.1-nano", 300),
+        ("gpt-4o-mini", None),
+        ("gpt-4o", 300),
+    ]
+    factory.close()
+
+
+def test_handles_survive_close_and_reopen_of_the_pool():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=_completion("ok"))
+
+    settings = LangChainSettings(OPENAI_API_KEY="sk-test", LLM_HTTP2=False)
+    factory = LLMClientFactory(settings, transport=httpx.MockTransport(handler))
+    model = factory.chat_model("response")
+    raw = factory.openai_client()
+
+    assert model.invoke([HumanMessage(content="hola")]).content == "ok"
+    raw.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+    factory.close()
+
+    # Tras cerrar, los handles usan un pool nuevo en lugar del cliente cerrado.
+    assert model.invoke([HumanMessage(content="hola")]).content == "ok"
+    completion = raw.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+    assert completion.choices[0].message.content == "ok"
+    assert model.model_for().http_client is factory.http_client()
+    factory.close()
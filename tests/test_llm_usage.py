@@ -0,0 +1,103 @@
+import httpx
+from langchain_core.messages import HumanMessage
+
+from app.services.llm_usage_repository import rollup_usage_rows
+from broky.config import LangChainSettings
+from broky.llm import LLMClientFactory, usage_scope
+
+
+def _completion() -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+    }
+
+
+def test_usage_scope_collects_calls_per_agent_with_cost():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=_completion()))
+    factory = LLMClientFactory(LangChainSettings(OPENAI_API_KEY="sk-test", LLM_HTTP2=False), transport=transport)
+    master = factory.chat_model("master")
+    splitter = factory.chat_model("splitter")
+
+    with usage_scope(factory.pricing) as usage:
+        master.invoke([HumanMessage(content="hola")])
+        master.invoke([HumanMessage(content="hola")])
+        splitter.invoke([HumanMessage(content="hola")])
+    splitter.invoke([HumanMessage(content="fuera del turno")])
+
+    summary = usage.summary()
+    assert summary["calls"] == 3
+    assert summary["input_tokens"] == 3000
+    assert summary["agents"]["master"][:3] == [2, 2000, 1000]
+    # gpt-4o-mini: 0.15 USD / 1M input, 0.60 USD / 1M output
+    assert summary["cost_usd"] == round(3 * (1000 * 0.15 + 500 * 0.60) / 1_000_000, 6)
+    factory.close()
+
+
+def test_rollup_groups_by_day_and_agent():
+    rows = [
+        {"created_at": "2026-10-01T10:00:00+00:00", "agents": {"master": [1, 100, 20, 300.0, 0.001]}},
+        {"created_at": "2026-10-01T12:00:00+00:00", "agents": {"master": [1, 50, 10, 100.0, 0.0005], "rag": [1, 400, 80, 900.0, 0.002]}},
+        {"created_at": "2026-10-02T09:00:00+00:00", "agents": {"master": [2, 10, 5, 40.0, 0.0001]}},
+    ]
+
+    rollup = rollup_usage_rows(rows)
+
+    first = rollup["items"][0]
+    assert (first["day"], first["agent"], first["calls"], first["input_tokens"]) == ("2026-10-01", "master", 2, 150)
+    assert first["avg_latency_ms"] == 200.0
+    assert [(item["day"], item["agent"]) for item in rollup["items"]] == [
+        ("2026-10-01", "master"),
+        ("2026-10-01", "rag"),
+        ("2026-10-02", "master"),
+    ]
+    assert rollup["totals"]["turns"] == 3
+    assert rollup["totals"]["calls"] == 5
+
+
+def test_rollup_reads_every_page_past_the_max_rows_cap():
+    from datetime import datetime, timezone
+
+    from app.services.llm_usage_repository import LLMUsageRepository
+    from scripts.fakes import InMemorySupabase
+
+    repo = LLMUsageRepository(InMemorySupabase(max_rows=3))
+    usage = {"calls": 1, "input_tokens": 10, "output_tokens": 2, "agents": {"master": [1, 10, 2, 50.0, 0.0001]}}
+    for index in range(7):
+        repo.record_turn(session_id=f"s{index}", realtor_id="r1", usage=usage)
+    repo.record_turn(session_id="otro", realtor_id="r2", usage=usage)
+
+    rollup = repo.rollup("r1", datetime(2000, 1, 1, tzinfo=timezone.utc))
+
+    assert rollup["totals"]["turns"] == 7
+    assert rollup["totals"]["input_tokens"] == 70
+
+
+def test_rollup_raises_when_a_later_page_fails():
+    from datetime import datetime, timezone
+
+    import pytest
+
+    from app.services.llm_usage_repository import LLMUsageReadError, LLMUsageRepository
+    from scripts.fakes import InMemorySupabase
+
+    client = InMemorySupabase(max_rows=2)
+    repo = LLMUsageRepository(client)
+    usage = {"calls": 1, "agents": {"master": [1, 10, 2, 50.0, 0.0001]}}
+    for index in range(5):
+        repo.record_turn(session_id=f"s{index}", realtor_id="r1", usage=usage)
+
+    pages = []
+
+    def fail_second_page():
+        pages.append(1)
+        if len(pages) == 2:
+            raise RuntimeError("supabase caído")
+
+    client.before_execute = fail_second_page
+    with pytest.raises(LLMUsageReadError):
+        repo.rollup("r1", datetime(2000, 1, 1, tzinfo=timezone.utc))
@@ -33,3 +33,115 @@ def test_response_agent_history_uses_last_messages():
 
     assert len(trimmed) == ResponseAgentExecutor.MAX_HISTORY_MESSAGES
     assert [item["message"] for item in trimmed] == [f"turn-{i}" for i in range(7, 13)]
+
+
+def test_history_cache_serves_appends_locally_and_reconciles_when_stale():
+    from app.services.chat_history_repository import ChatHistoryRepository
+    from broky.memory import HistoryCache
+    from scripts.fakes import InMemorySupabase
+
+    class _Clock:
+        now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    client = InMemorySupabase()
+    repo = ChatHistoryRepository(client)
+    fetches = []
+    original_fetch = repo.fetch_history
+    repo.fetch_history = lambda session_id, limit=30: fetches.append(session_id) or original_fetch(session_id, limit)  # type: ignore[method-assign]
+
+    clock = _Clock()
+    memory = SupabaseConversationMemory(repo, cache=HistoryCache(stale_after=10.0, clock=clock))
+
+    assert memory.load("s1") == []
+    memory.append(session_id="s1", user_message="hola", assistant_message="¿En qué te ayudo?")
+    history = memory.load("s1")
+    assert [item["message"] for item in history] == ["hola", "¿En qué te ayudo?"]
+    assert [item["id"] for item in history] == [1, 2]
+    assert fetches == ["s1"]
+
+    # Otro worker escribe en la misma sesión; se ve tras la ventana de vigencia.
+    ChatHistoryRepository(client).append_message(session_id="s1", sender_role="user", message="otro worker")
+    assert len(memory.load("s1")) == 2
+    clock.now = 11.0
+    assert [item["message"] for item in memory.load("s1")] == ["hola", "¿En qué te ayudo?", "otro worker"]
+    assert fetches == ["s1"]  # la reconciliación es incremental (fetch_history_after)
+    assert len(memory.load("s1")) == 3
+
+
+def test_fetch_history_returns_latest_messages_in_order():
+    from app.services.chat_history_repository import ChatHistoryRepository
+    from scripts.fakes import InMemorySupabase
+
+    repo = ChatHistoryRepository(InMemorySupabase())
+    repo.append_messages(
+        [{"session_id": "s1", "sender_role": "user", "message": f"m{index}"} for index in range(1, 41)]
+    )
+
+    latest = repo.fetch_history("s1", limit=30)
+    assert [item["message"] for item in latest] == [f"m{index}" for index in range(11, 41)]
+    after = repo.fetch_history_after("s1", latest[-3]["id"])
+    assert [item["message"] for item in after] == ["m39", "m40"]
+
+
+def test_turn_is_written_in_one_bulk_insert_and_write_behind_flushes_before_reads():
+    from app.services.chat_history_repository import ChatHistoryRepository
+    from broky.memory import HistoryWriteBehind
+    from scripts.fakes import InMemorySupabase
+
+    client = InMemorySupabase()
+    repo = ChatHistoryRepository(client)
+    inserts = []
+    original_append = repo.append_messages
+    repo.append_messages = lambda records: inserts.append(len(records)) or original_append(records)  # type: ignore[method-assign]
+
+    memory = SupabaseConversationMemory(repo)
+    memory.append(session_id="s1", user_message="hola", assistant_message="hola!", metadata={"intents": []})
+    assert inserts == [2]
+
+    writer = HistoryWriteBehind(repo, max_batch=100, flush_interval=60.0)
+    buffered = SupabaseConversationMemory(repo, writer=writer)
+    try:
+        buffered.append(session_id="s2", user_message="uno", assistant_message="dos")
+        buffered.append(session_id="s3", user_message="tres", assistant_message="cuatro")
+        assert writer.pending() == 4 and inserts == [2]
+
+        # Leer una sesión inserta antes sus mensajes pendientes.
+        assert [item["message"] for item in buffered.load("s2")] == ["uno", "dos"]
+        assert inserts == [2, 2] and writer.pending() == 2
+    finally:
+        writer.close()
+    assert inserts == [2, 2, 2] and writer.pending() == 0
+
+
+def test_history_rows_keep_prompt_fields_and_move_diagnostics_out():
+    import json
+
+    from app.services.chat_history_repository import ChatHistoryRepository
+    from scripts.fakes import InMemorySupabase
+    from scripts.migrate_history_v2 import migrate_row
+
+    metadata = {
+        "intents": ["buscar_proyecto"],
+        "filters": {"comuna": "Ñuñoa"},
+        "subagents": {"filter_rag": {"context": "proyecto " * 200, "sources": [{"project_id": "p1"}]}},
+        "postprocess": {"split_messages": ["Hola", "¿Te ayudo?"]},
+    }
+    client = InMemorySupabase()
+    client.table("chats_history_n8n").insert(
+        {"session_id": "s1", "message": json.dumps({"type": "ai", "content": "Hola", "metadata": metadata})}
+    ).execute()
+    repo = ChatHistoryRepository(client)
+    repo.append_message(session_id="s1", sender_role="assistant", message="Hola", metadata=metadata)
+
+    legacy, compact = repo.fetch_history("s1")
+    assert legacy["raw_message"] == compact["raw_message"]
+    assert compact["raw_message"]["metadata"] == {"intents": ["buscar_proyecto"], "filters": {"comuna": "Ñuñoa"}}
+    assert "subagents" not in client.store.rows("chats_history_n8n")[1]["message"]
+
+    message, diagnostics = migrate_row(client.store.rows("chats_history_n8n")[0])
+    assert set(diagnostics) == {"subagents", "postprocess"}
+    assert json.loads(message)["metadata"]["turn"] == "legacy-1"
+    assert migrate_row({"id": 2, "message": message}) is None
@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import instrument_repository, metrics_context, timed_stage
+from app.main import app
+
+
+@instrument_repository("dummy")
+class _DummyRepository:
+    def fetch(self, value):
+        return value
+
+    def _private(self):
+        return None
+
+
+def test_spans_are_exported_per_stage_and_realtor():
+    with metrics_context(session_id="56911111111", realtor_id="realtor-metrics"):
+        with timed_stage("test.stage"):
+            pass
+        assert _DummyRepository().fetch(3) == 3
+
+    body = TestClient(app).get("/metrics").text
+
+    assert 'broky_stage_latency_seconds_count{realtor="realtor-metrics",stage="test.stage"} 1.0' in body
+    assert 'stage="repo.dummy.fetch"' in body
+    assert "repo.dummy._private" not in body
+    assert (
+        'broky_stage_latency_quantile_seconds{quantile="0.95",realtor="realtor-metrics",stage="test.stage"}'
+        in body
+    )
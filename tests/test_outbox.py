@@ -0,0 +1,126 @@
+from app.services.chat_history_repository import ChatHistoryRepository
+from broky.memory import SupabaseConversationMemory
+from broky.outbox import FOLLOWUP_OP, Outbox, OutboxHistoryWriter, SQLiteOutboxStore, register_default_handlers
+from broky.processes import plan_prospect_followup
+from scripts.fakes import InMemorySupabase
+
+
+def test_outbox_survives_restart_and_applies_with_retries(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    first = Outbox(SQLiteOutboxStore(path), start=False)
+    first.register("demo", lambda payload: None)
+    first.enqueue("demo", {"n": 1})
+    first.enqueue("demo", {"n": 2})
+
+    # Otro proceso (reinicio) retoma lo pendiente.
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload["n"])
+        if len(calls) == 1:
+            raise ConnectionError("supabase caído")
+
+    second = Outbox(SQLiteOutboxStore(path), start=False, base_backoff=0.0, max_attempts=2)
+    second.register("demo", flaky)
+    assert second.pending() == 2
+    assert second.flush() == 1
+    assert second.flush() == 1
+    assert calls == [1, 2, 1]
+    stats = second.stats()
+    assert stats["depth"] == 0 and stats["retries_total"] == 1 and stats["applied_total"] == 2
+
+    second.register("demo", lambda payload: (_ for _ in ()).throw(RuntimeError("siempre")))
+    second.enqueue("demo", {"n": 3})
+    second.flush()
+    second.flush()
+    assert second.stats()["dead"] == {"demo": 1}
+
+
+def test_history_and_followups_are_applied_from_the_outbox():
+    client = InMemorySupabase()
+    outbox = Outbox(SQLiteOutboxStore(":memory:"), start=False)
+    register_default_handlers(outbox, client)
+    repo = ChatHistoryRepository(client)
+    memory = SupabaseConversationMemory(repo, writer=OutboxHistoryWriter(outbox, repo))
+
+    memory.append(session_id="s1", user_message="hola", assistant_message="¿En qué te ayudo?")
+    memory.append(session_id="s2", user_message="otra", assistant_message="respuesta")
+    plan = plan_prospect_followup(
+        {
+            "prospect_id": "p1",
+            "realtor_id": "r1",
+            "followup_configuration": {"Order_followup": "1", "Range": 2, "Type_range": "days"},
+        }
+    )
+    outbox.enqueue(FOLLOWUP_OP, plan, key="p1")
+    assert client.store.rows("chats_history_n8n") == [] and outbox.pending() == 3
+
+    # Leer la sesión aplica antes sus mensajes pendientes.
+    assert [item["message"] for item in memory.load("s1")] == ["hola", "¿En qué te ayudo?"]
+    assert outbox.flush() == 2
+    assert len(client.store.rows("chats_history_n8n")) == 4
+    assert client.store.rows("followups")[0]["type"] == "prospect"
+
+
+def test_entries_with_the_same_key_are_never_overtaken():
+    import time
+
+    outbox = Outbox(SQLiteOutboxStore(":memory:"), start=False, base_backoff=0.05)
+    applied = []
+    failures = {"plan-1": 1}
+
+    def schedule(payload):
+        if failures.get(payload["plan"], 0) > 0:
+            failures[payload["plan"]] -= 1
+            raise ConnectionError("supabase caído")
+        applied.append(payload["plan"])
+
+    outbox.register("demo", schedule)
+    outbox.enqueue("demo", {"plan": "plan-1"}, key="p1")
+    outbox.enqueue("demo", {"plan": "otro"}, key="p2")
+    assert outbox.flush() == 1
+
+    # El plan nuevo de p1 espera a que el anterior, en backoff, se aplique.
+    outbox.enqueue("demo", {"plan": "plan-2"}, key="p1")
+    assert outbox.flush() == 0 and applied == ["otro"]
+    time.sleep(0.06)
+    assert outbox.flush() == 2
+    assert applied == ["otro", "plan-1", "plan-2"]
+
+
+def test_a_failing_key_does_not_hold_back_the_rest_of_a_batch():
+    outbox = Outbox(SQLiteOutboxStore(":memory:"), start=False)
+    inserted = []
+
+    def insert(payloads):
+        if any(payload["session"] == "rota" for payload in payloads):
+            raise ValueError("fila rechazada")
+        inserted.extend(payload["session"] for payload in payloads)
+
+    outbox.register("rows", insert, batch=True)
+    for session in ("s1", "rota", "s2", "s1"):
+        outbox.enqueue("rows", {"session": session}, key=session)
+
+    assert outbox.flush() == 3
+    assert inserted == ["s1", "s1", "s2"]
+    assert outbox.pending() == 1
+
+
+def test_reading_history_during_an_outage_does_not_bury_pending_rows():
+    client = InMemorySupabase()
+    outbox = Outbox(SQLiteOutboxStore(":memory:"), start=False, max_attempts=3)
+    register_default_handlers(outbox, client)
+    repo = ChatHistoryRepository(client)
+    memory = SupabaseConversationMemory(repo, writer=OutboxHistoryWriter(outbox, repo))
+    memory.append(session_id="s1", user_message="hola", assistant_message="¿En qué te ayudo?")
+
+    def outage():
+        raise ConnectionError("supabase caído")
+
+    client.before_execute = outage
+    for _ in range(10):
+        memory.load("s1")
+
+    # Solo la primera lectura intenta aplicar; las demás respetan el backoff.
+    assert outbox.pending() == 1
+    assert outbox.stats()["dead"] == {} and outbox.stats()["retries_total"] == 1
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core.config import Settings
+from app.core.metrics import REGISTRY
+from app.services.rag import RAGService, SemanticAnswerCache, VectorSearchResult, VectorSearchServiceError
+from scripts.fakes import fake_embedding
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _HashEmbedder:
+    model = "fake-embeddings"
+
+    def embed_query(self, text):
+        return np.asarray(fake_embedding(text), dtype=np.float32)
+
+
+class _CatalogVectorClient:
+    def __init__(self):
+        self.content = "Torre Quilmes, entrega en marzo de 2027."
+
+    def search(self, **kwargs):
+        metadata = {"project_name": "Torre Quilmes"}
+        return [VectorSearchResult(project_id="p1", score=0.9, metadata=metadata, content=self.content)]
+
+    async def asearch(self, **kwargs):
+        return self.search(**kwargs)
+
+
+class _CountingLLM:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f"Respuesta {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _count(result):
+    return REGISTRY.get_sample_value("broky_cache_requests_total", {"cache": "rag.answer", "result": result}) or 0.0
+
+
+def test_repeated_questions_are_served_without_a_completion():
+    clock = _Clock()
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=2, clock=clock)
+    vector = _CatalogVectorClient()
+    llm = _CountingLLM()
+    service = RAGService(
+        Settings(OPENAI_API_KEY="x"),
+        vector_client=vector,
+        llm_client=llm,
+        embedder=_HashEmbedder(),
+        answer_cache=cache,
+    )
+
+    def ask(question):
+        return service.answer_query(message=question, realtor_id="r1")
+
+    hits_before = _count("hit")
+    assert ask("¿Cuándo entregan Torre Quilmes?")["response"] == "Respuesta 1"
+    repeated = ask("cuando entregan torre quilmes")
+    assert repeated["response"] == "Respuesta 1" and repeated["cached"] is True
+    assert asyncio.run(service.aanswer_query(message="¿Cuándo entregan Torre Quilmes?", realtor_id="r1"))["cached"]
+    assert llm.calls == 1 and _count("hit") == hits_before + 2
+
+    # Otra pregunta del mismo realtor, o la misma para otro realtor, no comparten respuesta.
+    assert ask("¿Tienen estacionamiento?")["response"] == "Respuesta 2"
+    assert service.answer_query(message="¿Cuándo entregan Torre Quilmes?", realtor_id="r2")["response"] == "Respuesta 3"
+
+    # El catálogo cambió: el contexto recuperado es otro y la respuesta se regenera.
+    stale_before = _count("stale")
+    vector.content = "Torre Quilmes, entrega inmediata."
+    assert ask("¿Cuándo entregan Torre Quilmes?")["response"] == "Respuesta 4"
+    assert _count("stale") == stale_before + 1
+    assert cache.size("r1") == 2  # máximo 2 por realtor: se descartó la menos usada
+
+    clock.now = 61
+    assert ask("¿Cuándo entregan Torre Quilmes?")["response"] == "Respuesta 5"
+    assert cache.invalidate_realtor("r1") == 1 and cache.size("r1") == 0
+
+
+class _SlowEmbedder(_HashEmbedder):
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        self.release.wait(5)
+        return super().embed_query(text)
+
+
+def test_follow_up_questions_skip_the_answer_cache():
+    llm = _CountingLLM()
+    embedder = _SlowEmbedder()
+    service = RAGService(
+        Settings(OPENAI_API_KEY="x"),
+        vector_client=_CatalogVectorClient(),
+        llm_client=llm,
+        embedder=embedder,
+        answer_cache=SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=2),
+    )
+    history = [{"role": "user", "content": "Busco algo en Quilmes"}]
+
+    for _ in range(2):
+        result = service.answer_query(message="¿Y cuándo entregan?", realtor_id="r1", history=history)
+        assert "cached" not in result
+    assert llm.calls == 2 and embedder.calls == 0
+
+
+def test_slow_embedding_does_not_hold_the_reply():
+    class _DownVectorClient:
+        def search(self, **kwargs):
+            raise VectorSearchServiceError("caído")
+
+    embedder = _SlowEmbedder()
+    llm = _CountingLLM()
+    settings = Settings(OPENAI_API_KEY="x", RAG_ANSWER_CACHE_WAIT_MS=20)
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=2)
+
+    def service(vector_client):
+        return RAGService(
+            settings, vector_client=vector_client, llm_client=llm, embedder=embedder, answer_cache=cache
+        )
+
+    started = time.perf_counter()
+    failed = service(_DownVectorClient()).answer_query(message="¿Cuándo entregan?", realtor_id="r1")
+    assert failed["response"] == settings.rag_failure_reply and llm.calls == 0
+
+    # El embedding no llega a tiempo: se responde sin consultar la caché.
+    reply = service(_CatalogVectorClient()).answer_query(message="¿Cuándo entregan?", realtor_id="r1")
+    assert reply["response"] == "Respuesta 1"
+    assert time.perf_counter() - started < 2
+    embedder.release.set()
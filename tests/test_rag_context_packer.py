@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from app.core.config import Settings
+from app.services.rag import RAGService, VectorSearchResult, pack_rag_context
+from app.services.rag.tokens import count_tokens
+
+QUILMES = {"project_name": "Torre Quilmes", "location": "Quilmes", "type": "departamentos", "price": "85000 USD"}
+
+
+def _chunk(project_id, score, metadata, content):
+    return VectorSearchResult(project_id=project_id, score=score, metadata=metadata, content=content)
+
+
+def test_packer_merges_chunks_and_respects_the_token_budget():
+    results = [
+        _chunk("p1", 0.8, QUILMES, "Torre Quilmes\ndepartamentos\nCon cochera. Entrega en 2027."),
+        _chunk("p1", 0.9, QUILMES, "Torre Quilmes\nPrecios: 85000 USD\nDepartamentos de 2 dormitorios. Con cochera."),
+    ] + [
+        _chunk(f"p{index}", 0.5 - index / 100, {"project_name": f"Proyecto {index}"}, "Lofts con terraza y amenities. " * 20)
+        for index in range(2, 12)
+    ]
+
+    unbounded = pack_rag_context(results, max_tokens=0)
+    assert len(unbounded.projects) == 11 and unbounded.omitted == 0
+    first = unbounded.projects[0]
+    assert first.project_id == "p1" and first.score == 0.9
+    assert first.summary == "Torre Quilmes | Quilmes | departamentos | desde 85000 USD"
+    assert first.details == ["Departamentos de 2 dormitorios.", "Con cochera.", "Entrega en 2027."]
+    assert unbounded.text.count("Torre Quilmes") == 1
+
+    packed = pack_rag_context(results, max_tokens=80)
+    assert packed.tokens <= 80 and packed.omitted > 0
+    assert [source["project_id"] for source in packed.sources][:2] == ["p1", "p2"]
+    assert packed.tokens == count_tokens(packed.text)
+
+
+def test_rag_prompt_uses_the_packed_context():
+    captured = {}
+
+    class _Completions:
+        def create(self, **kwargs):
+            captured.update(kwargs)
+            message = SimpleNamespace(content="Torre Quilmes tiene departamentos de 2 dormitorios.")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    class _VectorClient:
+        def search(self, **kwargs):
+            return [
+                _chunk("p1", 0.9, QUILMES, "Departamentos de 2 dormitorios."),
+                _chunk("p1", 0.85, QUILMES, "Departamentos de 2 dormitorios. Con cochera."),
+            ]
+
+    service = RAGService(
+        Settings(OPENAI_API_KEY="x", RAG_CONTEXT_MAX_TOKENS=200),
+        vector_client=_VectorClient(),
+        llm_client=SimpleNamespace(chat=SimpleNamespace(completions=_Completions())),
+    )
+    answer = service.answer_query(message="¿Qué hay en Quilmes?", realtor_id="r1")
+    system_prompt = captured["messages"][0]["content"]
+    assert "Proyecto #1: Torre Quilmes | Quilmes" in system_prompt
+    assert system_prompt.count("Departamentos de 2 dormitorios.") == 1
+    assert answer["sources"] == [{"project_id": "p1", "name": "Torre Quilmes", "score": 0.9}]
+    assert 0 < answer["context_tokens"] <= 200
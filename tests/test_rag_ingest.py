@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from app.services.project_repository import ProjectRepository
+from app.services.rag import LocalVectorIndex
+from app.services.rag.ingest import (
+    CatalogIngestor,
+    IngestCheckpoint,
+    LocalChunkStore,
+    SupabaseChunkStore,
+    project_chunks,
+    split_text,
+)
+from scripts.fakes import InMemorySupabase, fake_embedding
+
+
+def _project(index, description):
+    return {
+        "id": f"p{index:03d}",
+        "realtor_id": "r1",
+        "is_active": True,
+        "name_property": f"Torre {index}",
+        "location": "Quilmes",
+        "type": "departamentos",
+        "description": description,
+    }
+
+
+class _CountingEmbedder:
+    model = "fake-embeddings"
+
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return np.asarray([fake_embedding(text) for text in texts], dtype=np.float32)
+
+
+def test_split_text_packs_sentences_with_overlap():
+    text = "Primera oración del proyecto. Segunda oración algo más larga que la anterior! Tercera; cuarta parte."
+    pieces = split_text(text, max_chars=60, overlap=30)
+    assert pieces == [
+        "Primera oración del proyecto.",
+        "Segunda oración algo más larga que la anterior! Tercera;",
+        "Tercera; cuarta parte.",
+    ]
+    chunks = project_chunks(_project(1, text), model="m", max_chars=60, overlap=30)
+    assert [chunk.id for chunk in chunks] == ["p001#0", "p001#1", "p001#2"]
+    assert all(chunk.content.startswith("Torre 1\ndepartamentos\nQuilmes") for chunk in chunks)
+    assert project_chunks(_project(1, text), model="otro", max_chars=60, overlap=30)[0].content_hash != chunks[0].content_hash
+
+
+def test_ingestion_skips_unchanged_chunks_and_deletes_removed_projects():
+    client = InMemorySupabase()
+    client.store.seed("projects", [_project(index, f"Departamentos de {index} dormitorios.") for index in range(5)])
+    store = SupabaseChunkStore(client, "vector_projects", write_batch=2)
+    embedder = _CountingEmbedder()
+    ingestor = CatalogIngestor(ProjectRepository(client).catalog_page, embedder, store, page_size=2, batch_size=2)
+
+    stats = ingestor.run(["r1"])
+    assert (stats.projects, stats.embedded, stats.skipped) == (5, 5, 0)
+    rows = client.store.rows("vector_projects")
+    assert len(rows) == 5 and len(rows[0]["embedding"]) == 64
+
+    client.store.update("projects", {"description": "Ahora con piscina."}, filters=[("eq", "id", "p002")])
+    client.store.update("projects", {"is_active": False}, filters=[("eq", "id", "p004")])
+    embedder.texts.clear()
+    stats = ingestor.run(["r1"])
+    assert (stats.embedded, stats.skipped, stats.deleted) == (1, 3, 1)
+    assert len(embedder.texts) == 1 and "piscina" in embedder.texts[0]
+    assert sorted(row["id"] for row in client.store.rows("vector_projects")) == ["p000#0", "p001#0", "p002#0", "p003#0"]
+    assert stats.as_dict()["chunks_per_s"] > 0
+
+
+def test_interrupted_ingestion_resumes_from_the_checkpoint(tmp_path):
+    client = InMemorySupabase()
+    client.store.seed("projects", [_project(index, "Lofts con terraza.") for index in range(6)])
+    repository = ProjectRepository(client)
+    calls = []
+
+    def flaky_pager(realtor_id, *, after=None, limit):
+        calls.append(after)
+        if len(calls) == 2:
+            raise RuntimeError("corte de red")
+        return repository.catalog_page(realtor_id, after=after, limit=limit)
+
+    index = LocalVectorIndex(tmp_path / "index")
+    checkpoint_path = tmp_path / "checkpoint.json"
+    embedder = _CountingEmbedder()
+
+    def ingestor(pager):
+        return CatalogIngestor(
+            pager, embedder, LocalChunkStore(index), checkpoint=IngestCheckpoint(checkpoint_path), page_size=3
+        )
+
+    with pytest.raises(RuntimeError):
+        ingestor(flaky_pager).run(["r1"])
+    assert index.size("r1") == 3 and checkpoint_path.exists()
+
+    stats = ingestor(flaky_pager).run(["r1"])
+    assert calls[2] == "p002"
+    assert (stats.projects, stats.embedded, stats.deleted) == (3, 3, 0)
+    assert len(embedder.texts) == 6 and index.size("r1") == 6
+    assert not checkpoint_path.exists()
+    hits = index.search("r1", fake_embedding("Torre 5 lofts con terraza"), limit=1, threshold=0.0)
+    assert hits[0].project_id == "p005" and hits[0].metadata["chunk"] == 0
+
+
+def test_ingestion_replaces_a_per_project_local_index(tmp_path):
+    from app.services.rag import build_realtor_index
+
+    client = InMemorySupabase()
+    projects = [_project(index, "Lofts con terraza.") for index in range(3)]
+    client.store.seed("projects", projects)
+    index = LocalVectorIndex(tmp_path)
+
+    # Índice del formato anterior: una entrada por proyecto, sin id de chunk.
+    build_realtor_index(projects, realtor_id="r1", embedder=_CountingEmbedder(), index=index)
+    client.store.update("projects", {"is_active": False}, filters=[("eq", "id", "p002")])
+
+    ingestor = CatalogIngestor(ProjectRepository(client).catalog_page, _CountingEmbedder(), LocalChunkStore(index))
+    stats = ingestor.run(["r1"])
+
+    assert (stats.embedded, stats.deleted) == (2, 3)
+    assert index.size("r1") == 2
+    hits = index.search("r1", fake_embedding("Torre 2 lofts con terraza"), limit=5, threshold=-1.0)
+    assert sorted(hit.project_id for hit in hits) == ["p000", "p001"]
@@ -0,0 +1,74 @@
+from app.core.config import Settings
+from app.services.rag import LexicalIndex, RAGService, VectorSearchResult, VectorSearchServiceError, fuse_results
+
+CATALOG = [
+    {
+        "id": "p-quilmes",
+        "name_property": "Torre Quilmes",
+        "location": "Quilmes",
+        "type": "departamentos",
+        "description": "Departamentos de 2 dormitorios con balcón",
+    },
+    {
+        "id": "p-palermo",
+        "name_property": "Palermo Green",
+        "location": "Palermo",
+        "type": "lofts",
+        "description": "Lofts de 1 dormitorio con terraza",
+    },
+    {
+        "id": "p-nunoa",
+        "name_property": "Altos de Ñuñoa",
+        "location": "Ñuñoa",
+        "type": "departamentos",
+        "description": "Departamentos de 3 dormitorios",
+    },
+]
+
+
+def test_bm25_ranks_literal_queries_and_updates_incrementally():
+    loads = []
+
+    def loader(realtor_id):
+        loads.append(realtor_id)
+        return CATALOG
+
+    index = LexicalIndex(loader)
+    hits = index.search("r1", "departamentos de 2 dormitorios en Quilmes", limit=2)
+    assert [hit.project_id for hit in hits] == ["p-quilmes", "p-nunoa"]
+    assert index.search("r1", "altos de nunoa", limit=1)[0].project_id == "p-nunoa"
+    assert loads == ["r1"]
+
+    changed = dict(CATALOG[1], description="Lofts con piscina en Palermo")
+    assert index.sync_catalog("r1", [CATALOG[0], changed]) == (1, 1)
+    assert index.size("r1") == 2
+    assert index.search("r1", "piscina", limit=3)[0].project_id == "p-palermo"
+    assert index.search("r1", "nunoa", limit=3) == []
+
+    index.invalidate("r1")
+    index.search("r1", "quilmes", limit=1)
+    assert loads == ["r1", "r1"] and index.size("r1") == 3
+
+
+def test_hybrid_mode_fuses_vector_and_lexical_scores():
+    dense = [
+        VectorSearchResult(project_id="p-palermo", score=0.82, metadata={}, content="remoto"),
+        VectorSearchResult(project_id="p-quilmes", score=0.80, metadata={}, content="remoto"),
+    ]
+    lexical = [VectorSearchResult(project_id="p-quilmes", score=7.5, metadata={}, content="bm25")]
+    fused = fuse_results(dense, lexical, alpha=0.5, limit=5)
+    assert [item.project_id for item in fused] == ["p-quilmes", "p-palermo"]
+    assert fused[0].content == "remoto"
+
+    class _DownVectorClient:
+        def search(self, **kwargs):
+            raise VectorSearchServiceError("caído")
+
+    service = RAGService(
+        Settings(OPENAI_API_KEY="x", RAG_LEXICAL_MODE="fallback"),
+        vector_client=_DownVectorClient(),
+        llm_client=object(),
+        lexical_index=LexicalIndex(lambda realtor_id: CATALOG),
+    )
+    results, failed = service._search_context(query="lofts en Palermo", realtor_id="r1", limit=None, threshold=None)
+    assert not failed and results[0].project_id == "p-palermo" and results[0].score == 1.0
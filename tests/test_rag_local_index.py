@@ -0,0 +1,112 @@
+import numpy as np
+
+from app.core.config import Settings
+from app.services.rag import LocalVectorIndex, RAGService, VectorSearchServiceError, build_realtor_index
+from scripts.fakes import fake_embedding
+
+PROJECTS = [
+    {
+        "id": "p-quilmes",
+        "realtor_id": "r1",
+        "name_property": "Torre Quilmes",
+        "location": "Quilmes, Buenos Aires",
+        "type": "departamentos",
+        "status": "en construcción",
+        "prices": {"desde": 85000},
+        "currency": "USD",
+        "description": "Departamentos de 2 dormitorios con cochera",
+    },
+    {
+        "id": "p-palermo",
+        "realtor_id": "r1",
+        "name_property": "Palermo Green",
+        "location": "Palermo, CABA",
+        "type": "lofts",
+        "status": "entrega inmediata",
+        "description": "Lofts con terraza y amenities",
+    },
+]
+
+
+class _HashEmbedder:
+    model = "fake-embeddings"
+
+    def embed(self, texts):
+        return np.asarray([fake_embedding(text) for text in texts], dtype=np.float32)
+
+    def embed_query(self, text):
+        return self.embed([text])[0]
+
+
+class _DownVectorClient:
+    def search(self, **kwargs):
+        raise VectorSearchServiceError("caído")
+
+
+def test_local_index_serves_rag_when_the_vector_service_is_down(tmp_path):
+    index = LocalVectorIndex(tmp_path)
+    assert build_realtor_index(PROJECTS, realtor_id="r1", embedder=_HashEmbedder(), index=index) == 2
+    assert index.size("r1") == 2 and index.size("r2") is None
+
+    # Otro proceso abre los mismos archivos (memmap).
+    reopened = LocalVectorIndex(tmp_path)
+    hits = reopened.search("r1", _HashEmbedder().embed_query("departamentos en quilmes"), limit=1, threshold=0.0)
+    assert [hit.project_id for hit in hits] == ["p-quilmes"]
+    assert hits[0].metadata["project_name"] == "Torre Quilmes" and hits[0].metadata["price"]
+
+    settings = Settings(OPENAI_API_KEY="x", RAG_LOCAL_INDEX_MODE="fallback", RAG_LOCAL_INDEX_THRESHOLD=0.1)
+    service = RAGService(
+        settings,
+        vector_client=_DownVectorClient(),
+        llm_client=object(),
+        local_index=reopened,
+        embedder=_HashEmbedder(),
+    )
+    results, failed = service._search_context(query="lofts en Palermo", realtor_id="r1", limit=None, threshold=None)
+    assert not failed and results[0].project_id == "p-palermo"
+
+    # Sin índice para el realtor se mantiene la respuesta de fallo.
+    assert service._search_context(query="lofts", realtor_id="r2", limit=None, threshold=None) == ([], True)
+
+
+class _RolledEmbedder(_HashEmbedder):
+    """Otro "modelo": mismas dimensiones, espacio distinto."""
+
+    model = "fake-embeddings-v2"
+
+    def embed(self, texts):
+        return np.roll(super().embed(texts), 1, axis=1)
+
+
+def test_each_realtor_index_is_queried_with_its_own_model(tmp_path, monkeypatch):
+    from app.services.rag import service as service_module
+
+    index = LocalVectorIndex(tmp_path)
+    build_realtor_index(PROJECTS, realtor_id="r1", embedder=_HashEmbedder(), index=index)
+    r2_projects = [dict(project, realtor_id="r2") for project in PROJECTS]
+    build_realtor_index(r2_projects, realtor_id="r2", embedder=_RolledEmbedder(), index=index)
+    built = {}
+
+    def embedding_client(settings, *, client=None, model=None):
+        assert model == _RolledEmbedder.model
+        built[model] = _RolledEmbedder()
+        return built[model]
+
+    monkeypatch.setattr(service_module, "EmbeddingClient", embedding_client)
+    settings = Settings(OPENAI_API_KEY="x", RAG_LOCAL_INDEX_MODE="fallback", RAG_LOCAL_INDEX_THRESHOLD=0.1)
+    service = RAGService(
+        settings,
+        vector_client=_DownVectorClient(),
+        llm_client=object(),
+        local_index=index,
+        embedder=_HashEmbedder(),
+    )
+
+    # La caché de respuestas pide primero el embedder por defecto; no fija el de los índices.
+    assert service._get_embedder().model == "fake-embeddings"
+    for realtor_id in ("r2", "r1", "r2"):
+        results, failed = service._search_context(
+            query="lofts en Palermo", realtor_id=realtor_id, limit=None, threshold=None
+        )
+        assert not failed and results[0].project_id == "p-palermo"
+    assert list(built) == [_RolledEmbedder.model]
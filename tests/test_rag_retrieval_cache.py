@@ -0,0 +1,67 @@
+from app.core.config import Settings
+from app.core.metrics import REGISTRY
+from app.services.rag import RAGService, RetrievalCache, VectorSearchResult
+
+
+class _CountingVectorClient:
+    def __init__(self):
+        self.queries = []
+
+    def search(self, *, query, realtor_id, limit=None, threshold=None, cancel=None):
+        self.queries.append((realtor_id, query))
+        return [VectorSearchResult(project_id="p1", score=0.9, metadata={}, content=query)]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _hits():
+    return REGISTRY.get_sample_value("broky_cache_requests_total", {"cache": "rag.retrieval", "result": "hit"}) or 0.0
+
+
+def test_near_identical_questions_share_the_cached_retrieval():
+    clock = _Clock()
+    vector = _CountingVectorClient()
+    service = RAGService(
+        Settings(OPENAI_API_KEY="x"),
+        vector_client=vector,
+        llm_client=object(),
+        retrieval_cache=RetrievalCache(ttl=60, clock=clock),
+    )
+    hits_before = _hits()
+
+    def search(query, realtor_id="r1"):
+        results, failed = service._search_context(query=query, realtor_id=realtor_id, limit=None, threshold=None)
+        assert not failed
+        return results
+
+    first = search("¿Qué proyectos tienen en Quilmes?")
+    assert search("que proyectos tienen en quilmes") == first
+    search("¿Qué proyectos tienen en Quilmes?", realtor_id="r2")
+    assert len(vector.queries) == 2 and _hits() == hits_before + 1
+
+    service._retrieval_cache.invalidate_realtor("r1")
+    search("proyectos en Quilmes")
+    assert len(vector.queries) == 3
+
+    clock.now = 61
+    search("proyectos en Quilmes")
+    assert len(vector.queries) == 4
+
+
+def test_retrieval_cache_is_a_bounded_lru():
+    cache = RetrievalCache(max_entries=2)
+    result = [VectorSearchResult(project_id="p1", score=1.0, metadata={}, content="")]
+    cache.put(("r1", "a", 5, 0.7), result)
+    cache.put(("r1", "b", 5, 0.7), result)
+    assert cache.get(("r1", "a", 5, 0.7)) == result
+    cache.put(("r1", "c", 5, 0.7), [])
+
+    assert cache.get(("r1", "b", 5, 0.7)) is None
+    assert cache.get(("r1", "c", 5, 0.7)) == []
+    assert len(cache) == 2
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.core.config import Settings
+from app.services.rag import RAGService, VectorSearchResult
+from broky.runtime.master import MasterAgentRuntime
+from broky.tools.rag import RAGSearchTool
+
+QUILMES = {"project_name": "Torre Quilmes", "location": "Quilmes", "price": "85000 USD"}
+
+
+class _VectorClient:
+    def search(self, **kwargs):
+        return [
+            VectorSearchResult(project_id="p1", score=0.9, metadata=QUILMES, content="Departamentos de 2 dormitorios."),
+            VectorSearchResult(project_id="p1", score=0.8, metadata=QUILMES, content="Entrega en 2027."),
+        ]
+
+    async def asearch(self, **kwargs):
+        return self.search(**kwargs)
+
+
+class _NoLLM:
+    """Any completion attempt fails the test."""
+
+    @property
+    def chat(self):
+        raise AssertionError("retrieval_only no debe llamar al LLM")
+
+
+def test_retrieval_only_returns_context_without_a_completion():
+    service = RAGService(
+        Settings(OPENAI_API_KEY="x", RAG_MODE="retrieval_only"),
+        vector_client=_VectorClient(),
+        llm_client=_NoLLM(),
+    )
+    tool = RAGSearchTool(service)
+
+    result = tool.invoke({"message": "¿Qué hay en Quilmes?", "realtor_id": "r1"})
+    assert result["response"] is None and result["mode"] == "retrieval_only"
+    assert result["context"].startswith("Proyecto #1: Torre Quilmes | Quilmes | desde 85000 USD")
+    assert "Entrega en 2027." in result["context"]
+    assert result["sources"] == [{"project_id": "p1", "name": "Torre Quilmes", "score": 0.9}]
+
+    async_result = asyncio.run(tool.ainvoke({"message": "¿Qué hay en Quilmes?", "realtor_id": "r1"}))
+    assert async_result["context"] == result["context"]
+
+    merged = MasterAgentRuntime._merge_additional_metadata({"filter_rag": {"status": "ok", **result}}, {})
+    assert merged["informacion_para_responder"].endswith(result["context"])
+
+    empty = MasterAgentRuntime._merge_additional_metadata(
+        {"filter_rag": {"status": "ok", "mode": "retrieval_only", "response": None, "context": ""}}, {}
+    )
+    assert "no inventes" in empty["informacion_para_responder"]
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+from app.core.config import Settings
+from app.services.rag import RAGService, VectorSearchResult, VectorSearchServiceError
+
+
+class _SlowFallbackVectorClient:
+    """Empty main search; every fallback variant takes `delay` seconds."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def _answer(self, query):
+        with self._lock:
+            self.queries.append(query)
+        if query.startswith("¿"):
+            return []
+        if query == "proyectos tienen quilmes":
+            raise VectorSearchServiceError("timeout")
+        return [VectorSearchResult(project_id="p1", score=0.9, metadata={}, content=query)]
+
+    def search(self, *, query, realtor_id, limit=None, threshold=None, cancel=None):
+        if not query.startswith("¿"):
+            time.sleep(self.delay)
+        return self._answer(query)
+
+    async def asearch(self, *, query, realtor_id, limit=None, threshold=None):
+        if not query.startswith("¿"):
+            await asyncio.sleep(self.delay)
+        return self._answer(query)
+
+
+def _service(vector):
+    return RAGService(Settings(OPENAI_API_KEY="x"), vector_client=vector, llm_client=object())
+
+
+def test_fallback_queries_run_concurrently_and_take_the_first_hit():
+    vector = _SlowFallbackVectorClient()
+    question = "¿Qué proyectos tienen en Quilmes?"
+    assert RAGService._build_fallback_queries(question) == [
+        "que proyectos tienen en quilmes",
+        "proyectos tienen quilmes",
+    ]
+
+    started = time.perf_counter()
+    results, failed = _service(vector)._search_context(
+        query=question, realtor_id="r1", limit=None, threshold=None
+    )
+    elapsed = time.perf_counter() - started
+
+    # Una variante falla y la otra acierta: se toma el acierto en una sola ronda.
+    assert not failed and [r.content for r in results] == ["que proyectos tienen en quilmes"]
+    assert elapsed < 0.35
+
+    vector = _SlowFallbackVectorClient()
+    started = time.perf_counter()
+    results, failed = asyncio.run(
+        _service(vector)._asearch_context(query=question, realtor_id="r1", limit=None, threshold=None)
+    )
+    assert not failed and [r.content for r in results] == ["que proyectos tienen en quilmes"]
+    assert time.perf_counter() - started < 0.35
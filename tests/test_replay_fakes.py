@@ -0,0 +1,122 @@
+import json
+
+import httpx
+import pytest
+from openai import OpenAI
+
+from scripts.fakes import FakeOpenAI, InMemorySupabase, LatencyProfile
+from scripts.replay_webhooks import chat_key, load_payloads
+
+
+def test_latency_profile_parsing():
+    assert LatencyProfile.parse(None).sample_ms() == 0.0
+    assert LatencyProfile.parse("120").sample_ms() == 120.0
+    uniform = LatencyProfile.parse("uniform:10,20")
+    assert all(10.0 <= uniform.sample_ms() <= 20.0 for _ in range(50))
+    with pytest.raises(ValueError):
+        LatencyProfile.parse("gamma:1,2")
+
+
+def test_in_memory_supabase_matches_repository_queries():
+    client = InMemorySupabase()
+    client.table("chats_history_n8n").insert({"session_id": "s1", "message": "hola"}).execute()
+    client.table("chats_history_n8n").insert([{"session_id": "s1", "message": "chao"}, {"session_id": "s2"}]).execute()
+
+    rows = client.table("chats_history_n8n").select("id, message").eq("session_id", "s1").order("id", desc=True).limit(1).execute().data
+    assert rows == [{"id": 2, "message": "chao"}]
+
+    client.table("summaries").upsert({"session_id": "s1", "turns": 1}, on_conflict="session_id").execute()
+    client.table("summaries").upsert({"session_id": "s1", "turns": 2}, on_conflict="session_id").execute()
+    assert [row["turns"] for row in client.store.rows("summaries")] == [2]
+
+    client.table("chats_history_n8n").delete().in_("id", [1, 3]).execute()
+    assert [row["id"] for row in client.store.rows("chats_history_n8n")] == [2]
+
+
+def test_fake_openai_serves_completions_and_streams():
+    fake = FakeOpenAI(reply="Hola desde el fake.", json_reply={"intent": "saludo"})
+    base_url = fake.start()
+    try:
+        client = OpenAI(api_key="sk-fake", base_url=f"{base_url}/v1", http_client=httpx.Client())
+        completion = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "hola"}],
+            response_format={"type": "json_object"},
+        )
+        assert json.loads(completion.choices[0].message.content) == {"intent": "saludo"}
+        assert completion.usage.total_tokens > 0
+
+        stream = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "hola"}],
+            stream=True,
+        )
+        text = "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+        assert text == "Hola desde el fake."
+    finally:
+        fake.stop()
+
+
+def test_load_payloads_accepts_wrapped_lines(tmp_path):
+    payload = {"messages": [{"from": "569", "chat_id": "569@s.whatsapp.net", "text": {"body": "hola"}}]}
+    path = tmp_path / "traffic.jsonl"
+    path.write_text(json.dumps(payload) + "\n\n" + json.dumps({"payload": payload}) + "\n", encoding="utf-8")
+
+    payloads = load_payloads(path)
+    assert len(payloads) == 2
+    assert chat_key(payloads[1]) == "569@s.whatsapp.net"
+
+
+def test_postgrest_fake_serves_supabase_py_repositories():
+    from supabase import create_client
+
+    from app.services.chat_history_repository import ChatHistoryRepository
+    from scripts.fakes import FakePostgREST
+    from scripts.fakes.stack import FAKE_SUPABASE_KEY
+
+    fake = FakePostgREST()
+    try:
+        client = create_client(fake.start(), FAKE_SUPABASE_KEY)
+        repository = ChatHistoryRepository(client)
+        repository.append_message(session_id="s1", sender_role="user", message="hola")
+        repository.append_message(session_id="s1", sender_role="assistant", message="¿En qué te ayudo?")
+        repository.append_message(session_id="s2", sender_role="user", message="otra sesión")
+
+        history = repository.fetch_history("s1")
+        assert [row["message"] for row in history] == ["hola", "¿En qué te ayudo?"]
+
+        client.table("prospects").insert({"realtor_id": "r1", "telephone": "56911111111"}).execute()
+        found = client.table("prospects").select("id, telephone").eq("telephone", "56911111111").execute().data
+        assert len(found) == 1 and isinstance(found[0]["id"], str)
+    finally:
+        fake.stop()
+
+
+def test_fake_openai_script_rules_and_failure_injection():
+    from scripts.fakes import FailureProfile, OpenAIScript
+
+    script = OpenAIScript.load(
+        {
+            "rules": [
+                {"name": "master", "match": "clasificador", "json": [{"intents": ["a"]}, {"intents": ["b"]}]},
+                {"name": "roto", "match": "siempre falla", "reply": "x", "failures": "1:500"},
+            ]
+        }
+    )
+    fake = FakeOpenAI(script=script, failures=FailureProfile.parse("0"))
+    base_url = fake.start()
+    try:
+        client = OpenAI(api_key="sk-fake", base_url=f"{base_url}/v1", max_retries=0, http_client=httpx.Client())
+
+        def ask(system: str) -> str:
+            completion = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "system", "content": system}, {"role": "user", "content": "hola"}],
+            )
+            return completion.choices[0].message.content
+
+        assert [json.loads(ask("Eres un clasificador"))["intents"] for _ in range(3)] == [["a"], ["b"], ["a"]]
+        with pytest.raises(Exception):
+            ask("Este agente siempre falla")
+    finally:
+        fake.stop()
@@ -22,3 +22,71 @@ def test_response_agent_uses_fallback_when_reply_is_empty():
     reply = updated_context.metadata.get("reply")
     assert reply, "El agente debe generar un fallback cuando la respuesta del modelo es vacía"
     assert "asesor humano" in reply.lower()
+
+
+def test_response_agent_streams_first_segment_before_generation_ends():
+    from langchain_core.messages import AIMessageChunk
+
+    chunks = [
+        "Hola, gracias por escribirnos. ",
+        "Tenemos departamentos disponibles en Ñuñoa. ",
+        "Te cuento los detalles: ",
+        "dos dormitorios desde 4.500 UF.",
+    ]
+    delivered = []
+
+    class _StreamingModel:
+        available = True
+
+        def stream(self, messages):
+            for index, text in enumerate(chunks):
+                # El fragmento debe salir antes de que termine la generación.
+                if index == len(chunks) - 1:
+                    assert delivered, "el primer fragmento debe enviarse antes del final"
+                yield AIMessageChunk(content=text)
+
+    agent = ResponseAgentExecutor()
+    agent._model = _StreamingModel()
+    context = BrokyContext(session_id="s", payload={"message": "Hola"}, realtor_id="r")
+    context.stream_callback = delivered.append
+
+    updated = agent.invoke(context)
+
+    assert delivered == ["Hola, gracias por escribirnos. Tenemos departamentos disponibles en Ñuñoa."]
+    postprocess = updated.metadata["postprocess"]
+    assert postprocess["streamed_segments"] == delivered
+    assert updated.metadata["reply"] == "Te cuento los detalles: dos dormitorios desde 4.500 UF."
+
+
+def test_streamed_segment_goes_through_the_fixer_and_is_not_repeated():
+    from langchain_core.messages import AIMessageChunk
+
+    class _Fixer:
+        def rewrite(self, base_reply, *, user_message=None):
+            return base_reply.replace("Hola,", "¡Hola!")
+
+    class _StreamingModel:
+        available = True
+
+        def stream(self, messages):
+            yield AIMessageChunk(content="Hola, gracias por escribirnos desde la web de la inmobiliaria. ")
+            yield AIMessageChunk(content="Te cuento los detalles.")
+
+    delivered = []
+    agent = ResponseAgentExecutor(fixer=_Fixer())
+    agent._model = _StreamingModel()
+    context = BrokyContext(session_id="s", payload={"message": "Hola"}, realtor_id="r")
+    context.stream_callback = delivered.append
+
+    updated = agent.invoke(context)
+
+    assert delivered == ["¡Hola! gracias por escribirnos desde la web de la inmobiliaria."]
+    assert updated.metadata["postprocess"]["streamed_segments"] == delivered
+    assert updated.metadata["reply"] == "Te cuento los detalles."
+
+    # Si la respuesta final no arranca con lo generado en streaming, no se reenvía.
+    mismatch = BrokyContext(session_id="s", payload={"message": "Hola"}, realtor_id="r")
+    result = {"reply": "Otra respuesta completa.", "streamed_segment": "Hola, gracias.", "delivered_segment": "¡Hola! gracias."}
+    updated = agent.handle_output(mismatch, result)
+    assert updated.metadata["postprocess"]["streamed_segments"] == ["¡Hola! gracias."]
+    assert updated.metadata["reply"] == ""
@@ -40,6 +40,7 @@ def _build_runtime_with_spies(call_log: List[str]) -> MasterAgentRuntime:
     runtime._profile_repo = None  # type: ignore[attr-defined]
     runtime._prospect_repo = None  # type: ignore[attr-defined]
     runtime._followup_repo = None  # type: ignore[attr-defined]
+    runtime._usage_repo = None  # type: ignore[attr-defined]
 
     runtime._executor = _DummyExecutor()  # type: ignore[attr-defined]
     runtime._response_agent = _SpyAgent("response", call_log, reply="Respuesta base")  # type: ignore[attr-defined]
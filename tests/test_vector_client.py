@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from app.core.config import Settings
+from app.core.metrics import REGISTRY
+from app.services.rag import VectorSearchClient, close_vector_http_client
+
+
+class _VectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802 - interfaz de BaseHTTPRequestHandler
+        length = int(self.headers.get("Content-Length") or 0)
+        query = json.loads(self.rfile.read(length))["query"]
+        body = json.dumps({"results": [{"project_id": "p1", "score": 0.9, "content": query}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+
+def _connections(result):
+    return REGISTRY.get_sample_value("broky_http_connections_total", {"pool": "vector", "result": result}) or 0.0
+
+
+def test_vector_searches_reuse_the_pooled_connection():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _VectorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    close_vector_http_client()
+    try:
+        settings = Settings(
+            OPENAI_API_KEY="x",
+            VECTOR_SERVICE_URL=f"http://127.0.0.1:{server.server_port}",
+        )
+        new_before, reused_before = _connections("new"), _connections("reused")
+
+        client = VectorSearchClient(settings)
+        first = client.search(query="depto", realtor_id="r1")
+        second = VectorSearchClient(settings).search(query="casa", realtor_id="r1")
+
+        assert [r.content for r in first + second] == ["depto", "casa"]
+        assert _connections("new") - new_before == 1
+        assert _connections("reused") - reused_before == 1
+    finally:
+        close_vector_http_client()
+        server.shutdown()
+        server.server_close()
+
+
+def test_async_search_hedges_a_slow_request_and_cancels_the_loser():
+    calls = []
+    cancelled = []
+
+    async def handler(request):
+        calls.append(json.loads(request.content)["query"])
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(1.0)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return httpx.Response(200, json={"results": [{"project_id": "p2", "score": 0.8, "content": "rápida"}]})
+
+    settings = Settings(
+        OPENAI_API_KEY="x",
+        VECTOR_SERVICE_URL="http://vector.test",
+        VECTOR_HEDGE_DELAY_MS=20,
+    )
+
+    async def scenario():
+        async with httpx.AsyncClient(
+            base_url="http://vector.test", transport=httpx.MockTransport(handler)
+        ) as async_client:
+            client = VectorSearchClient(settings, async_client=async_client)
+            started = time.perf_counter()
+            results = await client.asearch(query="depto", realtor_id="r1")
+            return results, time.perf_counter() - started
+
+    won_before = REGISTRY.get_sample_value("broky_hedged_requests_total", {"target": "vector", "result": "won"}) or 0.0
+    results, elapsed = asyncio.run(scenario())
+
+    assert [r.content for r in results] == ["rápida"]
+    assert calls == ["depto", "depto"] and cancelled == [True]
+    assert elapsed < 0.5
+    assert REGISTRY.get_sample_value("broky_hedged_requests_total", {"target": "vector", "result": "won"}) == won_before + 1
+
+
+def test_async_pool_is_kept_per_event_loop_and_released_with_it():
+    from app.services.rag import get_async_vector_http_client
+    from app.services.rag import vector_client
+
+    settings = Settings(OPENAI_API_KEY="x", VECTOR_HTTP2=False)
+
+    async def pool_twice():
+        pool = get_async_vector_http_client(settings)
+        assert get_async_vector_http_client(settings) is pool
+        # Solo queda el pool del loop en curso: el del loop anterior ya se soltó.
+        assert list(vector_client._async_pools.values()) == [pool]
+        return pool
+
+    loops = [asyncio.new_event_loop(), asyncio.new_event_loop()]
+    pools = []
+    for loop in loops:
+        try:
+            pools.append(loop.run_until_complete(pool_twice()))
+        finally:
+            loop.close()
+    assert pools[0] is not pools[1]
+
+
+def test_cancelled_search_stops_retrying():
+    import pytest
+
+    from app.services.rag import VectorSearchServiceError
+
+    cancel = threading.Event()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        # Otra variante ya acertó mientras esta esperaba al servicio.
+        cancel.set()
+        return httpx.Response(503)
+
+    settings = Settings(OPENAI_API_KEY="x", VECTOR_SERVICE_URL="http://vector.test")
+    with httpx.Client(base_url="http://vector.test", transport=httpx.MockTransport(handler)) as http:
+        client = VectorSearchClient(settings, client=http)
+        started = time.perf_counter()
+        with pytest.raises(VectorSearchServiceError):
+            client.search(query="depto", realtor_id="r1", cancel=cancel)
+
+    assert len(calls) == 1 and time.perf_counter() - started < 0.3